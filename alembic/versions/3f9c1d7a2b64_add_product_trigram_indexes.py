@@ -0,0 +1,59 @@
+"""add product trigram indexes
+
+Revision ID: 3f9c1d7a2b64
+Revises: 8e2b6d41c9a3
+Create Date: 2026-10-17 18:22:36.104958
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9c1d7a2b64"
+down_revision: Union[str, None] = "8e2b6d41c9a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # GIN trigram builds are slow on large tables; CONCURRENTLY keeps
+    # products writable meanwhile but cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        # Serve both ILIKE '%term%' and the word-similarity operators used
+        # by app.repositories.product.trigram_match
+        op.create_index(
+            "ix_products_name_trgm",
+            "products",
+            ["name"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_products_description_trgm",
+            "products",
+            ["description"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    # The extension is left installed; other objects may depend on it
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_products_description_trgm",
+            table_name="products",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_products_name_trgm",
+            table_name="products",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,60 @@
+"""add embedding cache table
+
+Revision ID: 5c0e3a9b7f21
+Revises: d47e8dfdb721
+Create Date: 2026-10-17 14:03:51.902417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c0e3a9b7f21"
+down_revision: Union[str, None] = "d47e8dfdb721"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "embedding_cache",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("key", sa.String(length=64), nullable=False),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("dimension", sa.Integer(), nullable=False),
+        sa.Column("task_type", sa.String(), nullable=False),
+        sa.Column("embedding", sa.LargeBinary(), nullable=False),
+        sa.Column("uuid", sa.UUID(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_embedding_cache_id"), "embedding_cache", ["id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_embedding_cache_key"), "embedding_cache", ["key"], unique=True
+    )
+    op.create_index(
+        op.f("ix_embedding_cache_uuid"), "embedding_cache", ["uuid"], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_embedding_cache_uuid"), table_name="embedding_cache")
+    op.drop_index(op.f("ix_embedding_cache_key"), table_name="embedding_cache")
+    op.drop_index(op.f("ix_embedding_cache_id"), table_name="embedding_cache")
+    op.drop_table("embedding_cache")
@@ -0,0 +1,63 @@
+"""add product pagination indexes
+
+Revision ID: 8e2b6d41c9a3
+Revises: 5c0e3a9b7f21
+Create Date: 2026-10-17 16:41:07.553120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8e2b6d41c9a3"
+down_revision: Union[str, None] = "5c0e3a9b7f21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY keeps the tables writable during the build
+    # but cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        # Keyset pagination keys; descending sorts scan these backwards
+        op.create_index(
+            "ix_products_price_id",
+            "products",
+            ["price", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_products_created_at_id",
+            "products",
+            ["created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        # Category listings start from the join table
+        op.create_index(
+            "ix_product_categories_category_id_product_id",
+            "product_categories",
+            ["category_id", "product_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_product_categories_category_id_product_id",
+            table_name="product_categories",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_products_created_at_id",
+            table_name="products",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_products_price_id", table_name="products", postgresql_concurrently=True
+        )
@@ -0,0 +1,62 @@
+"""add product listing indexes
+
+Revision ID: a71c5e08d3f2
+Revises: 3f9c1d7a2b64
+Create Date: 2026-10-17 19:05:12.671284
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a71c5e08d3f2"
+down_revision: Union[str, None] = "3f9c1d7a2b64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+IN_STOCK = "stock_quantity > 0"
+OUT_OF_STOCK = "stock_quantity = 0"
+
+# (name, table, columns, partial index predicate) matched to the query
+# shapes in app.repositories.product; checked by tests/test_query_plans.py
+INDEXES = [
+    # in_stock=true listings for each keyset sort
+    ("ix_products_in_stock_id", "products", ["id"], IN_STOCK),
+    ("ix_products_in_stock_price_id", "products", ["price", "id"], IN_STOCK),
+    ("ix_products_in_stock_created_at_id", "products", ["created_at", "id"], IN_STOCK),
+    # in_stock=false is a small slice; sorting it in memory is cheap
+    ("ix_products_out_of_stock_id", "products", ["id"], OUT_OF_STOCK),
+    # Category selectinload and product-side probes of the category join
+    (
+        "ix_product_categories_product_id_category_id",
+        "product_categories",
+        ["product_id", "category_id"],
+        None,
+    ),
+    # Image selectinload
+    ("ix_product_images_product_id", "product_images", ["product_id"], None),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY keeps the tables writable during the build
+    # but cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,81 @@
+"""add product category ids
+
+Revision ID: c4d82b1f6e09
+Revises: a71c5e08d3f2
+Create Date: 2026-10-17 20:14:48.390517
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4d82b1f6e09"
+down_revision: Union[str, None] = "a71c5e08d3f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rows per backfill statement; each batch commits on its own so the
+# products table is never locked for the whole backfill.
+BACKFILL_BATCH_SIZE = 50_000
+
+BACKFILL = """
+UPDATE products p SET category_ids = sub.ids
+FROM (
+    SELECT product_id, array_agg(DISTINCT category_id ORDER BY category_id) AS ids
+    FROM product_categories
+    WHERE product_id > {start} AND product_id <= {stop}
+    GROUP BY product_id
+) sub
+WHERE sub.product_id = p.id
+"""
+
+
+def upgrade() -> None:
+    # A constant default makes this a metadata-only change
+    op.add_column(
+        "products",
+        sa.Column(
+            "category_ids",
+            postgresql.ARRAY(sa.Integer()),
+            server_default=sa.text("'{}'"),
+            nullable=False,
+        ),
+    )
+    # Category filters read this column as soon as the new code is live, so
+    # existing products are filled in here rather than by a later manual
+    # backfill-category-ids run.
+    with op.get_context().autocommit_block():
+        if context.is_offline_mode():
+            op.execute(BACKFILL.format(start=0, stop="(SELECT max(id) FROM products)"))
+        else:
+            max_id = op.get_bind().execute(
+                sa.text("SELECT coalesce(max(id), 0) FROM products")
+            ).scalar()
+            for start in range(0, max_id, BACKFILL_BATCH_SIZE):
+                op.execute(
+                    BACKFILL.format(start=start, stop=start + BACKFILL_BATCH_SIZE)
+                )
+
+        op.create_index(
+            "ix_products_category_ids",
+            "products",
+            ["category_ids"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_products_category_ids",
+            table_name="products",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("products", "category_ids")
@@ -0,0 +1,47 @@
+"""add product search document index
+
+Revision ID: d47e8dfdb721
+Revises: 910d653fe6ab
+Create Date: 2026-10-17 10:12:44.218310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d47e8dfdb721"
+down_revision: Union[str, None] = "910d653fe6ab"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GIN builds are slow on large tables; CONCURRENTLY keeps products
+    # writable meanwhile but cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        # Expression must stay in sync with app.repositories.product.search_document
+        op.create_index(
+            "ix_products_search_document",
+            "products",
+            [
+                sa.text(
+                    "to_tsvector('english'::regconfig, "
+                    "(coalesce(name, '') || ' ') || coalesce(description, ''))"
+                )
+            ],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_products_search_document",
+            table_name="products",
+            postgresql_concurrently=True,
+        )
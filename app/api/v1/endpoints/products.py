@@ -19,19 +19,31 @@ def get_products_by_category(
     sort_by: Optional[str] = Query(
         None, regex="^(price_asc|price_desc|newest|top_rated)$"
     ),
+    cursor: Optional[str] = Query(
+        None, description="Cursor from a previous page; takes precedence over skip"
+    ),
+    include_total: bool = Query(
+        True, description="Set to false to skip counting matching products"
+    ),
     product_service: ProductService = Depends(get_product_service),
 ) -> Any:
-    products, total = product_service.get_products_by_category(
-        db,
-        category_name=category_name,
-        skip=skip,
-        limit=limit,
-        sort_by=sort_by,
-    )
+    try:
+        products, total, next_cursor = product_service.get_products_by_category(
+            db,
+            category_name=category_name,
+            skip=skip,
+            limit=limit,
+            sort_by=sort_by,
+            cursor=cursor,
+            include_total=include_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {
         "total_products": total,
-        "total_pages": (total + limit - 1) // limit,
+        "total_pages": None if total is None else (total + limit - 1) // limit,
         "products": products,
+        "next_cursor": next_cursor,
     }
 
 
@@ -41,31 +53,59 @@ def list_products(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     name: Optional[str] = None,
+    search_mode: str = Query(
+        "contains",
+        regex="^(contains|trigram)$",
+        description="How `name` matches: substring, or typo-tolerant trigram similarity",
+    ),
     category: Optional[str] = None,
+    categories: Optional[List[str]] = Query(
+        None, description="Repeat to filter on several categories"
+    ),
+    category_match: str = Query(
+        "all",
+        regex="^(all|any)$",
+        description="Whether products need all or any of the categories",
+    ),
     min_price: Optional[float] = Query(None, ge=0),
     max_price: Optional[float] = Query(None, ge=0),
     sort_by: Optional[str] = Query(
-        None, regex="^(price_asc|price_desc|newest|top_rated)$"
+        None, regex="^(price_asc|price_desc|newest|top_rated|relevance)$"
     ),
     in_stock: Optional[bool] = None,
+    cursor: Optional[str] = Query(
+        None, description="Cursor from a previous page; takes precedence over skip"
+    ),
+    include_total: bool = Query(
+        True, description="Set to false to skip counting matching products"
+    ),
     product_service: ProductService = Depends(get_product_service),
 ) -> Any:
-    products, total = product_service.get_products(
-        db,
-        skip=skip,
-        limit=limit,
-        name=name,
-        category=category,
-        min_price=min_price,
-        max_price=max_price,
-        sort_by=sort_by,
-        in_stock=in_stock,
-    )
+    try:
+        products, total, next_cursor = product_service.get_products(
+            db,
+            skip=skip,
+            limit=limit,
+            name=name,
+            category=category,
+            min_price=min_price,
+            max_price=max_price,
+            sort_by=sort_by,
+            in_stock=in_stock,
+            cursor=cursor,
+            include_total=include_total,
+            search_mode=search_mode,
+            categories=categories,
+            category_match=category_match,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return {
         "total_products": total,
-        "total_pages": (total + limit - 1) // limit,
+        "total_pages": None if total is None else (total + limit - 1) // limit,
         "products": products,
+        "next_cursor": next_cursor,
     }
 
 
@@ -105,5 +145,8 @@ def update_product(
     product = product_service.get_by_uuid(db=db, uuid=uuid)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    product = product_service.update(db=db, uuid=uuid, obj_in=product_in)
+    # Single interactive edits skip the batching window
+    product = product_service.update(
+        db=db, uuid=uuid, obj_in=product_in, embed_immediately=True
+    )
     return product
@@ -1,12 +1,17 @@
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app.api.deps import get_db
+from app.api.deps import get_db, get_current_active_superuser
 from app.services.semantic_search import (
     SemanticSearchService,
     get_semantic_search_service,
 )
-from app.schemas.search import SearchResponse, SearchResult
+from app.schemas.search import (
+    BatchSearchRequest,
+    BatchSearchResponse,
+    SearchResponse,
+    SearchResult,
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,20 +20,30 @@ router = APIRouter()
 
 
 @router.get("", response_model=SearchResponse)
-def semantic_search(
+async def semantic_search(
     query: str = Query(..., min_length=1, description="Search query text"),
     limit: int = Query(10, ge=1, le=100, description="Maximum number of results"),
     score_threshold: float = Query(
         None, ge=0.0, le=1.0, description="Minimum similarity score threshold"
     ),
+    mode: str = Query(
+        "semantic",
+        regex="^(semantic|hybrid)$",
+        description="semantic: vector search only; hybrid: full-text and vector "
+        "results fused by reciprocal rank (scores are fusion scores)",
+    ),
     db: Session = Depends(get_db),
     semantic_search_service: SemanticSearchService = Depends(
         get_semantic_search_service
     ),
 ) -> Any:
     try:
-        search_results, total = semantic_search_service.search(
-            db=db, query=query, limit=limit, score_threshold=score_threshold
+        search_results, total = await semantic_search_service.asearch(
+            db=db,
+            query=query,
+            limit=limit,
+            score_threshold=score_threshold,
+            mode=mode,
         )
 
         formatted_results = [
@@ -45,3 +60,51 @@ def semantic_search(
     except Exception as e:
         logger.error(f"Error in semantic search endpoint: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Search failed")
+
+
+@router.post("/batch", response_model=BatchSearchResponse)
+async def batch_semantic_search(
+    batch_in: BatchSearchRequest,
+    db: Session = Depends(get_db),
+    semantic_search_service: SemanticSearchService = Depends(
+        get_semantic_search_service
+    ),
+) -> Any:
+    try:
+        batch_results = await semantic_search_service.asearch_batch(
+            db=db,
+            queries=batch_in.queries,
+            limit=batch_in.limit,
+            score_threshold=batch_in.score_threshold,
+        )
+
+        return BatchSearchResponse(
+            results=[
+                SearchResponse(
+                    query=query,
+                    total_results=len(search_results),
+                    results=[
+                        SearchResult(
+                            product=result["product"],
+                            score=result["score"],
+                        )
+                        for result in search_results
+                    ],
+                )
+                for query, search_results in zip(batch_in.queries, batch_results)
+            ]
+        )
+
+    except Exception as e:
+        logger.error(f"Error in batch semantic search endpoint: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Search failed")
+
+
+@router.get("/stats")
+def search_stats(
+    current_user: Any = Depends(get_current_active_superuser),
+    semantic_search_service: SemanticSearchService = Depends(
+        get_semantic_search_service
+    ),
+) -> Any:
+    return semantic_search_service.stats()
@@ -2,5 +2,19 @@ from celery import Celery
 from app.core.config import settings
 
 celery = Celery(
-    "app", broker=settings.CELERY_BROKER_URL, include=["app.tasks.embedding_tasks"]
+    "app",
+    broker=settings.CELERY_BROKER_URL,
+    include=["app.tasks.embedding_tasks", "app.tasks.vector_store_tasks"],
 )
+
+# Vector writes are not flushed individually; seal them on a schedule instead
+celery.conf.beat_schedule = {
+    "flush-vector-store": {
+        "task": "flush_vector_store",
+        "schedule": settings.VECTOR_STORE_FLUSH_INTERVAL_SECONDS,
+    },
+    "reconcile-vector-store": {
+        "task": "reconcile_vector_store",
+        "schedule": settings.VECTOR_STORE_RECONCILE_INTERVAL_SECONDS,
+    },
+}
@@ -16,9 +16,7 @@ from app.services.category import get_category_service
 from app.schemas.product import ProductCreate
 from app.schemas.category import CategoryCreate
 from app.models.product import Product
-from app.utils.product_text import prepare_product_text
-from app.services.embedding import GeminiEmbeddingService
-from app.services.vector_store import MilvusVectorStore
+from app.services.vector_store import get_vector_store
 from app.core.config import settings
 
 cli = typer.Typer()
@@ -139,103 +137,282 @@ def populate_dummy_data():
 @cli.command()
 def generate_all_embeddings(
     max_workers: int = typer.Option(
-        10,
+        4,
         help="Maximum number of concurrent worker threads to use for embedding generation",
+    ),
+    batch_size: int = typer.Option(
+        100, help="Number of products embedded per provider call and vector write"
+    ),
+    include_generated: bool = typer.Option(
+        False,
+        "--all",
+        help="Also re-embed products whose embeddings are already generated",
+    ),
+    checkpoint: str = typer.Option(
+        "data/embedding_backfill.json",
+        help="File recording progress so an interrupted run can resume",
+    ),
+    restart: bool = typer.Option(
+        False, help="Ignore any existing checkpoint and start from the beginning"
+    ),
+):
+    """Embed products that are pending or failed (or all products with --all)."""
+    from app.services.embedding_backfill import EmbeddingBackfill
+    from app.tasks.embedding_tasks import (
+        embed_products,
+        get_embedding_service,
+        get_task_vector_store,
+    )
+
+    vector_store = get_task_vector_store()
+    collection_name = settings.MILVUS_COLLECTION_NAME
+
+    # Initialize collection once (single-threaded) to ensure schema is correct
+    if not vector_store.collection_exists(collection_name):
+        dimension = get_embedding_service().get_embedding_dimension()
+        vector_store.initialize_collection(collection_name, dimension)
+        typer.echo(f"Created vector collection '{collection_name}' with dim={dimension}")
+
+    statuses = [Product.EMBEDDING_STATUS_PENDING, Product.EMBEDDING_STATUS_FAILED]
+    if include_generated:
+        statuses.append(Product.EMBEDDING_STATUS_GENERATED)
+
+    backfill = EmbeddingBackfill(
+        SessionLocal,
+        embed_products,
+        statuses=statuses,
+        batch_size=batch_size,
+        workers=max_workers,
+        checkpoint_path=checkpoint,
+        on_progress=lambda progress: typer.echo(progress.line()),
     )
+    if restart:
+        backfill.clear_checkpoint()
+
+    try:
+        progress = backfill.run()
+    except KeyboardInterrupt:
+        typer.echo("Interrupted; re-run the command to resume.", err=True)
+        raise typer.Exit(130)
+    finally:
+        vector_store.flush(collection_name)
+
+    if progress.total == 0:
+        typer.echo("No products found to generate embeddings for.")
+        return
+    typer.echo(
+        f"Embedding generation completed. Processed: {progress.processed}, "
+        f"Errors: {progress.failed}"
+    )
+
+
+@cli.command()
+def reembed_products(
+    max_workers: int = typer.Option(4, help="Number of concurrent worker threads"),
+    batch_size: int = typer.Option(
+        100, help="Number of products embedded per provider call and vector write"
+    ),
+):
+    """Re-embed every product with the current product text (no price string)."""
+    generate_all_embeddings(
+        max_workers=max_workers,
+        batch_size=batch_size,
+        include_generated=True,
+        checkpoint="data/reembed_products.json",
+        restart=False,
+    )
+
+
+@cli.command()
+def reconcile_vector_store(
+    dry_run: bool = typer.Option(False, help="Only report drift, change nothing"),
+    batch_size: int = typer.Option(1000, help="Vector IDs checked per Postgres query"),
 ):
-    from concurrent.futures import ThreadPoolExecutor, as_completed
+    """Remove duplicate and orphaned vectors and re-queue missing embeddings."""
+    from app.services.reconciliation import reconcile_vector_store as reconcile
+    from app.tasks.embedding_tasks import queue_product_embedding
 
     db = SessionLocal()
     try:
-        # Load product UUIDs up front to avoid sharing ORM instances across threads
-        products = db.query(Product.uuid).all()
-        total = len(products)
-        if total == 0:
-            typer.echo("No products found to generate embeddings for.")
-            return
+        report = reconcile(
+            db,
+            get_vector_store(),
+            settings.MILVUS_COLLECTION_NAME,
+            queue_product_embedding,
+            batch_size=batch_size,
+            dry_run=dry_run,
+        )
+    finally:
+        db.close()
+
+    for name, value in report.as_dict().items():
+        typer.echo(f"{name}: {value}")
+
+
+@cli.command()
+def backfill_category_ids(
+    batch_size: int = typer.Option(1000, help="Products updated per transaction"),
+):
+    """Rebuild the denormalized category_ids of every product."""
+    from app.services.category_backfill import (
+        backfill_category_ids as run_backfill,
+    )
+
+    db = SessionLocal()
+    try:
+        updated = run_backfill(
+            db,
+            batch_size=batch_size,
+            on_batch=lambda scanned, updated: typer.echo(
+                f"{scanned} products scanned, {updated} updated"
+            ),
+        )
+        typer.echo(f"Done: {updated} products updated.")
+    finally:
+        db.close()
 
+
+@cli.command()
+def benchmark_vector_storage(
+    storage: str = typer.Option(
+        "sq8", help="Compressed storage to evaluate: float16, sq8 or pq"
+    ),
+    queries: int = typer.Option(100, help="Number of sample queries"),
+    k: int = typer.Option(10, help="Results per query used for recall@k"),
+    keep: bool = typer.Option(
+        False, help="Keep the compressed collection instead of dropping it"
+    ),
+):
+    """Build a compressed copy of the product collection and compare it to the original."""
+    import numpy as np
+    from app.services.vector_store.benchmark import compare_collections
+    from app.services.vector_store.milvus import (
+        EXPECTED_DIM,
+        MilvusVectorStore,
+        bytes_per_vector,
+        row_vector,
+    )
+
+    vector_store = get_vector_store()
+    if not isinstance(vector_store, MilvusVectorStore):
+        typer.echo("Storage benchmarks require VECTOR_STORE_BACKEND=milvus", err=True)
+        raise typer.Exit(1)
+
+    baseline_name = settings.MILVUS_COLLECTION_NAME
+    # Recall and memory are measured against an uncompressed baseline
+    baseline_storage = vector_store.collection_storage(baseline_name)
+    if baseline_storage != "float32":
         typer.echo(
-            f"Generating embeddings for {total} products using up to {max_workers} worker threads..."
+            f"Collection '{baseline_name}' uses {baseline_storage or 'unknown'} "
+            "storage; the baseline must be float32",
+            err=True,
         )
+        raise typer.Exit(1)
 
-        # Initialize collection once (single-threaded) to ensure schema is correct
-        embedding_service = GeminiEmbeddingService()
-        vector_store = MilvusVectorStore()
-        collection_name = settings.MILVUS_COLLECTION_NAME
+    candidate_name = f"{baseline_name}_{storage}"
+    if vector_store.collection_exists(candidate_name):
+        typer.echo(f"Collection '{candidate_name}' already exists", err=True)
+        raise typer.Exit(1)
 
-        if not vector_store.collection_exists(collection_name):
-            dimension = embedding_service.get_embedding_dimension()
-            vector_store.initialize_collection(collection_name, dimension)
+    typer.echo(f"Copying '{baseline_name}' into '{candidate_name}' ({storage})...")
+    count = vector_store.copy_collection(baseline_name, candidate_name, storage)
+
+    try:
+        # Sample queries near stored vectors so each has real neighbours
+        sample = next(vector_store.iterate_rows(baseline_name, batch_size=queries), [])
+        rng = np.random.default_rng(0)
+        query_vectors = [
+            (np.asarray(row_vector(row["embedding"])) + rng.normal(0, 0.01, EXPECTED_DIM))
+            .tolist()
+            for row in sample
+        ]
+
+        report = compare_collections(
+            vector_store, baseline_name, candidate_name, query_vectors, k=k
+        )
+
+        typer.echo(f"Vectors: {count}")
+        for label, name, option in (
+            (baseline_storage, baseline_name, baseline_storage),
+            (storage, candidate_name, storage),
+        ):
+            measured = vector_store.memory_usage(name)
+            estimated = count * bytes_per_vector(option)
             typer.echo(
-                f"Created Milvus collection '{collection_name}' with dim={dimension}"
+                f"{label:>8}: memory {measured / 2**20:.1f} MiB "
+                f"(vectors ~{estimated / 2**20:.1f} MiB)"
             )
+        typer.echo(
+            f"Latency p50/p95: baseline {report['baseline']['p50_ms']:.1f}/"
+            f"{report['baseline']['p95_ms']:.1f} ms, {storage} "
+            f"{report['candidate']['p50_ms']:.1f}/{report['candidate']['p95_ms']:.1f} ms"
+        )
+        typer.echo(f"Recall@{k}: {report['recall_at_k']:.3f} over {report['queries']} queries")
+    finally:
+        if not keep:
+            vector_store.drop_collection(candidate_name)
 
-        # Release initial DB session; workers will open their own sessions
-        db.close()
 
-        def process_product(product_uuid):
-            local_db = SessionLocal()
-            try:
-                product = (
-                    local_db.query(Product).filter_by(uuid=product_uuid).one_or_none()
-                )
-                if not product:
-                    return (product_uuid, False, "Product not found")
-
-                local_embedding_service = GeminiEmbeddingService()
-                local_vector_store = MilvusVectorStore()
-
-                product_text = prepare_product_text(product)
-                embedding = local_embedding_service.generate_embedding(product_text)
-
-                local_vector_store.update_vector(
-                    collection_name=collection_name,
-                    vector_id=product.uuid,
-                    vector=embedding,
-                    metadata={"price": float(product.price)},
-                )
-
-                product.version += 1
-                product.embedding_status = Product.EMBEDDING_STATUS_GENERATED
-                local_db.commit()
-                return (product_uuid, True, None)
-            except Exception as e:
-                local_db.rollback()
-                if "product" in locals() and product is not None:
-                    product.embedding_status = Product.EMBEDDING_STATUS_FAILED
-                    local_db.commit()
-                return (product_uuid, False, str(e))
-            finally:
-                local_db.close()
-
-        processed = 0
-        errors = 0
-
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = [executor.submit(process_product, row[0]) for row in products]
-
-            for future in as_completed(futures):
-                product_uuid, ok, err = future.result()
-                processed += 1
-                if ok:
-                    typer.echo(
-                        f"[OK] Processed {processed} of {total} products ({product_uuid})"
-                    )
-                else:
-                    errors += 1
-                    typer.echo(
-                        f"[ERROR] Failed processing product {product_uuid}: {err}",
-                        err=True,
-                    )
+@cli.command()
+def benchmark_name_search(
+    seed: int = typer.Option(
+        0, help="Synthetic products to insert first, e.g. 1000000"
+    ),
+    queries: int = typer.Option(50, help="Number of sample search terms"),
+    limit: int = typer.Option(20, help="Page size"),
+    include_total: bool = typer.Option(True, help="Count matches like the API does"),
+    cleanup: bool = typer.Option(
+        False, help="Delete the synthetic products afterwards"
+    ),
+):
+    """Compare name search latency with and without the trigram indexes."""
+    from sqlalchemy import text
+    from app.services.name_search_benchmark import (
+        delete_synthetic_products,
+        sample_terms,
+        seed_synthetic_products,
+        time_name_search,
+    )
+
+    db = SessionLocal()
+    try:
+        if db.get_bind().dialect.name != "postgresql":
+            typer.echo("Name search benchmarks require Postgres", err=True)
+            raise typer.Exit(1)
+        if db.execute(text("SELECT to_regclass('ix_products_name_trgm')")).scalar() is None:
+            typer.echo(
+                "Trigram indexes are missing; run `alembic upgrade head` first", err=True
+            )
+            raise typer.Exit(1)
 
+        if seed:
+            typer.echo(f"Inserting {seed} synthetic products...")
+            seed_synthetic_products(db, seed)
+        total = db.query(Product).count()
+        terms = sample_terms(queries)
         typer.echo(
-            f"Embedding generation completed. Processed: {processed}, Errors: {errors}"
+            f"Products: {total}, queries: {len(terms)}, "
+            f"count strategy: {settings.PRODUCT_COUNT_STRATEGY}"
         )
+
+        for label, options in (
+            ("ILIKE, sequential scan", dict(use_trigram_index=False)),
+            ("ILIKE, trigram index", dict()),
+            ("trigram, relevance", dict(search_mode="trigram", sort_by="relevance")),
+        ):
+            report = time_name_search(
+                db, terms, limit=limit, include_total=include_total, **options
+            )
+            typer.echo(
+                f"{label:>24}: p50 {report['p50_ms']:.1f} ms, "
+                f"p95 {report['p95_ms']:.1f} ms, "
+                f"{report['mean_hits']:.1f} hits/page"
+            )
+
+        if cleanup:
+            typer.echo(f"Deleted {delete_synthetic_products(db)} synthetic products")
     finally:
-        try:
-            db.close()
-        except Exception:
-            pass
+        db.close()
 
 
 @cli.command()
@@ -26,17 +26,80 @@ class Settings(BaseSettings):
     FIRST_SUPERUSER_PASSWORD: str
 
     GEMINI_API_KEY: Optional[str] = None
+    # Per-request limits for batched document embedding
+    GEMINI_EMBEDDING_MAX_BATCH_ITEMS: int = 100
+    GEMINI_EMBEDDING_MAX_BATCH_TOKENS: int = 20000
 
     DEEPSEEK_API_KEY: Optional[str] = None
+    PRICE_PARSE_CACHE_MAX_ITEMS: int = 10000
+    PRICE_PARSE_CACHE_TTL_SECONDS: int = 24 * 3600
+
+    # Long-lived HTTP pools shared by the provider clients
+    PROVIDER_HTTP_MAX_CONNECTIONS: int = 20
+    PROVIDER_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    PROVIDER_HTTP_TIMEOUT_SECONDS: float = 30.0
+
+    # "milvus" or "numpy" (in-process, memory-mapped files)
+    VECTOR_STORE_BACKEND: str = "milvus"
+    NUMPY_VECTOR_STORE_PATH: str = "data/vector_store"
+    NUMPY_VECTOR_STORE_COMPACTION_RATIO: float = 0.2
 
     MILVUS_URI: Optional[str] = None
     MILVUS_TOKEN: Optional[str] = None
     MILVUS_COLLECTION_NAME: str = "product_embeddings"
+    MILVUS_CONNECTION_ALIAS: str = "default"
+    MILVUS_CONSISTENCY_LEVEL: str = "Bounded"
+    # Vector storage for new collections: float32, float16, sq8 or pq
+    MILVUS_VECTOR_STORAGE: str = "float32"
+    VECTOR_STORE_FLUSH_INTERVAL_SECONDS: int = 60
+    VECTOR_STORE_RECONCILE_INTERVAL_SECONDS: int = 86400
+
+    # Search response cache (ordered hits, validated against Product.version)
+    SEARCH_RESPONSE_CACHE_ENABLED: bool = True
+    SEARCH_RESPONSE_CACHE_MAX_ITEMS: int = 10000
+    SEARCH_RESPONSE_CACHE_TTL_SECONDS: int = 300
+
+    # Hybrid (full-text + vector) search
+    HYBRID_VECTOR_CANDIDATES: int = 50
+    HYBRID_LEXICAL_CANDIDATES: int = 50
+    HYBRID_RRF_K: int = 60
+    HYBRID_EMBEDDING_TIMEOUT_SECONDS: float = 1.5
 
     REDIS_URL: Optional[str] = None
 
+    # Query embedding cache (in-process LRU, optionally backed by REDIS_URL)
+    QUERY_EMBEDDING_CACHE_ENABLED: bool = True
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: int = 3600
+    QUERY_EMBEDDING_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    QUERY_EMBEDDING_CACHE_USE_REDIS: bool = False
+
     CELERY_BROKER_URL: Optional[str] = None
 
+    # Coalescing of embedding updates (requires REDIS_URL)
+    EMBEDDING_BATCH_WINDOW_SECONDS: float = 5.0
+    EMBEDDING_BATCH_MAX_ITEMS: int = 100
+    PRICE_SYNC_BATCH_MAX_ITEMS: int = 1000
+    DOCUMENT_EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_PROVIDER: str = "gemini"  # "gemini" or "local"
+    LOCAL_EMBEDDING_DIMENSION: int = 768
+    LOCAL_EMBEDDING_SEED: int = 0
+
+    # Provider rate limits; None disables a budget
+    GEMINI_REQUESTS_PER_MINUTE: Optional[int] = 3000
+    GEMINI_TOKENS_PER_MINUTE: Optional[int] = 1000000
+    GEMINI_MAX_CONCURRENCY: int = 16
+    DEEPSEEK_REQUESTS_PER_MINUTE: Optional[int] = 600
+    DEEPSEEK_TOKENS_PER_MINUTE: Optional[int] = None
+    DEEPSEEK_MAX_CONCURRENCY: int = 16
+    RATE_LIMIT_USE_REDIS: bool = False
+
+    # Listing totals: "exact", "cached" or "estimated". Cached totals are per
+    # process, so other workers' writes show up only after the TTL.
+    PRODUCT_COUNT_STRATEGY: str = "exact"
+    PRODUCT_COUNT_CACHE_TTL_SECONDS: int = 60
+    PRODUCT_COUNT_CACHE_MAX_ITEMS: int = 10000
+    PRODUCT_COUNT_EXACT_THRESHOLD: int = 10000
+
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
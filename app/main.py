@@ -1,15 +1,38 @@
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.services.semantic_search import (
+    get_semantic_search_service,
+    init_semantic_search_service,
+    aclose_semantic_search_service,
+)
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s %(levelname)-8s [%(name)s] %(message)s",
 )
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        service = init_semantic_search_service()
+        await run_in_threadpool(service.warm_up)
+    except Exception as e:
+        # Search falls back to lazy initialization on the first request
+        logger.error(f"Failed to warm up semantic search clients: {e}", exc_info=True)
+    yield
+    await aclose_semantic_search_service()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
@@ -17,6 +40,7 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Set up CORS middleware
@@ -45,3 +69,18 @@ async def root():
         "docs": "/docs",
         "redoc": "/redoc",
     }
+
+
+@app.get("/ready")
+def ready():
+    # Resolved here rather than through Depends so that a service that
+    # cannot be built (e.g. Milvus unreachable) reports 503, not 500
+    try:
+        semantic_search_service = get_semantic_search_service()
+        is_ready = semantic_search_service.is_ready()
+    except Exception as e:
+        logger.warning(f"Readiness check failed: {e}")
+        return JSONResponse(status_code=503, content={"status": "unavailable"})
+    if not is_ready:
+        return JSONResponse(status_code=503, content={"status": "loading"})
+    return {"status": "ready"}
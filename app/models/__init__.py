@@ -3,3 +3,4 @@ from app.models.product import Product
 from app.models.product_category import ProductCategory
 from app.models.user import User
 from app.models.product_image import ProductImage
+from app.models.embedding_cache import EmbeddingCacheEntry
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, LargeBinary, String
+from app.db.base_class import Base
+
+
+class EmbeddingCacheEntry(Base):
+    """
+    A document embedding keyed by the sha256 of its input, model, dimension
+    and task type, so identical inputs are only ever sent to the provider once.
+    """
+
+    __tablename__ = "embedding_cache"
+
+    key = Column(String(64), unique=True, index=True, nullable=False)
+    model = Column(String, nullable=False)
+    dimension = Column(Integer, nullable=False)
+    task_type = Column(String, nullable=False)
+    # Little-endian float32, see app.services.embedding.cache.pack_vector
+    embedding = Column(LargeBinary, nullable=False)
@@ -1,4 +1,14 @@
-from sqlalchemy import Column, SmallInteger, String, Float, Integer
+from sqlalchemy import (
+    JSON,
+    Column,
+    Float,
+    Index,
+    Integer,
+    SmallInteger,
+    String,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 
@@ -7,6 +17,35 @@ from app.models.product_image import ProductImage
 
 class Product(Base):
     __tablename__ = "products"
+    # Keyset pagination keys, see app.repositories.product.SORT_KEYS, plus
+    # partial copies for the in_stock filter
+    __table_args__ = (
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index(
+            "ix_products_in_stock_id",
+            "id",
+            postgresql_where=text("stock_quantity > 0"),
+        ),
+        Index(
+            "ix_products_in_stock_price_id",
+            "price",
+            "id",
+            postgresql_where=text("stock_quantity > 0"),
+        ),
+        Index(
+            "ix_products_in_stock_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("stock_quantity > 0"),
+        ),
+        Index(
+            "ix_products_out_of_stock_id",
+            "id",
+            postgresql_where=text("stock_quantity = 0"),
+        ),
+        Index("ix_products_category_ids", "category_ids", postgresql_using="gin"),
+    )
 
     EMBEDDING_STATUS_PENDING = 0
     EMBEDDING_STATUS_GENERATED = 1
@@ -20,6 +59,14 @@ class Product(Base):
     embedding_status = Column(
         SmallInteger, nullable=False, default=EMBEDDING_STATUS_PENDING
     )
+    # Sorted ids of `categories`, denormalized for join-free category
+    # filters. Filled for existing rows by its migration, written by
+    # ProductService, and repairable with the backfill_category_ids command.
+    category_ids = Column(
+        ARRAY(Integer).with_variant(JSON, "sqlite"),
+        nullable=False,
+        default=list,
+    )
 
     images = relationship("ProductImage", back_populates="product")
 
@@ -1,10 +1,18 @@
-from sqlalchemy import Column, ForeignKey, Integer
+from sqlalchemy import Column, ForeignKey, Index, Integer
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 
 
 class ProductCategory(Base):
     __tablename__ = "product_categories"
+    __table_args__ = (
+        Index(
+            "ix_product_categories_category_id_product_id", "category_id", "product_id"
+        ),
+        Index(
+            "ix_product_categories_product_id_category_id", "product_id", "category_id"
+        ),
+    )
 
     product_id = Column(
         Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False
@@ -7,7 +7,10 @@ class ProductImage(Base):
     __tablename__ = "product_images"
 
     product_id = Column(
-        Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False
+        Integer,
+        ForeignKey("products.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
     image_url = Column(String, nullable=False)
 
@@ -0,0 +1,43 @@
+from typing import Dict, Iterable, List
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.models.embedding_cache import EmbeddingCacheEntry
+
+
+class EmbeddingCacheRepository:
+    def __init__(self) -> None:
+        self.model = EmbeddingCacheEntry
+
+    def get_many(self, db: Session, keys: Iterable[str]) -> Dict[str, bytes]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        rows = (
+            db.query(self.model.key, self.model.embedding)
+            .filter(self.model.key.in_(keys))
+            .all()
+        )
+        return {row.key: row.embedding for row in rows}
+
+    def put_many(self, db: Session, entries: List[dict]) -> None:
+        """
+        Store entries, keeping the existing row when another worker has
+        already cached the same key.
+        """
+        if not entries:
+            return
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(
+                pg_insert(self.model)
+                .values(entries)
+                .on_conflict_do_nothing(index_elements=["key"])
+            )
+        else:
+            existing = self.get_many(db, [entry["key"] for entry in entries])
+            db.add_all(
+                self.model(**entry) for entry in entries if entry["key"] not in existing
+            )
+        db.commit()
+
+
+embedding_cache_repository = EmbeddingCacheRepository()
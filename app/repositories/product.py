@@ -1,9 +1,192 @@
+import math
+from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple, Union
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, false, func, literal, literal_column, or_, tuple_
+from sqlalchemy.orm import Query, Session, selectinload
 from fastapi.encoders import jsonable_encoder
 from app.models.product import Product
 from app.models.category import Category
+from app.repositories.product_count import product_counter
+from app.utils.cursor import decode_cursor, encode_cursor
+
+# Must match the expression of the ix_products_search_document GIN index
+# exactly, otherwise Postgres cannot use the index.
+FTS_CONFIG = literal_column("'english'::regconfig")
+
+
+def search_document():
+    return func.to_tsvector(
+        FTS_CONFIG,
+        func.coalesce(Product.name, "") + " " + func.coalesce(Product.description, ""),
+    )
+
+
+# Name search modes: substring ILIKE, or pg_trgm word similarity (typo
+# tolerant). Both are served by the ix_products_*_trgm GIN indexes.
+SEARCH_MODES = ("contains", "trigram")
+# Description matches count for less than name matches in the relevance score
+DESCRIPTION_WEIGHT = 0.5
+
+
+def is_postgresql(db: Session) -> bool:
+    """Trigram search and category_ids filters need Postgres."""
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def trigram_match(term: str):
+    """`term` is word-similar to the name or description (pg_trgm `<%`)."""
+    return or_(
+        literal(term).op("<%")(Product.name),
+        literal(term).op("<%")(Product.description),
+    )
+
+
+def trigram_relevance(term: str):
+    # greatest() skips the NULL similarity of products without a description
+    return func.greatest(
+        func.word_similarity(term, Product.name),
+        func.word_similarity(term, Product.description) * DESCRIPTION_WEIGHT,
+    )
+
+
+CATEGORY_MATCHES = ("all", "any")
+
+
+def category_filter(db: Session, names: List[str], match: str = "all"):
+    """
+    Products in all (or, with match="any", at least one) of the named
+    categories. On Postgres this is a containment or overlap test on the
+    GIN-indexed category_ids column, with no join; elsewhere it falls back
+    to EXISTS subqueries over product_categories.
+    """
+    names = list(dict.fromkeys(names))
+    if is_postgresql(db):
+        ids = [
+            row.id for row in db.query(Category.id).filter(Category.name.in_(names))
+        ]
+        if match == "any":
+            return Product.category_ids.overlap(ids) if ids else false()
+        if len(ids) < len(names):
+            # An unknown category can never be matched
+            return false()
+        return Product.category_ids.contains(ids)
+
+    if match == "any":
+        return Product.categories.any(Category.name.in_(names))
+    return and_(*[Product.categories.any(Category.name == name) for name in names])
+
+
+# Sort name -> (key columns, descending). The trailing id makes every key
+# unique so keyset pages never skip or repeat rows; each key has a matching
+# composite index.
+SORT_KEYS = {
+    "default": ((Product.id,), False),
+    "price_asc": ((Product.price, Product.id), False),
+    "price_desc": ((Product.price, Product.id), True),
+    "newest": ((Product.created_at, Product.id), True),
+}
+
+
+def _sort_name(sort_by: Optional[str], relevance=None) -> str:
+    if sort_by == "relevance" and relevance is not None:
+        return "relevance"
+    return sort_by if sort_by in SORT_KEYS else "default"
+
+
+def _key_values(product: Product, columns) -> List[Any]:
+    values = [getattr(product, column.key) for column in columns]
+    return [
+        value.isoformat() if isinstance(value, datetime) else value for value in values
+    ]
+
+
+def _parse_key_value(value: Any, column) -> Any:
+    """Check a client-supplied key value against its column's type."""
+    key = getattr(column, "key", None)
+    if key == "created_at":
+        if not isinstance(value, str):
+            raise ValueError("Invalid cursor")
+        return datetime.fromisoformat(value)
+    if key == "id":
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError("Invalid cursor")
+        return value
+    # price and the relevance score
+    if (
+        isinstance(value, bool)
+        or not isinstance(value, (int, float))
+        or not math.isfinite(value)
+    ):
+        raise ValueError("Invalid cursor")
+    return value
+
+
+def _parse_key_values(values: List[Any], columns) -> List[Any]:
+    if len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+    return [_parse_key_value(value, column) for value, column in zip(values, columns)]
+
+
+def paginate(
+    query: Query,
+    *,
+    sort_by: Optional[str],
+    skip: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    relevance=None,
+) -> Tuple[List[Product], Optional[str]]:
+    """
+    Order `query` by the sort key and return one page plus the cursor for
+    the next page (None on the last page). With a cursor the page starts
+    right after the cursor's row (an index range scan); without one the
+    legacy offset is applied. Raises ValueError for a bad cursor.
+
+    `relevance` is a score expression enabling the "relevance" sort (best
+    first, ties by id); without it that sort falls back to the default.
+    """
+    sort = _sort_name(sort_by, relevance)
+    if sort == "relevance":
+        columns, descending = (relevance, Product.id), True
+        # The score rides along with each row so the cursor can hold it
+        query = query.add_columns(relevance.label("relevance"))
+    else:
+        columns, descending = SORT_KEYS[sort]
+    query = query.order_by(
+        *[column.desc() if descending else column.asc() for column in columns]
+    )
+
+    if cursor is not None:
+        values = _parse_key_values(decode_cursor(cursor, sort), columns)
+        key, after = tuple_(*columns), tuple_(*values)
+        query = query.filter(key < after if descending else key > after)
+    elif skip:
+        query = query.offset(skip)
+
+    rows = with_relations(query).limit(limit + 1).all()
+    next_cursor = None
+    if sort == "relevance":
+        products = [row[0] for row in rows[:limit]]
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(sort, [last.relevance, last[0].id])
+        return products, next_cursor
+
+    products = rows[:limit]
+    if len(rows) > limit:
+        next_cursor = encode_cursor(sort, _key_values(products[-1], columns))
+    return products, next_cursor
+
+
+def with_relations(query: Query) -> Query:
+    """
+    Load the relationships the Product schema serializes up front: one extra
+    query per relationship for the whole page instead of one per product.
+    """
+    return query.options(
+        selectinload(Product.categories), selectinload(Product.images)
+    )
 
 
 class ProductRepository:
@@ -11,7 +194,9 @@ class ProductRepository:
         self.model = Product
 
     def get_by_uuid(self, db: Session, *, uuid: UUID) -> Optional[Product]:
-        return db.query(self.model).filter(self.model.uuid == uuid).first()
+        return with_relations(
+            db.query(self.model).filter(self.model.uuid == uuid)
+        ).first()
 
     def create(self, db: Session, *, obj_in: Dict[str, Any]) -> Product:
         obj_in_data = jsonable_encoder(obj_in)
@@ -57,26 +242,19 @@ class ProductRepository:
         skip: int = 0,
         limit: int = 20,
         sort_by: Optional[str] = None,
-    ) -> Tuple[List[Product], int]:
-        query = (
-            db.query(Product)
-            .join(Product.categories)
-            .filter(Category.name == category_name)
-        )
-
-        # Apply sorting
-        if sort_by:
-            if sort_by == "price_asc":
-                query = query.order_by(Product.price.asc())
-            elif sort_by == "price_desc":
-                query = query.order_by(Product.price.desc())
-            elif sort_by == "newest":
-                query = query.order_by(Product.created_at.desc())
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+    ) -> Tuple[List[Product], Optional[int], Optional[str]]:
+        query = db.query(Product).filter(category_filter(db, [category_name]))
 
-        total = query.count()
-        products = query.offset(skip).limit(limit).all()
+        total = None
+        if include_total:
+            total = product_counter.count(db, query, ("category", category_name))
+        products, next_cursor = paginate(
+            query, sort_by=sort_by, skip=skip, limit=limit, cursor=cursor
+        )
 
-        return products, total
+        return products, total, next_cursor
 
     def get_products(
         self,
@@ -90,14 +268,40 @@ class ProductRepository:
         max_price: Optional[float] = None,
         sort_by: Optional[str] = None,
         in_stock: Optional[bool] = None,
-    ) -> Tuple[List[Product], int]:
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        search_mode: str = "contains",
+        categories: Optional[List[str]] = None,
+        category_match: str = "all",
+    ) -> Tuple[List[Product], Optional[int], Optional[str]]:
+        """
+        Filtered product listing. `search_mode` selects how `name` matches:
+        "contains" is a case-insensitive substring match on the name,
+        "trigram" a typo-tolerant word-similarity match on name or
+        description. The "relevance" sort ranks by trigram similarity to
+        `name`. Trigram features need Postgres; other databases fall back
+        to "contains" and the default order.
+
+        `category` and `categories` together name the categories to filter
+        on; `category_match` says whether products need all or any of them.
+        """
         query = db.query(self.model)
+        trigram = is_postgresql(db) and bool(name)
+        if search_mode not in SEARCH_MODES:
+            search_mode = "contains"
+        if category_match not in CATEGORY_MATCHES:
+            category_match = "all"
+        category_names = sorted(
+            {name for name in [category, *(categories or [])] if name}
+        )
 
         # Apply filters
-        if name:
+        if name and search_mode == "trigram" and trigram:
+            query = query.filter(trigram_match(name))
+        elif name:
             query = query.filter(self.model.name.ilike(f"%{name}%"))
-        if category:
-            query = query.join(self.model.categories).filter(Category.name == category)
+        if category_names:
+            query = query.filter(category_filter(db, category_names, category_match))
         if min_price is not None:
             query = query.filter(self.model.price >= min_price)
         if max_price is not None:
@@ -108,21 +312,59 @@ class ProductRepository:
             else:
                 query = query.filter(self.model.stock_quantity == 0)
 
-        # Apply sorting
-        if sort_by == "price_asc":
-            query = query.order_by(self.model.price.asc())
-        elif sort_by == "price_desc":
-            query = query.order_by(self.model.price.desc())
-        elif sort_by == "newest":
-            query = query.order_by(self.model.created_at.desc())
-
         # Get total count before pagination
-        total = query.count()
+        total = None
+        if include_total:
+            filters = (name, min_price, max_price, in_stock)
+            signature = (
+                "products",
+                search_mode,
+                name.strip().lower() if name else None,
+                *filters[1:],
+                tuple(category_names),
+                category_match if len(category_names) > 1 else None,
+            )
+            filtered = bool(category_names) or any(f is not None for f in filters)
+            total = product_counter.count(db, query, signature, filtered=filtered)
+
+        products, next_cursor = paginate(
+            query,
+            sort_by=sort_by,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            relevance=trigram_relevance(name) if trigram else None,
+        )
+
+        return products, total, next_cursor
 
-        # Apply pagination
-        query = query.offset(skip).limit(limit)
+    def search_lexical(
+        self,
+        db: Session,
+        *,
+        query: str,
+        limit: int = 50,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> List[Tuple[UUID, float]]:
+        """
+        Full-text search over product name and description, best match first.
+        Returns (uuid, rank) pairs.
+        """
+        ts_query = func.websearch_to_tsquery(FTS_CONFIG, query)
+        document = search_document()
+        rank = func.ts_rank_cd(document, ts_query)
+
+        q = db.query(self.model.uuid, rank.label("rank")).filter(
+            document.op("@@")(ts_query)
+        )
+        if min_price is not None:
+            q = q.filter(self.model.price >= min_price)
+        if max_price is not None:
+            q = q.filter(self.model.price <= max_price)
 
-        return query.all(), total
+        rows = q.order_by(rank.desc(), self.model.id).limit(limit).all()
+        return [(row.uuid, float(row.rank)) for row in rows]
 
 
 product_repository = ProductRepository()
@@ -0,0 +1,91 @@
+import json
+import logging
+from typing import Hashable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import settings
+from app.utils.lru_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class ProductCounter:
+    """
+    Totals for product listings according to PRODUCT_COUNT_STRATEGY:
+
+    - "exact": COUNT(*) of the filtered query on every request.
+    - "cached": exact counts memoized per filter signature for
+      PRODUCT_COUNT_CACHE_TTL_SECONDS. The cache is per process and
+      invalidate() only clears it in the process that wrote: other API
+      workers, and CLI writes such as the seed, keep serving stale totals
+      until the TTL expires.
+    - "estimated": the Postgres planner's row estimate (pg_class.reltuples
+      for unfiltered listings). Estimates below
+      PRODUCT_COUNT_EXACT_THRESHOLD are replaced by an exact count, which is
+      cheap at that size. Other databases always count exactly.
+    """
+
+    def __init__(self) -> None:
+        self._cache = TTLCache(
+            max_items=settings.PRODUCT_COUNT_CACHE_MAX_ITEMS,
+            ttl_seconds=settings.PRODUCT_COUNT_CACHE_TTL_SECONDS,
+        )
+
+    def count(
+        self,
+        db: Session,
+        query: Query,
+        signature: Hashable,
+        filtered: bool = True,
+    ) -> int:
+        strategy = settings.PRODUCT_COUNT_STRATEGY
+        if strategy == "cached":
+            total = self._cache.get(signature)
+            if total is None:
+                total = query.count()
+                self._cache.set(signature, total)
+            return total
+        if strategy == "estimated" and db.get_bind().dialect.name == "postgresql":
+            estimate = self._estimate(db, query, filtered)
+            if (
+                estimate is not None
+                and estimate >= settings.PRODUCT_COUNT_EXACT_THRESHOLD
+            ):
+                return estimate
+        return query.count()
+
+    def invalidate(self) -> None:
+        self._cache.clear()
+
+    @staticmethod
+    def _estimate(db: Session, query: Query, filtered: bool) -> Optional[int]:
+        try:
+            # A savepoint keeps a failed estimate from aborting the transaction
+            with db.begin_nested():
+                if not filtered:
+                    reltuples = db.execute(
+                        text(
+                            "SELECT reltuples FROM pg_class "
+                            "WHERE oid = 'products'::regclass"
+                        )
+                    ).scalar()
+                    # -1 until the table has been analyzed
+                    if reltuples is None or reltuples < 0:
+                        return None
+                    return int(reltuples)
+
+                compiled = query.statement.compile(dialect=db.get_bind().dialect)
+                plan = db.connection().exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+                ).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            logger.warning(f"Product count estimate failed, counting exactly: {e}")
+            return None
+
+
+product_counter = ProductCounter()
@@ -57,6 +57,9 @@ class Product(ProductInDBBase):
 
 
 class ProductList(BaseModel):
-    total_products: int
-    total_pages: int
+    # None when requested with include_total=false
+    total_products: Optional[int] = None
+    total_pages: Optional[int] = None
     products: List[Product]
+    # Pass as `cursor` to fetch the next page; None on the last page
+    next_cursor: Optional[str] = None
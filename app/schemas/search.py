@@ -1,7 +1,9 @@
-from typing import List
-from pydantic import BaseModel
+from typing import Annotated, List, Optional
+from pydantic import BaseModel, Field
 from app.schemas.product import Product
 
+MAX_BATCH_QUERIES = 50
+
 
 class SearchResult(BaseModel):
     product: Product
@@ -15,3 +17,15 @@ class SearchResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class BatchSearchRequest(BaseModel):
+    queries: List[Annotated[str, Field(min_length=1)]] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_QUERIES
+    )
+    limit: int = Field(10, ge=1, le=100)
+    score_threshold: Optional[float] = Field(None, ge=0.0, le=1.0)
+
+
+class BatchSearchResponse(BaseModel):
+    results: List[SearchResponse]
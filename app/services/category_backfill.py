@@ -0,0 +1,65 @@
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.product import Product
+from app.models.product_category import ProductCategory
+from app.repositories.product_count import product_counter
+
+logger = logging.getLogger(__name__)
+
+
+def backfill_category_ids(
+    db: Session,
+    *,
+    batch_size: int = 1000,
+    on_batch: Optional[Callable[[int, int], None]] = None,
+) -> int:
+    """
+    Rebuild Product.category_ids from product_categories, walking products
+    by primary key and committing once per batch. Only rows whose ids
+    changed are written. Returns the number of products updated;
+    `on_batch(scanned, updated)` is called after every batch.
+    """
+    last_id, scanned, updated = 0, 0, 0
+    while True:
+        rows = (
+            db.query(Product.id, Product.category_ids)
+            .filter(Product.id > last_id)
+            .order_by(Product.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        last_id = rows[-1].id
+        scanned += len(rows)
+
+        memberships: Dict[int, List[int]] = defaultdict(list)
+        for product_id, category_id in (
+            db.query(ProductCategory.product_id, ProductCategory.category_id)
+            .filter(ProductCategory.product_id.in_([row.id for row in rows]))
+            .all()
+        ):
+            memberships[product_id].append(category_id)
+
+        changes = []
+        for row in rows:
+            category_ids = sorted(set(memberships.get(row.id, [])))
+            if list(row.category_ids or []) != category_ids:
+                changes.append({"id": row.id, "category_ids": category_ids})
+        if changes:
+            db.execute(update(Product), changes)
+            db.commit()
+            updated += len(changes)
+        if on_batch:
+            on_batch(scanned, updated)
+
+    if updated:
+        # Category totals changed; API workers still wait out the TTL
+        product_counter.invalidate()
+    logger.info(f"Category id backfill: {updated} of {scanned} products updated")
+    return updated
@@ -1,4 +1,35 @@
-from app.services.embedding.base import EmbeddingService
+from typing import Optional
+
+from app.core.config import settings
+from app.services.embedding.base import EmbeddingResult, EmbeddingService
+from app.services.embedding.cache import QueryEmbeddingCache
+from app.services.embedding.document_cache import (
+    CachedEmbeddingService,
+    build_document_embedding_service,
+)
 from app.services.embedding.gemini import GeminiEmbeddingService
+from app.services.embedding.local import LocalEmbeddingService
+
+
+def create_embedding_service(
+    query_cache: Optional[QueryEmbeddingCache] = None,
+) -> EmbeddingService:
+    provider = settings.EMBEDDING_PROVIDER
+    if provider == "gemini":
+        return GeminiEmbeddingService(query_cache=query_cache)
+    if provider == "local":
+        # Local embeddings are cheaper to recompute than to look up
+        return LocalEmbeddingService()
+    raise ValueError(f"Unknown EMBEDDING_PROVIDER: {provider}")
+
 
-__all__ = ["EmbeddingService", "GeminiEmbeddingService"]
+__all__ = [
+    "CachedEmbeddingService",
+    "EmbeddingResult",
+    "EmbeddingService",
+    "GeminiEmbeddingService",
+    "LocalEmbeddingService",
+    "QueryEmbeddingCache",
+    "build_document_embedding_service",
+    "create_embedding_service",
+]
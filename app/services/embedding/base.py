@@ -1,5 +1,22 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
+
+
+class EmbeddingResult:
+    """Outcome of embedding one item of a batch."""
+
+    def __init__(
+        self,
+        embedding: Optional[List[float]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        self.embedding = embedding
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.embedding is not None
 
 
 class EmbeddingService(ABC):
@@ -9,6 +26,9 @@ class EmbeddingService(ABC):
     (Gemini, OpenAI, Cohere, etc.)
     """
 
+    # Provider model identifier; part of persistent cache keys
+    model: str = ""
+
     @abstractmethod
     def generate_embedding(
         self, text: dict, task_type: str = "retrieval_document"
@@ -25,6 +45,69 @@ class EmbeddingService(ABC):
         """
         pass
 
+    def generate_embeddings(
+        self, texts: List[dict], task_type: str = "retrieval_document"
+    ) -> List[EmbeddingResult]:
+        """
+        Generate embedding vectors for many texts. Providers that accept
+        multiple contents per request should override this to batch calls.
+
+        Args:
+            texts: A list of dicts with "text" and "title" keys
+            task_type: Optional task type (see generate_embedding)
+
+        Returns:
+            One EmbeddingResult per input, in input order; a failed item
+            carries an error message instead of an embedding
+        """
+        results = []
+        for text in texts:
+            try:
+                results.append(EmbeddingResult(self.generate_embedding(text, task_type)))
+            except Exception as e:
+                results.append(EmbeddingResult(error=str(e)))
+        return results
+
+    def generate_query_embedding(self, text: str) -> List[float]:
+        """
+        Generate an embedding vector for a search query.
+
+        Args:
+            text: The (price-cleaned) query text
+
+        Returns:
+            A list of floats representing the embedding vector
+        """
+        return self.generate_embedding({"text": text, "title": ""}, "retrieval_query")
+
+    async def agenerate_query_embedding(self, text: str) -> List[float]:
+        """
+        Async variant of generate_query_embedding. Providers with a native
+        async client should override this; the default runs the sync call
+        in a worker thread.
+        """
+        return await asyncio.to_thread(self.generate_query_embedding, text)
+
+    def generate_query_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for several search queries, preserving order.
+        Providers that accept multiple contents per request should override
+        this to make a single call.
+
+        Args:
+            texts: The (price-cleaned) query texts
+
+        Returns:
+            One embedding vector per input text
+        """
+        return [self.generate_query_embedding(text) for text in texts]
+
+    async def agenerate_query_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Async variant of generate_query_embeddings.
+        """
+        return await asyncio.to_thread(self.generate_query_embeddings, texts)
+
     @abstractmethod
     def get_embedding_dimension(self) -> int:
         """
@@ -34,3 +117,16 @@ class EmbeddingService(ABC):
             The dimension of the embedding vectors
         """
         pass
+
+    def close(self) -> None:
+        """
+        Release any network resources held by the service.
+        Implementations that keep long-lived clients should override this.
+        """
+        pass
+
+    async def aclose(self) -> None:
+        """
+        Release sync and async network resources held by the service.
+        """
+        self.close()
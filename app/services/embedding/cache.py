@@ -0,0 +1,114 @@
+import hashlib
+import logging
+import struct
+import threading
+from typing import List, Optional
+
+import redis
+
+from app.core.config import settings
+from app.utils.lru_cache import TTLCache
+from app.utils.query_text import normalize_query
+
+logger = logging.getLogger(__name__)
+
+
+def pack_vector(vector: List[float]) -> bytes:
+    return struct.pack(f"<{len(vector)}f", *vector)
+
+
+def unpack_vector(data: bytes) -> List[float]:
+    return list(struct.unpack(f"<{len(data) // 4}f", data))
+
+
+class QueryEmbeddingCache:
+    """
+    Two-tier cache for query embeddings: a bounded in-process LRU backed by
+    an optional shared Redis tier. Vectors are stored as packed float32.
+    """
+
+    KEY_PREFIX = "qemb"
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        max_bytes: int,
+        redis_url: Optional[str] = None,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._local = TTLCache(ttl_seconds=ttl_seconds, max_bytes=max_bytes, sizeof=len)
+        self._redis = redis.Redis.from_url(redis_url) if redis_url else None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.redis_errors = 0
+
+    def make_key(
+        self, text: str, model: str, dimension: int, task_type: str
+    ) -> str:
+        digest = hashlib.sha256(normalize_query(text).encode("utf-8")).hexdigest()
+        return f"{self.KEY_PREFIX}:{model}:{dimension}:{task_type}:{digest}"
+
+    def get(self, key: str) -> Optional[List[float]]:
+        data = self._local.get(key)
+        if data is not None:
+            self._count("hits")
+            return unpack_vector(data)
+
+        if self._redis is not None:
+            try:
+                data = self._redis.get(key)
+            except Exception as e:
+                self._count("redis_errors")
+                logger.warning(f"Query embedding cache Redis read failed: {e}")
+                data = None
+            if data is not None:
+                self._count("redis_hits")
+                self._local.set(key, data)
+                return unpack_vector(data)
+
+        self._count("misses")
+        return None
+
+    def set(self, key: str, vector: List[float]) -> None:
+        data = pack_vector(vector)
+        self._local.set(key, data)
+        if self._redis is not None:
+            try:
+                self._redis.set(key, data, ex=self.ttl_seconds)
+            except Exception as e:
+                self._count("redis_errors")
+                logger.warning(f"Query embedding cache Redis write failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.redis_hits) / lookups if lookups else 0.0,
+            "redis_errors": self.redis_errors,
+            "entries": len(self._local),
+            "size_bytes": self._local.size_bytes,
+            "evictions": self._local.evictions,
+        }
+
+    def close(self) -> None:
+        if self._redis is not None:
+            self._redis.close()
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+def build_query_embedding_cache() -> Optional[QueryEmbeddingCache]:
+    if not settings.QUERY_EMBEDDING_CACHE_ENABLED:
+        return None
+    redis_url = settings.REDIS_URL if settings.QUERY_EMBEDDING_CACHE_USE_REDIS else None
+    return QueryEmbeddingCache(
+        ttl_seconds=settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+        max_bytes=settings.QUERY_EMBEDDING_CACHE_MAX_BYTES,
+        redis_url=redis_url,
+    )
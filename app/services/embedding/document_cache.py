@@ -0,0 +1,159 @@
+import hashlib
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.repositories.embedding_cache import embedding_cache_repository
+from app.services.embedding.base import EmbeddingResult, EmbeddingService
+from app.services.embedding.cache import pack_vector, unpack_vector
+from app.services.embedding.gemini import document_content
+
+logger = logging.getLogger(__name__)
+
+
+class CachedEmbeddingService(EmbeddingService):
+    """
+    Wraps a provider and stores document embeddings in Postgres, keyed by the
+    hash of the exact content sent to the provider plus model, dimension and
+    task type. Re-embedding unchanged products, and duplicate descriptions within
+    a batch, cost no provider calls. Query embeddings pass straight through.
+    """
+
+    def __init__(
+        self,
+        inner: EmbeddingService,
+        session_factory: Callable[[], Session],
+    ) -> None:
+        self.inner = inner
+        self.model = inner.model
+        self._session_factory = session_factory
+        self.hits = 0
+        self.misses = 0
+        # Workers embed batches from several threads
+        self._stats_lock = threading.Lock()
+
+    def make_key(self, text: dict, task_type: str) -> str:
+        # Same provider input, same vector: hash what the provider embeds
+        # rather than the raw fields
+        digest = hashlib.sha256(document_content(text).encode("utf-8")).hexdigest()
+        # Model, dimension and task type are hashed in too so the key fits
+        # the fixed-width column
+        return hashlib.sha256(
+            f"{self.model}:{self.get_embedding_dimension()}:{task_type}:{digest}".encode()
+        ).hexdigest()
+
+    def generate_embedding(
+        self, text: dict, task_type: str = "retrieval_document"
+    ) -> List[float]:
+        result = self.generate_embeddings([text], task_type)[0]
+        if not result.ok:
+            raise RuntimeError(f"Failed to generate embedding: {result.error}")
+        return result.embedding
+
+    def generate_embeddings(
+        self, texts: List[dict], task_type: str = "retrieval_document"
+    ) -> List[EmbeddingResult]:
+        keys = [self.make_key(text, task_type) for text in texts]
+        found: Dict[str, EmbeddingResult] = {}
+
+        db = self._session_factory()
+        try:
+            try:
+                cached = embedding_cache_repository.get_many(db, set(keys))
+            except Exception as e:
+                logger.warning(f"Embedding cache lookup failed: {e}")
+                db.rollback()
+                cached = {}
+            for key, blob in cached.items():
+                found[key] = EmbeddingResult(unpack_vector(blob))
+
+            # One provider input per distinct key
+            missing: Dict[str, dict] = {}
+            for key, text in zip(keys, texts):
+                if key not in found:
+                    missing.setdefault(key, text)
+
+            with self._stats_lock:
+                self.hits += len(texts) - sum(1 for key in keys if key in missing)
+                self.misses += len(missing)
+
+            if missing:
+                results = self.inner.generate_embeddings(list(missing.values()), task_type)
+                found.update(zip(missing, results))
+                self._store(db, task_type, missing, found)
+        finally:
+            db.close()
+
+        return [found[key] for key in keys]
+
+    def _store(
+        self,
+        db: Session,
+        task_type: str,
+        keys: Dict[str, dict],
+        results: Dict[str, EmbeddingResult],
+    ) -> None:
+        entries = [
+            {
+                "key": key,
+                "model": self.model,
+                "dimension": len(results[key].embedding),
+                "task_type": task_type,
+                "embedding": pack_vector(results[key].embedding),
+            }
+            for key in keys
+            if results[key].ok
+        ]
+        try:
+            embedding_cache_repository.put_many(db, entries)
+        except Exception as e:
+            # A cache write must never fail the embedding itself
+            logger.warning(f"Embedding cache write failed: {e}")
+            db.rollback()
+
+    def generate_query_embedding(self, text: str) -> List[float]:
+        return self.inner.generate_query_embedding(text)
+
+    async def agenerate_query_embedding(self, text: str) -> List[float]:
+        return await self.inner.agenerate_query_embedding(text)
+
+    def generate_query_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self.inner.generate_query_embeddings(texts)
+
+    async def agenerate_query_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return await self.inner.agenerate_query_embeddings(texts)
+
+    def get_embedding_dimension(self) -> int:
+        return self.inner.get_embedding_dimension()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / total if total else 0.0,
+        }
+
+    def close(self) -> None:
+        self.inner.close()
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+def build_document_embedding_service(
+    inner: EmbeddingService,
+    session_factory: Optional[Callable[[], Session]] = None,
+) -> EmbeddingService:
+    """
+    Wrap `inner` with the persistent document cache unless it is disabled.
+    """
+    if not settings.DOCUMENT_EMBEDDING_CACHE_ENABLED:
+        return inner
+    return CachedEmbeddingService(inner, session_factory or SessionLocal)
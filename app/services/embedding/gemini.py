@@ -1,16 +1,54 @@
-from typing import List
+from typing import List, Optional, Tuple
 from google import genai
-from app.services.embedding.base import EmbeddingService
+from app.services.embedding.base import EmbeddingResult, EmbeddingService
+from app.services.embedding.cache import QueryEmbeddingCache
+from app.services.rate_limit import (
+    RateLimiter,
+    get_gemini_rate_limiter,
+    is_throttle_error,
+)
 from app.core.config import settings
 
+# Inputs longer than this are truncated by the API
+MAX_INPUT_TOKENS = 2048
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for the languages we index
+    return min(MAX_INPUT_TOKENS, len(text) // 4 + 1)
+
+
+def document_content(text: dict) -> str:
+    """
+    Content sent for a document in a batched call. The title is a
+    per-request config option, so it is folded into the content using the
+    format recommended for Gemini document embeddings.
+    """
+    if text.get("title"):
+        return f"title: {text['title']} | text: {text['text']}"
+    return text["text"]
+
 
 class GeminiEmbeddingService(EmbeddingService):
-    def __init__(self):
+    def __init__(
+        self,
+        query_cache: Optional[QueryEmbeddingCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
         api_key = settings.GEMINI_API_KEY
 
-        self.client = genai.Client(api_key=api_key)
+        self.client = genai.Client(
+            api_key=api_key,
+            http_options=genai.types.HttpOptions(
+                timeout=int(settings.PROVIDER_HTTP_TIMEOUT_SECONDS * 1000)
+            ),
+        )
         self.model = "gemini-embedding-001"
         self._dimension = 768
+        self.query_cache = query_cache
+        self.rate_limiter = rate_limiter or get_gemini_rate_limiter()
+        self.max_batch_items = settings.GEMINI_EMBEDDING_MAX_BATCH_ITEMS
+        self.max_batch_tokens = settings.GEMINI_EMBEDDING_MAX_BATCH_TOKENS
 
     def generate_embedding(
         self,
@@ -18,28 +56,228 @@ class GeminiEmbeddingService(EmbeddingService):
         task_type: str = "retrieval_document",
         config: genai.types.EmbedContentConfig = None,
     ) -> List[float]:
+        if config is None:
+            # Documents go through the batch path so single and bulk
+            # embeddings of the same product are identical.
+            result = self.generate_embeddings([text], task_type)[0]
+            if not result.ok:
+                raise RuntimeError(f"Failed to generate embedding: {result.error}")
+            return result.embedding
+
         try:
-            if config is None:
-                config = genai.types.EmbedContentConfig(
-                    task_type=task_type,
-                    output_dimensionality=self._dimension,
-                    title=text["title"],
+            with self.rate_limiter.limit(estimate_tokens(text["text"])):
+                result = self.client.models.embed_content(
+                    model=self.model, contents=text["text"], config=config
                 )
-            result = self.client.models.embed_content(
-                model=self.model, contents=text["text"], config=config
-            )
-            if result.embeddings and len(result.embeddings) > 0:
-                return result.embeddings[0].values
-            else:
-                raise RuntimeError("No embeddings returned from API")
+            return self._first_embedding(result)
         except Exception as e:
             raise RuntimeError(f"Failed to generate embedding: {str(e)}")
 
-    def generate_query_embedding(self, text: str) -> List[float]:
+    def generate_embeddings(
+        self, texts: List[dict], task_type: str = "retrieval_document"
+    ) -> List[EmbeddingResult]:
+        results: List[Optional[EmbeddingResult]] = [None] * len(texts)
+        contents = [document_content(text) for text in texts]
+
+        pending = []
+        for index, content in enumerate(contents):
+            if content.strip():
+                pending.append(index)
+            else:
+                results[index] = EmbeddingResult(error="Empty text")
+
         config = genai.types.EmbedContentConfig(
-            task_type="retrieval_query", output_dimensionality=self._dimension
+            task_type=task_type, output_dimensionality=self._dimension
+        )
+        for chunk in self._chunks(pending, contents):
+            self._embed_chunk(chunk, contents, config, results)
+        return results
+
+    def _embed_chunk(
+        self,
+        chunk: List[int],
+        contents: List[str],
+        config: genai.types.EmbedContentConfig,
+        results: List[Optional[EmbeddingResult]],
+    ) -> None:
+        try:
+            with self.rate_limiter.limit(
+                sum(estimate_tokens(contents[index]) for index in chunk)
+            ):
+                response = self.client.models.embed_content(
+                    model=self.model,
+                    contents=[contents[index] for index in chunk],
+                    config=config,
+                )
+            if not response.embeddings or len(response.embeddings) != len(chunk):
+                raise RuntimeError(
+                    "Embedding API returned an unexpected number of vectors"
+                )
+            for index, embedding in zip(chunk, response.embeddings):
+                results[index] = EmbeddingResult(embedding.values)
+        except Exception as e:
+            # A rejected document fails the whole request; bisect so only it
+            # fails. Throttling is not about the content and is not retried.
+            if len(chunk) > 1 and not is_throttle_error(e):
+                middle = len(chunk) // 2
+                self._embed_chunk(chunk[:middle], contents, config, results)
+                self._embed_chunk(chunk[middle:], contents, config, results)
+                return
+            for index in chunk:
+                results[index] = EmbeddingResult(
+                    error=f"Failed to generate embedding: {str(e)}"
+                )
+
+    def generate_query_embedding(self, text: str) -> List[float]:
+        cache_key = self._query_cache_key(text)
+        if cache_key is not None:
+            cached = self.query_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        embedding = self.generate_embedding(
+            {"text": text, "title": ""}, "retrieval_query", self._query_config()
         )
-        return self.generate_embedding({"text": text, "title": ""}, "retrieval_query", config)
+        if cache_key is not None:
+            self.query_cache.set(cache_key, embedding)
+        return embedding
+
+    async def agenerate_query_embedding(self, text: str) -> List[float]:
+        cache_key = self._query_cache_key(text)
+        if cache_key is not None:
+            cached = self.query_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            async with self.rate_limiter.alimit(estimate_tokens(text)):
+                result = await self.client.aio.models.embed_content(
+                    model=self.model, contents=text, config=self._query_config()
+                )
+            embedding = self._first_embedding(result)
+        except Exception as e:
+            raise RuntimeError(f"Failed to generate embedding: {str(e)}")
+
+        if cache_key is not None:
+            self.query_cache.set(cache_key, embedding)
+        return embedding
+
+    def generate_query_embeddings(self, texts: List[str]) -> List[List[float]]:
+        embeddings, missing = self._cached_query_embeddings(texts)
+        if missing:
+            try:
+                with self.rate_limiter.limit(self._tokens(missing)):
+                    result = self.client.models.embed_content(
+                        model=self.model, contents=missing, config=self._query_config()
+                    )
+            except Exception as e:
+                raise RuntimeError(f"Failed to generate embeddings: {str(e)}")
+            self._fill_query_embeddings(texts, embeddings, missing, result)
+        return embeddings
+
+    async def agenerate_query_embeddings(self, texts: List[str]) -> List[List[float]]:
+        embeddings, missing = self._cached_query_embeddings(texts)
+        if missing:
+            try:
+                async with self.rate_limiter.alimit(self._tokens(missing)):
+                    result = await self.client.aio.models.embed_content(
+                        model=self.model, contents=missing, config=self._query_config()
+                    )
+            except Exception as e:
+                raise RuntimeError(f"Failed to generate embeddings: {str(e)}")
+            self._fill_query_embeddings(texts, embeddings, missing, result)
+        return embeddings
 
     def get_embedding_dimension(self) -> int:
         return self._dimension
+
+    def close(self) -> None:
+        self.client.close()
+        if self.query_cache is not None:
+            self.query_cache.close()
+
+    async def aclose(self) -> None:
+        await self.client.aio.aclose()
+        self.close()
+
+    def _chunks(self, indexes: List[int], contents: List[str]) -> List[List[int]]:
+        """
+        Split items into requests that respect the per-request item and
+        token limits, preserving order.
+        """
+        chunks: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for index in indexes:
+            tokens = estimate_tokens(contents[index])
+            if current and (
+                len(current) >= self.max_batch_items
+                or current_tokens + tokens > self.max_batch_tokens
+            ):
+                chunks.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            chunks.append(current)
+        return chunks
+
+    @staticmethod
+    def _tokens(texts: List[str]) -> int:
+        return sum(estimate_tokens(text) for text in texts)
+
+    def _query_config(self) -> genai.types.EmbedContentConfig:
+        return genai.types.EmbedContentConfig(
+            task_type="retrieval_query", output_dimensionality=self._dimension
+        )
+
+    def _query_cache_key(self, text: str) -> Optional[str]:
+        if self.query_cache is None:
+            return None
+        return self.query_cache.make_key(
+            text, self.model, self._dimension, "retrieval_query"
+        )
+
+    def _cached_query_embeddings(
+        self, texts: List[str]
+    ) -> Tuple[List[Optional[List[float]]], List[str]]:
+        """
+        Look up each text in the query cache. Returns the partially filled
+        embedding list and the distinct texts that still need the API.
+        """
+        embeddings: List[Optional[List[float]]] = []
+        missing: List[str] = []
+        for text in texts:
+            cache_key = self._query_cache_key(text)
+            cached = self.query_cache.get(cache_key) if cache_key else None
+            embeddings.append(cached)
+            if cached is None and text not in missing:
+                missing.append(text)
+        return embeddings, missing
+
+    def _fill_query_embeddings(
+        self,
+        texts: List[str],
+        embeddings: List[Optional[List[float]]],
+        missing: List[str],
+        result,
+    ) -> None:
+        if not result.embeddings or len(result.embeddings) != len(missing):
+            raise RuntimeError("Embedding API returned an unexpected number of vectors")
+
+        by_text = {
+            text: embedding.values for text, embedding in zip(missing, result.embeddings)
+        }
+        for index, text in enumerate(texts):
+            if embeddings[index] is None:
+                embeddings[index] = by_text[text]
+        for text, embedding in by_text.items():
+            cache_key = self._query_cache_key(text)
+            if cache_key is not None:
+                self.query_cache.set(cache_key, embedding)
+
+    @staticmethod
+    def _first_embedding(result) -> List[float]:
+        if result.embeddings and len(result.embeddings) > 0:
+            return result.embeddings[0].values
+        raise RuntimeError("No embeddings returned from API")
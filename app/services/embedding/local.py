@@ -0,0 +1,109 @@
+import re
+import threading
+import zlib
+from typing import List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.embedding.base import EmbeddingResult, EmbeddingService
+from app.services.embedding.gemini import document_content
+
+# Hashed feature space projected down to the embedding dimension
+HASH_FEATURES = 4096
+CHAR_NGRAM = 3
+
+_WORD = re.compile(r"\w+")
+
+
+def _features(text: str) -> List[int]:
+    """
+    Bucket ids for the word unigrams, word bigrams and character trigrams of
+    `text`. crc32 keeps the buckets stable across processes, unlike hash().
+    """
+    words = _WORD.findall(text.lower())
+    grams = list(words)
+    grams += [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"#{word}#"
+        grams += [
+            padded[i : i + CHAR_NGRAM] for i in range(len(padded) - CHAR_NGRAM + 1)
+        ]
+    return [zlib.crc32(gram.encode("utf-8")) % HASH_FEATURES for gram in grams]
+
+
+class LocalEmbeddingService(EmbeddingService):
+    """
+    Deterministic offline embeddings for benchmarks, tests and air-gapped
+    runs. Texts become log-scaled counts of hashed n-gram features, which a
+    fixed seeded Gaussian matrix projects to the embedding dimension; texts
+    that share words and subwords therefore land close together. No network
+    calls, and the same input always yields the same vector (up to float32
+    rounding differences between batch sizes).
+    """
+
+    def __init__(
+        self, dimension: Optional[int] = None, seed: Optional[int] = None
+    ) -> None:
+        self._dimension = dimension or settings.LOCAL_EMBEDDING_DIMENSION
+        self.seed = settings.LOCAL_EMBEDDING_SEED if seed is None else seed
+        self.model = f"local-hashed-ngram-{HASH_FEATURES}-seed{self.seed}"
+        self._projection: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    @property
+    def projection(self) -> np.ndarray:
+        with self._lock:
+            if self._projection is None:
+                rng = np.random.default_rng(self.seed)
+                projection = rng.standard_normal(
+                    (HASH_FEATURES, self._dimension), dtype=np.float32
+                )
+                self._projection = projection / np.float32(np.sqrt(self._dimension))
+            return self._projection
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Embed many raw strings at once; returns an L2-normalized matrix."""
+        counts = np.zeros((len(texts), HASH_FEATURES), dtype=np.float32)
+        for row, text in enumerate(texts):
+            np.add.at(counts[row], _features(text), 1.0)
+        vectors = np.log1p(counts) @ self.projection
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def generate_embedding(
+        self, text: dict, task_type: str = "retrieval_document"
+    ) -> List[float]:
+        result = self.generate_embeddings([text], task_type)[0]
+        if not result.ok:
+            raise RuntimeError(f"Failed to generate embedding: {result.error}")
+        return result.embedding
+
+    def generate_embeddings(
+        self, texts: List[dict], task_type: str = "retrieval_document"
+    ) -> List[EmbeddingResult]:
+        contents = [document_content(text) for text in texts]
+        vectors = self.embed_texts(contents)
+        return [
+            EmbeddingResult(vector.tolist())
+            if content.strip()
+            else EmbeddingResult(error="Empty text")
+            for content, vector in zip(contents, vectors)
+        ]
+
+    def generate_query_embedding(self, text: str) -> List[float]:
+        return self.embed_texts([text])[0].tolist()
+
+    def generate_query_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_texts(texts).tolist()
+
+    async def agenerate_query_embedding(self, text: str) -> List[float]:
+        # Pure CPU and fast enough that a thread hop would cost more
+        return self.generate_query_embedding(text)
+
+    async def agenerate_query_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self.generate_query_embeddings(texts)
+
+    def get_embedding_dimension(self) -> int:
+        return self._dimension
@@ -0,0 +1,218 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.models.product import Product
+
+logger = logging.getLogger(__name__)
+
+# Stops a consumer thread
+_DONE = None
+
+
+class BackfillProgress:
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.processed = 0
+        self.embedded = 0
+        self.failed = 0
+        self.started_at = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started_at
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        if not self.rate:
+            return None
+        return max(0, self.total - self.processed) / self.rate
+
+    def line(self) -> str:
+        eta = self.eta_seconds
+        eta_text = "--:--" if eta is None else time.strftime("%H:%M:%S", time.gmtime(eta))
+        return (
+            f"{self.processed}/{self.total} products "
+            f"({self.embedded} embedded, {self.failed} failed) "
+            f"{self.rate:.1f}/s ETA {eta_text}"
+        )
+
+
+class EmbeddingBackfill:
+    """
+    Streams products through the embedder in keyset-paginated batches.
+
+    One producer reads product ids by ascending primary key into a bounded
+    queue; worker threads embed and upsert a batch at a time via
+    `embed_batch` (normally app.tasks.embedding_tasks.embed_products). The
+    highest id below which every batch has finished is written to the
+    checkpoint file, so an interrupted run resumes from there.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        embed_batch: Callable[[Session, List[UUID]], dict],
+        *,
+        statuses: Iterable[int] = (
+            Product.EMBEDDING_STATUS_PENDING,
+            Product.EMBEDDING_STATUS_FAILED,
+        ),
+        batch_size: int = 100,
+        workers: int = 4,
+        queue_size: int = 8,
+        checkpoint_path: Optional[str] = None,
+        on_progress: Optional[Callable[[BackfillProgress], None]] = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.embed_batch = embed_batch
+        self.statuses = list(statuses)
+        self.batch_size = batch_size
+        self.workers = workers
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.on_progress = on_progress
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        # [last product id, finished] per batch, in id order
+        self._batches: deque = deque()
+        self._errors: List[BaseException] = []
+        self.progress = BackfillProgress(0)
+
+    def run(self) -> BackfillProgress:
+        start_after = self.load_checkpoint()
+        if start_after:
+            logger.info(f"Resuming embedding backfill after product id {start_after}")
+
+        db = self.session_factory()
+        try:
+            total = self._select(db, start_after).count()
+        finally:
+            db.close()
+        self.progress = BackfillProgress(total)
+
+        threads = [threading.Thread(target=self._produce, args=(start_after,))]
+        threads += [threading.Thread(target=self._consume) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            # Let in-flight batches finish so the checkpoint stays accurate
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            raise
+
+        if self._errors:
+            raise self._errors[0]
+        if not self._batches and not self._stop.is_set():
+            self.clear_checkpoint()
+        return self.progress
+
+    def _select(self, db: Session, after_id: int):
+        return db.query(Product.id, Product.uuid).filter(
+            Product.embedding_status.in_(self.statuses), Product.id > after_id
+        )
+
+    def _produce(self, after_id: int) -> None:
+        db = self.session_factory()
+        try:
+            while not self._stop.is_set():
+                rows = (
+                    self._select(db, after_id)
+                    .order_by(Product.id)
+                    .limit(self.batch_size)
+                    .all()
+                )
+                if not rows:
+                    break
+                after_id = rows[-1].id
+                batch = [after_id, False]
+                with self._lock:
+                    self._batches.append(batch)
+                self._put((batch, [row.uuid for row in rows]))
+        except Exception as e:
+            logger.error(f"Embedding backfill reader failed: {e}", exc_info=True)
+            self._fail(e)
+        finally:
+            db.close()
+            for _ in range(self.workers):
+                self._queue.put(_DONE)
+
+    def _put(self, item) -> None:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _consume(self) -> None:
+        db = self.session_factory()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _DONE:
+                    return
+                if self._stop.is_set():
+                    continue
+                batch, product_uuids = item
+                try:
+                    counts = self.embed_batch(db, product_uuids)
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Embedding backfill batch failed: {e}", exc_info=True)
+                    self._fail(e)
+                    continue
+                self._finish(batch, len(product_uuids), counts)
+        finally:
+            db.close()
+
+    def _fail(self, error: BaseException) -> None:
+        with self._lock:
+            self._errors.append(error)
+        self._stop.set()
+
+    def _finish(self, batch: list, size: int, counts: dict) -> None:
+        with self._lock:
+            batch[1] = True
+            watermark = None
+            while self._batches and self._batches[0][1]:
+                watermark = self._batches.popleft()[0]
+            if watermark is not None:
+                self.save_checkpoint(watermark)
+
+            self.progress.processed += size
+            self.progress.embedded += counts.get("embedded", 0)
+            self.progress.failed += counts.get("failed", 0)
+            if self.on_progress:
+                self.on_progress(self.progress)
+
+    def load_checkpoint(self) -> int:
+        if self.checkpoint_path is None or not self.checkpoint_path.exists():
+            return 0
+        return int(json.loads(self.checkpoint_path.read_text())["last_product_id"])
+
+    def save_checkpoint(self, last_product_id: int) -> None:
+        if self.checkpoint_path is None:
+            return
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"last_product_id": last_product_id}))
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def clear_checkpoint(self) -> None:
+        if self.checkpoint_path is not None and self.checkpoint_path.exists():
+            self.checkpoint_path.unlink()
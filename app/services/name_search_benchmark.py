@@ -0,0 +1,139 @@
+import random
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.repositories.product import product_repository
+
+SYNTHETIC_DESCRIPTION = "Synthetic benchmark product"
+
+ADJECTIVES = [
+    "wireless", "portable", "ergonomic", "stainless", "compact", "vintage",
+    "organic", "waterproof", "adjustable", "rechargeable", "foldable", "smart",
+    "premium", "lightweight", "insulated", "magnetic",
+]
+NOUNS = [
+    "headphones", "keyboard", "blender", "backpack", "lamp", "kettle",
+    "speaker", "monitor", "jacket", "notebook", "charger", "bottle",
+    "camera", "mattress", "drone", "thermostat",
+]
+
+# Deterministic names such as "compact kettle 12345"; the numeric suffix keeps
+# names distinct so result sets stay realistic at a million rows.
+_INSERT_SYNTHETIC = text(
+    """
+    INSERT INTO products (uuid, name, description, price, stock_quantity,
+                          version, embedding_status)
+    SELECT gen_random_uuid(),
+           (CAST(:adjectives AS text[]))[1 + (g * 7919) % :adjective_count]
+             || ' ' || (CAST(:nouns AS text[]))[1 + (g * 104729) % :noun_count]
+             || ' ' || g,
+           :description || ' ' || g,
+           1 + (g * 31) % 500,
+           g % 50,
+           1,
+           0
+    FROM generate_series(:start, :stop) AS g
+    """
+)
+
+
+def seed_synthetic_products(
+    db: Session, count: int, batch_size: int = 100_000
+) -> int:
+    """Insert `count` synthetic products (Postgres only) and analyze the table."""
+    start = (
+        db.execute(
+            text("SELECT count(*) FROM products WHERE description LIKE :pattern"),
+            {"pattern": f"{SYNTHETIC_DESCRIPTION}%"},
+        ).scalar()
+        or 0
+    )
+    inserted = 0
+    while inserted < count:
+        size = min(batch_size, count - inserted)
+        db.execute(
+            _INSERT_SYNTHETIC,
+            {
+                "adjectives": ADJECTIVES,
+                "adjective_count": len(ADJECTIVES),
+                "nouns": NOUNS,
+                "noun_count": len(NOUNS),
+                "description": SYNTHETIC_DESCRIPTION,
+                "start": start + inserted,
+                "stop": start + inserted + size - 1,
+            },
+        )
+        db.commit()
+        inserted += size
+    db.execute(text("ANALYZE products"))
+    db.commit()
+    return inserted
+
+
+def delete_synthetic_products(db: Session) -> int:
+    deleted = db.execute(
+        text("DELETE FROM products WHERE description LIKE :pattern"),
+        {"pattern": f"{SYNTHETIC_DESCRIPTION}%"},
+    ).rowcount
+    db.commit()
+    return deleted
+
+
+def sample_terms(count: int, seed: int = 0) -> List[str]:
+    """Search terms from the synthetic vocabulary; every other one has a typo."""
+    rng = random.Random(seed)
+    terms = []
+    for index in range(count):
+        word = rng.choice(ADJECTIVES + NOUNS)
+        if index % 2:
+            position = rng.randrange(1, len(word) - 1)
+            word = word[:position] + word[position + 1 :]
+        terms.append(word)
+    return terms
+
+
+def time_name_search(
+    db: Session,
+    terms: List[str],
+    *,
+    search_mode: str = "contains",
+    sort_by: Optional[str] = None,
+    use_trigram_index: bool = True,
+    include_total: bool = True,
+    limit: int = 20,
+) -> Dict:
+    """
+    Run the product listing once per term and report latency percentiles.
+    Without `use_trigram_index` bitmap scans are disabled for the
+    transaction, which is how the planner behaved before the pg_trgm GIN
+    indexes existed (a sequential scan per ILIKE).
+    """
+    latencies, hits = [], 0
+    try:
+        if not use_trigram_index:
+            db.execute(text("SET LOCAL enable_bitmapscan = off"))
+        for term in terms:
+            started = time.perf_counter()
+            products, _, _ = product_repository.get_products(
+                db,
+                name=term,
+                search_mode=search_mode,
+                sort_by=sort_by,
+                include_total=include_total,
+                limit=limit,
+            )
+            latencies.append(time.perf_counter() - started)
+            hits += len(products)
+    finally:
+        db.rollback()
+
+    return {
+        "queries": len(terms),
+        "mean_hits": hits / len(terms) if terms else 0.0,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000) if latencies else 0.0,
+        "p95_ms": float(np.percentile(latencies, 95) * 1000) if latencies else 0.0,
+    }
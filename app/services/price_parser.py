@@ -1,13 +1,76 @@
 from typing import Optional, Tuple
 import re
 import json
-from openai import OpenAI
+import threading
+import httpx
+from openai import AsyncOpenAI, OpenAI
 from app.schemas.price_extractor import PriceExtractionResult
 from app.core.config import settings
+from app.services.rate_limit import RateLimiter, get_deepseek_rate_limiter
+from app.utils.lru_cache import TTLCache
+from app.utils.query_text import normalize_query
 import logging
 
 logger = logging.getLogger(__name__)
 
+_CURRENCY = re.compile(
+    r"[$€£¥₹]|\b(usd|eur|gbp|inr|pkr|rs|rupees?|dollars?|bucks|euros?|pounds?|grand)\b"
+    r"|(?<![a-z])rs\.?(?=\d)|(?<=\d)(usd|eur|gbp|inr|pkr|rs)\b"
+)
+# A whole token that is an amount: "500", "1,299.99", "2k", "$50", "50$",
+# "rs500", "500rs", "rs.500" or a number word. Digits glued to other letters
+# ("ps5", "4090ti") are model names.
+_AMOUNT = re.compile(
+    r"([$€£¥₹]|rs\.?|usd|inr|pkr)?\d[\d,.]*k?([$€£¥₹]|rs|usd|inr|pkr)?"
+    r"|[$€£¥₹]?(one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|"
+    r"fifteen|twenty|thirty|forty|fifty|sixty|seventy|eighty|ninety|hundred|"
+    r"thousand|million|lakh|crore)[$€£¥₹]?"
+)
+_PRICE_KEYWORD = re.compile(
+    r"\b(under|below|less than|over|above|more than|between|from|upto|up to|"
+    r"within|maximum|minimum|cheaper|costlier|price[ds]?|costs?|budget)\b|[<>]"
+)
+# "max" and "min" end product names ("iphone 15 pro max"), so they only count
+# in front of the amount
+_LEADING_KEYWORD = re.compile(r"\b(max|min)\b")
+# Ranges ("100-200"), "5000/-" and comparisons ("<500") are split apart
+_TOKEN = re.compile(r"[<>]=?|[^\s<>=/-]+")
+# Words either side of an amount searched for a currency marker or keyword
+_PRICE_CONTEXT_WORDS = 2
+
+# Rough size of the extraction prompt (schema included) for token budgets
+_PROMPT_TOKENS = 400
+
+
+def might_contain_price(query: str) -> bool:
+    """
+    Cheap local check for whether a query can carry a price constraint.
+
+    Numbers are common in product names ("iphone 15", "rtx 4090", "two
+    piece"), so an amount only counts with a currency marker or a price
+    keyword within a couple of words of it ("max" and "min" only before
+    it). Ranges, glued currency ("rs500") and comparisons ("<500") are
+    tokenized so their amounts are seen. Markers and keywords alone
+    ("cheap", "under") cannot produce a bound and are not sent to the LLM.
+    """
+    words = _TOKEN.findall(query.lower())
+    for index, word in enumerate(words):
+        if not _AMOUNT.fullmatch(word.strip(".,;:!?()")):
+            continue
+        before = " ".join(words[max(0, index - _PRICE_CONTEXT_WORDS) : index])
+        context = " ".join(
+            words[
+                max(0, index - _PRICE_CONTEXT_WORDS) : index + _PRICE_CONTEXT_WORDS + 1
+            ]
+        )
+        if (
+            _CURRENCY.search(context)
+            or _PRICE_KEYWORD.search(context)
+            or _LEADING_KEYWORD.search(before)
+        ):
+            return True
+    return False
+
 
 class PriceConstraints:
     def __init__(
@@ -19,22 +82,120 @@ class PriceConstraints:
         self.max_price = max_price
 
 
+def _http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.PROVIDER_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.PROVIDER_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    )
+
+
 class PriceQueryParser:
-    def __init__(self) -> None:
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None) -> None:
         self._client = OpenAI(
             api_key=settings.DEEPSEEK_API_KEY,
             base_url="https://api.deepseek.com",
+            http_client=httpx.Client(
+                limits=_http_limits(),
+                timeout=settings.PROVIDER_HTTP_TIMEOUT_SECONDS,
+            ),
         )
+        self._async_client = AsyncOpenAI(
+            api_key=settings.DEEPSEEK_API_KEY,
+            base_url="https://api.deepseek.com",
+            http_client=httpx.AsyncClient(
+                limits=_http_limits(),
+                timeout=settings.PROVIDER_HTTP_TIMEOUT_SECONDS,
+            ),
+        )
+        self._cache = TTLCache(
+            max_items=settings.PRICE_PARSE_CACHE_MAX_ITEMS,
+            ttl_seconds=settings.PRICE_PARSE_CACHE_TTL_SECONDS,
+        )
+        self.rate_limiter = rate_limiter or get_deepseek_rate_limiter()
+        self._stats_lock = threading.Lock()
+        self.skipped = 0
+        self.cache_hits = 0
+        self.llm_calls = 0
+
+    def close(self) -> None:
+        self._client.close()
+
+    async def aclose(self) -> None:
+        await self._async_client.close()
+        self.close()
 
     def parse(self, query: str) -> Tuple[str, PriceConstraints]:
+        local = self._parse_locally(query)
+        if local is not None:
+            return local
+
         try:
+            self._count("llm_calls")
             cleaned, constraints = self._parse_with_deepseek(query)
+            self._remember(query, cleaned, constraints)
             return cleaned, constraints
         except Exception as e:
             logger.error(f"DeepSeek price parsing failed: {e}, falling back to regex")
         return self._parse_with_regex(query)
 
+    async def aparse(self, query: str) -> Tuple[str, PriceConstraints]:
+        local = self._parse_locally(query)
+        if local is not None:
+            return local
+
+        try:
+            self._count("llm_calls")
+            async with self.rate_limiter.alimit(_PROMPT_TOKENS):
+                response = await self._async_client.chat.completions.create(
+                    **self._completion_kwargs(query)
+                )
+            cleaned, constraints = self._to_constraints(response)
+            self._remember(query, cleaned, constraints)
+            return cleaned, constraints
+        except Exception as e:
+            logger.error(f"DeepSeek price parsing failed: {e}, falling back to regex")
+        return self._parse_with_regex(query)
+
+    def _parse_locally(self, query: str) -> Optional[Tuple[str, PriceConstraints]]:
+        if not might_contain_price(query):
+            self._count("skipped")
+            return query, PriceConstraints()
+
+        cached = self._cache.get(normalize_query(query))
+        if cached is not None:
+            self._count("cache_hits")
+            cleaned, min_price, max_price = cached
+            return cleaned, PriceConstraints(min_price=min_price, max_price=max_price)
+        return None
+
+    def _remember(
+        self, query: str, cleaned: str, constraints: PriceConstraints
+    ) -> None:
+        self._cache.set(
+            normalize_query(query),
+            (cleaned, constraints.min_price, constraints.max_price),
+        )
+
+    def stats(self) -> dict:
+        return {
+            "skipped": self.skipped,
+            "cache_hits": self.cache_hits,
+            "llm_calls": self.llm_calls,
+            "cache_entries": len(self._cache),
+        }
+
+    def _count(self, counter: str) -> None:
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
     def _parse_with_deepseek(self, query: str) -> Tuple[str, PriceConstraints]:
+        with self.rate_limiter.limit(_PROMPT_TOKENS):
+            response = self._client.chat.completions.create(
+                **self._completion_kwargs(query)
+            )
+        return self._to_constraints(response)
+
+    def _completion_kwargs(self, query: str) -> dict:
         prompt = f"""
 You are a price extraction engine for an e-commerce search bar.
 
@@ -56,7 +217,7 @@ If no price is mentioned:
 - cleaned_query should be the original query unchanged.
 """
 
-        response = self._client.chat.completions.create(
+        return dict(
             model="deepseek-chat",
             messages=[
                 {
@@ -71,6 +232,7 @@ If no price is mentioned:
             response_format={"type": "json_object"},
         )
 
+    def _to_constraints(self, response) -> Tuple[str, PriceConstraints]:
         content = response.choices[0].message.content
 
         result = PriceExtractionResult.model_validate_json(content)
@@ -2,10 +2,14 @@ from typing import List, Optional, Tuple
 from uuid import UUID
 from sqlalchemy.orm import Session
 from app.repositories.product import product_repository
+from app.repositories.product_count import product_counter
 from app.schemas.product import ProductCreate, ProductUpdate, Product
 from app.models.product import Product as ProductModel
 from app.models.category import Category as CategoryModel
-from app.tasks.embedding_tasks import generate_product_embedding
+from app.tasks.embedding_tasks import (
+    queue_product_embedding,
+    queue_product_price_update,
+)
 from app.utils.product_text import prepare_product_text as prepare_product_text_util
 import logging
 
@@ -21,7 +25,9 @@ class ProductService:
         return self.repository.get_by_uuid(db=db, uuid=uuid)
 
     def delete(self, db: Session, uuid: UUID) -> Optional[ProductModel]:
-        return self.repository.delete(db=db, uuid=uuid)
+        product = self.repository.delete(db=db, uuid=uuid)
+        product_counter.invalidate()
+        return product
 
     def get_products_by_category(
         self,
@@ -31,7 +37,9 @@ class ProductService:
         skip: int = 0,
         limit: int = 20,
         sort_by: Optional[str] = None,
-    ) -> Tuple[List[ProductModel], int]:
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+    ) -> Tuple[List[ProductModel], Optional[int], Optional[str]]:
         """
         Retrieve products by category name with pagination and optional sorting.
         """
@@ -41,6 +49,8 @@ class ProductService:
             skip=skip,
             limit=limit,
             sort_by=sort_by,
+            cursor=cursor,
+            include_total=include_total,
         )
 
     def get_products(
@@ -55,7 +65,12 @@ class ProductService:
         max_price: Optional[float] = None,
         sort_by: Optional[str] = None,
         in_stock: Optional[bool] = None,
-    ) -> Tuple[List[ProductModel], int]:
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        search_mode: str = "contains",
+        categories: Optional[List[str]] = None,
+        category_match: str = "all",
+    ) -> Tuple[List[ProductModel], Optional[int], Optional[str]]:
         return self.repository.get_products(
             db,
             skip=skip,
@@ -66,10 +81,24 @@ class ProductService:
             max_price=max_price,
             sort_by=sort_by,
             in_stock=in_stock,
+            cursor=cursor,
+            include_total=include_total,
+            search_mode=search_mode,
+            categories=categories,
+            category_match=category_match,
         )
 
-    def create(self, db: Session, *, obj_in: ProductCreate) -> ProductModel:
-        """Create a new product with categories."""
+    def create(
+        self,
+        db: Session,
+        *,
+        obj_in: ProductCreate,
+        embed_immediately: bool = False,
+    ) -> ProductModel:
+        """
+        Create a new product with categories. Embedding is batched with other
+        pending products unless embed_immediately is set.
+        """
         category_uuids = obj_in.category_uuids
 
         obj_dict = obj_in.model_dump(exclude={"category_uuids", "images"})
@@ -80,12 +109,14 @@ class ProductService:
             db.query(CategoryModel).filter(CategoryModel.uuid.in_(category_uuids)).all()
         )
         db_obj.categories = categories
+        db_obj.category_ids = sorted(category.id for category in categories)
 
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        product_counter.invalidate()
         try:
-            generate_product_embedding.delay(db_obj.uuid)
+            queue_product_embedding(db_obj.uuid, immediate=embed_immediately)
             logger.info(
                 f"Successfully queued embedding generation for product {db_obj.uuid}"
             )
@@ -97,11 +128,17 @@ class ProductService:
         return db_obj
 
     def update(
-        self, db: Session, *, uuid: UUID, obj_in: ProductUpdate
+        self,
+        db: Session,
+        *,
+        uuid: UUID,
+        obj_in: ProductUpdate,
+        embed_immediately: bool = False,
     ) -> Optional[ProductModel]:
         update_dict = obj_in.model_dump(exclude_unset=True, exclude={"category_uuids"})
 
-        embedding_related_fields = {"name", "description", "price"}
+        # Price is only vector metadata; changing it must not re-embed
+        embedding_related_fields = {"name", "description"}
         needs_embedding_update = any(
             field in update_dict for field in embedding_related_fields
         )
@@ -109,6 +146,7 @@ class ProductService:
         db_obj = self.repository.get_by_uuid(db=db, uuid=uuid)
         if not db_obj:
             return None
+        old_price = db_obj.price
 
         updated_product = self.repository.update(
             db=db,
@@ -122,13 +160,18 @@ class ProductService:
                 .all()
             )
             updated_product.categories = categories
+            updated_product.category_ids = sorted(
+                category.id for category in categories
+            )
             db.commit()
             db.refresh(updated_product)
             needs_embedding_update = True
+        # Name, price, stock and categories all feed listing filters
+        product_counter.invalidate()
 
         if needs_embedding_update:
             try:
-                generate_product_embedding.delay(uuid)
+                queue_product_embedding(uuid, immediate=embed_immediately)
                 logger.info(
                     f"Successfully queued embedding regeneration for product {uuid}"
                 )
@@ -136,6 +179,16 @@ class ProductService:
                 logger.error(
                     f"Failed to queue embedding regeneration for product {uuid}: {str(e)}"
                 )
+        elif "price" in update_dict and updated_product.price != old_price:
+            # A re-embedding writes the current price as well, so only
+            # price-only edits need the metadata update.
+            try:
+                queue_product_price_update(uuid, immediate=embed_immediately)
+                logger.info(f"Successfully queued price update for product {uuid}")
+            except Exception as e:
+                logger.error(
+                    f"Failed to queue price update for product {uuid}: {str(e)}"
+                )
 
         return updated_product
 
@@ -0,0 +1,348 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+import redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# How often a caller re-checks when every concurrency slot is taken
+_SLOT_POLL_SECONDS = 0.05
+_MAX_BACKOFF_SECONDS = 60.0
+
+
+def is_throttle_error(error: BaseException) -> bool:
+    """
+    True for provider responses that mean "slow down": HTTP 429 and 5xx.
+    Works with the google-genai and openai exception types, which expose the
+    status as `code` and `status_code` respectively.
+    """
+    for attr in ("status_code", "code"):
+        status = getattr(error, attr, None)
+        if isinstance(status, int):
+            return status == 429 or status >= 500
+    text = str(error)
+    return "429" in text or "RESOURCE_EXHAUSTED" in text
+
+
+def retry_countdown(retries: int, base: float = 30.0, cap: float = 600.0) -> float:
+    """Exponential backoff with full jitter for Celery task retries."""
+    return random.uniform(base / 2, min(cap, base * 2**retries))
+
+
+class TokenBucket:
+    """
+    Refills at `per_minute / 60` units per second up to `capacity`. Not
+    thread-safe on its own; RateLimiter serializes access.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None) -> None:
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        # Ten seconds of budget smooths bursts without starving big batches
+        self.capacity = capacity or max(1.0, per_minute / 6)
+        self.available = self.capacity
+        self._updated = time.monotonic()
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self.available = min(
+            self.capacity, self.available + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        # A request larger than the bucket would never fit; let it through
+        # once the bucket is full instead of deadlocking.
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.available -= min(amount, self.capacity)
+
+    def give_back(self, amount: float) -> None:
+        self.available = min(self.capacity, self.available + min(amount, self.capacity))
+
+
+class RateLimiter:
+    """
+    Process-wide limiter for one provider: request and token budgets per
+    minute (token buckets) plus an AIMD concurrency limit that halves once
+    per throttling event (429/5xx responses) and grows by one after a
+    window of successes.
+
+    With a Redis URL the per-minute budgets and the post-throttle backoff
+    are also enforced across processes using fixed one-minute windows.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        redis_url: Optional[str] = None,
+    ) -> None:
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency_limit = max(min_concurrency, max_concurrency // 2)
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._redis = redis.Redis.from_url(redis_url) if redis_url else None
+        self._lock = threading.Lock()
+        self._backoff_until = 0.0
+        self._last_decrease = 0.0
+        self._consecutive_throttles = 0
+        self._successes = 0
+        self.in_flight = 0
+        self.throttled = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.redis_errors = 0
+
+    @contextmanager
+    def limit(self, tokens: int = 0):
+        self._record_wait(self._wait(tokens))
+        started = time.monotonic()
+        try:
+            yield
+        except BaseException as e:
+            self._share_backoff(self._exit(e, started))
+            raise
+        self._exit(None, started)
+
+    @asynccontextmanager
+    async def alimit(self, tokens: int = 0):
+        waited = 0.0
+        while True:
+            delay = self._reserve(tokens)
+            if not delay and self._redis is not None:
+                # Redis round trips must not block the event loop
+                delay = await asyncio.to_thread(self._shared_wait, tokens)
+                if delay:
+                    self._refund(tokens)
+            if not delay:
+                break
+            waited += delay
+            await asyncio.sleep(delay)
+        self._record_wait(waited)
+        started = time.monotonic()
+        try:
+            yield
+        except BaseException as e:
+            backoff = self._exit(e, started)
+            if backoff and self._redis is not None:
+                await asyncio.to_thread(self._share_backoff, backoff)
+            raise
+        self._exit(None, started)
+
+    def _wait(self, tokens: int) -> float:
+        waited = 0.0
+        while True:
+            delay = self._try_enter(tokens)
+            if not delay:
+                return waited
+            waited += delay
+            time.sleep(delay)
+
+    def _try_enter(self, tokens: int) -> float:
+        """Take a slot and budget, or return how long to wait before retrying."""
+        delay = self._reserve(tokens)
+        if delay:
+            return delay
+        # Checked without the lock so one Redis round trip does not
+        # serialize every thread; the local reservation is returned if the
+        # shared budget says wait.
+        delay = self._shared_wait(tokens)
+        if delay:
+            self._refund(tokens)
+        return delay
+
+    def _reserve(self, tokens: int) -> float:
+        """Take a slot and local budget, or return how long to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if self._backoff_until > now:
+                return self._backoff_until - now
+            if self.in_flight >= self.concurrency_limit:
+                return _SLOT_POLL_SECONDS
+
+            delay = 0.0
+            if self._requests is not None:
+                delay = max(delay, self._requests.wait_time(1, now))
+            if self._tokens is not None and tokens:
+                delay = max(delay, self._tokens.wait_time(tokens, now))
+            if delay:
+                return delay
+
+            if self._requests is not None:
+                self._requests.take(1)
+            if self._tokens is not None and tokens:
+                self._tokens.take(tokens)
+            self.in_flight += 1
+            return 0.0
+
+    def _refund(self, tokens: int) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if self._requests is not None:
+                self._requests.give_back(1)
+            if self._tokens is not None and tokens:
+                self._tokens.give_back(tokens)
+
+    def _exit(self, error: Optional[BaseException], started: float) -> float:
+        """Release the slot; returns the backoff to share after a throttle."""
+        with self._lock:
+            self.in_flight -= 1
+            if error is not None and is_throttle_error(error):
+                self.throttled += 1
+                self._successes = 0
+                now = time.monotonic()
+                # Requests in flight when the limit was cut belong to the
+                # same congestion event; cut once per event, not per 429.
+                if started < self._last_decrease or self._backoff_until > now:
+                    return 0.0
+                self._last_decrease = now
+                self._consecutive_throttles += 1
+                self.concurrency_limit = max(
+                    self.min_concurrency, self.concurrency_limit // 2
+                )
+                backoff = min(
+                    _MAX_BACKOFF_SECONDS, 2 ** (self._consecutive_throttles - 1)
+                )
+                self._backoff_until = now + backoff
+                logger.warning(
+                    f"{self.name} throttled; concurrency limit now "
+                    f"{self.concurrency_limit}, backing off {backoff:.0f}s"
+                )
+                return backoff
+            if error is None:
+                self._consecutive_throttles = 0
+                self._successes += 1
+                if self._successes >= self.concurrency_limit:
+                    self._successes = 0
+                    self.concurrency_limit = min(
+                        self.max_concurrency, self.concurrency_limit + 1
+                    )
+            return 0.0
+
+    def _record_wait(self, waited: float) -> None:
+        if waited:
+            with self._lock:
+                self.waits += 1
+                self.wait_seconds += waited
+
+    def _key(self, suffix: str) -> str:
+        return f"ratelimit:{self.name}:{suffix}"
+
+    def _shared_wait(self, tokens: int) -> float:
+        if self._redis is None:
+            return 0.0
+        try:
+            backoff_ms = self._redis.pttl(self._key("backoff"))
+            if backoff_ms and backoff_ms > 0:
+                return backoff_ms / 1000
+
+            now = time.time()
+            window = int(now // 60)
+            until_next_window = 60 - now % 60
+            budgets = [("requests", 1, self.requests_per_minute)]
+            if tokens:
+                budgets.append(("tokens", tokens, self.tokens_per_minute))
+            taken = []
+            for kind, amount, per_minute in budgets:
+                if not per_minute:
+                    continue
+                key = self._key(f"{kind}:{window}")
+                pipe = self._redis.pipeline()
+                pipe.incrby(key, amount)
+                pipe.expire(key, 120)
+                used = pipe.execute()[0]
+                taken.append((key, amount))
+                if used > per_minute and used != amount:
+                    for taken_key, taken_amount in taken:
+                        self._redis.decrby(taken_key, taken_amount)
+                    return until_next_window
+        except Exception as e:
+            # Runs outside the lock, concurrently from threads
+            with self._lock:
+                self.redis_errors += 1
+            logger.warning(f"Shared rate limit check failed for {self.name}: {e}")
+        return 0.0
+
+    def _share_backoff(self, backoff: float) -> None:
+        if self._redis is None or not backoff:
+            return
+        try:
+            self._redis.set(self._key("backoff"), 1, px=int(backoff * 1000))
+        except Exception as e:
+            with self._lock:
+                self.redis_errors += 1
+            logger.warning(f"Failed to share backoff for {self.name}: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "concurrency_limit": self.concurrency_limit,
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self.in_flight,
+                "requests_per_minute": self.requests_per_minute,
+                "tokens_per_minute": self.tokens_per_minute,
+                "backoff_seconds": max(0.0, self._backoff_until - time.monotonic()),
+                "throttled": self.throttled,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 3),
+                "redis_errors": self.redis_errors,
+            }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, **kwargs) -> RateLimiter:
+    """
+    Return the process-wide limiter for `name`, creating it with `kwargs`
+    on first use so every client of a provider shares one budget.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            if settings.RATE_LIMIT_USE_REDIS and settings.REDIS_URL:
+                kwargs.setdefault("redis_url", settings.REDIS_URL)
+            limiter = RateLimiter(name, **kwargs)
+            _limiters[name] = limiter
+        return limiter
+
+
+def get_gemini_rate_limiter() -> RateLimiter:
+    return get_rate_limiter(
+        "gemini",
+        requests_per_minute=settings.GEMINI_REQUESTS_PER_MINUTE,
+        tokens_per_minute=settings.GEMINI_TOKENS_PER_MINUTE,
+        max_concurrency=settings.GEMINI_MAX_CONCURRENCY,
+    )
+
+
+def get_deepseek_rate_limiter() -> RateLimiter:
+    return get_rate_limiter(
+        "deepseek",
+        requests_per_minute=settings.DEEPSEEK_REQUESTS_PER_MINUTE,
+        tokens_per_minute=settings.DEEPSEEK_TOKENS_PER_MINUTE,
+        max_concurrency=settings.DEEPSEEK_MAX_CONCURRENCY,
+    )
+
+
+def rate_limit_stats() -> dict:
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
@@ -0,0 +1,113 @@
+import logging
+from typing import Callable, Dict, List, Set
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.models.product import Product
+from app.services.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+
+class ReconciliationReport:
+    def __init__(self) -> None:
+        self.vectors = 0
+        # Embedded products stored more than once; re-embedded so one
+        # upsert replaces all copies
+        self.duplicates = 0
+        # Vectors whose product no longer exists; deleted
+        self.orphans = 0
+        # Vectors for products not marked as embedded; re-embedded
+        self.stale = 0
+        # Products marked as embedded without a vector; re-embedded
+        self.missing = 0
+        self.deleted = 0
+        self.requeued = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+
+def reconcile_vector_store(
+    db: Session,
+    vector_store: VectorStore,
+    collection_name: str,
+    requeue: Callable[[UUID], None],
+    *,
+    batch_size: int = 1000,
+    dry_run: bool = False,
+) -> ReconciliationReport:
+    """
+    Diff the vector collection against Postgres and repair drift.
+
+    Two passes, each holding a single batch in memory. First, vector IDs
+    are streamed from the store and checked against `products`: orphans
+    are deleted in bulk per batch and vectors of products not marked as
+    embedded are passed to `requeue`. Then embedded products are walked in
+    primary key order and each batch is looked up in the store, which
+    finds products missing from it and IDs stored more than once; both are
+    requeued. The collection does not store product versions, so a vector
+    is treated as current whenever its product's embedding_status is
+    "generated". `requeue` may see an ID more than once and must be
+    idempotent. With `dry_run` only the report is produced.
+    """
+    report = ReconciliationReport()
+
+    def _requeue(uids: Set[UUID]) -> None:
+        if not dry_run:
+            for uid in uids:
+                requeue(uid)
+            report.requeued += len(uids)
+
+    for ids in vector_store.iterate_ids(collection_name, batch_size):
+        report.vectors += len(ids)
+        unique = set(ids)
+        statuses = dict(
+            db.query(Product.uuid, Product.embedding_status)
+            .filter(Product.uuid.in_(list(unique)))
+            .all()
+        )
+        orphans: List[UUID] = [uid for uid in unique if uid not in statuses]
+        report.orphans += len(orphans)
+
+        stale = {
+            uid
+            for uid, status in statuses.items()
+            if status != Product.EMBEDDING_STATUS_GENERATED
+        }
+        report.stale += len(stale)
+        _requeue(stale)
+
+        if orphans and not dry_run:
+            vector_store.delete_vectors(collection_name, orphans)
+            report.deleted += len(orphans)
+
+    last_id = 0
+    while True:
+        rows = (
+            db.query(Product.id, Product.uuid)
+            .filter(
+                Product.embedding_status == Product.EMBEDDING_STATUS_GENERATED,
+                Product.id > last_id,
+            )
+            .order_by(Product.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        copies = vector_store.count_ids(collection_name, [row.uuid for row in rows])
+        missing = {row.uuid for row in rows if row.uuid not in copies}
+        duplicates = {uid for uid, count in copies.items() if count > 1}
+        report.missing += len(missing)
+        report.duplicates += len(duplicates)
+        _requeue(missing | duplicates)
+
+    if report.deleted:
+        vector_store.flush(collection_name)
+
+    logger.info(f"Vector store reconciliation: {report.as_dict()}")
+    return report
@@ -0,0 +1,105 @@
+import threading
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.services.price_parser import PriceConstraints
+from app.utils.lru_cache import TTLCache
+from app.utils.query_text import normalize_query
+
+
+class CachedSearchResponse:
+    def __init__(
+        self,
+        hits: List[Tuple[UUID, float, int]],
+        constraints: PriceConstraints,
+    ) -> None:
+        # (product uuid, score, product version) in result order
+        self.hits = hits
+        self.min_price = constraints.min_price
+        self.max_price = constraints.max_price
+
+    def is_current(self, ordered_products: List[dict]) -> bool:
+        """
+        True when every cached product still exists with the same version and
+        still satisfies the price constraints of the original query.
+        """
+        if len(ordered_products) != len(self.hits):
+            return False
+        for (product_uuid, _, version), result in zip(self.hits, ordered_products):
+            product = result["product"]
+            if product.uuid != product_uuid or product.version != version:
+                return False
+            if self.min_price is not None and product.price < self.min_price:
+                return False
+            if self.max_price is not None and product.price > self.max_price:
+                return False
+        return True
+
+
+class SearchResponseCache:
+    """
+    Caches ordered search hits (not products). Entries are validated against
+    freshly hydrated products on every hit, so stock and price always come
+    from Postgres and an entry is dropped as soon as one of its products is
+    re-embedded (version bump) or deleted.
+    """
+
+    def __init__(self, max_items: int, ttl_seconds: int) -> None:
+        self._entries = TTLCache(max_items=max_items, ttl_seconds=ttl_seconds)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(
+        query: str, limit: int, score_threshold: Optional[float], mode: str
+    ) -> tuple:
+        return normalize_query(query), limit, score_threshold, mode
+
+    def get(self, key: tuple) -> Optional[CachedSearchResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._count("misses")
+        return entry
+
+    def set(
+        self,
+        key: tuple,
+        ordered_products: List[dict],
+        constraints: PriceConstraints,
+    ) -> None:
+        hits = [
+            (result["product"].uuid, result["score"], result["product"].version)
+            for result in ordered_products
+        ]
+        self._entries.set(key, CachedSearchResponse(hits, constraints))
+
+    def record_hit(self) -> None:
+        self._count("hits")
+
+    def invalidate(self, key: tuple) -> None:
+        self._entries.delete(key)
+        self._count("invalidations")
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+        }
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+def build_search_response_cache() -> Optional[SearchResponseCache]:
+    if not settings.SEARCH_RESPONSE_CACHE_ENABLED:
+        return None
+    return SearchResponseCache(
+        max_items=settings.SEARCH_RESPONSE_CACHE_MAX_ITEMS,
+        ttl_seconds=settings.SEARCH_RESPONSE_CACHE_TTL_SECONDS,
+    )
@@ -1,10 +1,20 @@
+import asyncio
+import contextlib
+import threading
 from typing import List, Optional, Tuple
-from sqlalchemy.orm import Session, joinedload
-from app.services.embedding import GeminiEmbeddingService
-from app.services.vector_store import MilvusVectorStore
+from uuid import UUID
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.services.embedding import EmbeddingService, create_embedding_service
+from app.services.embedding.cache import build_query_embedding_cache
+from app.services.vector_store import VectorStore, get_vector_store
 from app.services.price_parser import PriceQueryParser, PriceConstraints
+from app.services.search_cache import SearchResponseCache, build_search_response_cache
+from app.services.rate_limit import rate_limit_stats
 from app.core.config import settings
 from app.models.product import Product
+from app.repositories.product import product_repository, with_relations
+from app.utils.query_text import normalize_query
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,14 +23,16 @@ logger = logging.getLogger(__name__)
 class SemanticSearchService:
     def __init__(
         self,
-        embedding_service: GeminiEmbeddingService,
-        vector_store: MilvusVectorStore,
+        embedding_service: EmbeddingService,
+        vector_store: VectorStore,
         price_parser: PriceQueryParser,
+        response_cache: Optional[SearchResponseCache] = None,
     ):
         self.embedding_service = embedding_service
         self.vector_store = vector_store
         self.collection_name = settings.MILVUS_COLLECTION_NAME
         self.price_parser = price_parser
+        self.response_cache = response_cache
 
     def search(
         self,
@@ -29,6 +41,11 @@ class SemanticSearchService:
         limit: int = 10,
         score_threshold: Optional[float] = None,
     ) -> Tuple[List[dict], int]:
+        cache_key = self._cache_key(query, limit, score_threshold, "semantic")
+        cached = self._cached_results(db, cache_key)
+        if cached is not None:
+            return cached, len(cached)
+
         if not self.vector_store.collection_exists(self.collection_name):
             logger.warning(
                 f"Collection {self.collection_name} does not exist. No embeddings available."
@@ -48,21 +65,294 @@ class SemanticSearchService:
             expr=expr,
         )
 
-        if not search_results:
-            return [], 0
+        ordered_products = self._hydrate(db, search_results)
+        self._cache_results(cache_key, ordered_products, price_constraints)
+        return ordered_products, len(ordered_products)
+
+    async def asearch(
+        self,
+        db: Session,
+        query: str,
+        limit: int = 10,
+        score_threshold: Optional[float] = None,
+        mode: str = "semantic",
+    ) -> Tuple[List[dict], int]:
+        """
+        Async variant of search. The raw query is embedded speculatively while
+        price constraints are parsed, and only re-embedded when parsing
+        actually changed the query text.
+
+        In "hybrid" mode a Postgres full-text search runs alongside the vector
+        search and both rank lists are merged with reciprocal rank fusion.
+        """
+        cache_key = self._cache_key(query, limit, score_threshold, mode)
+        cached = await run_in_threadpool(self._cached_results, db, cache_key)
+        if cached is not None:
+            return cached, len(cached)
+
+        if mode == "hybrid":
+            ordered_products, price_constraints, complete = (
+                await self._ahybrid_search(db, query, limit, score_threshold)
+            )
+        else:
+            ordered_products, price_constraints, complete = (
+                await self._asemantic_search(db, query, limit, score_threshold)
+            )
+
+        # Degraded (lexical-only) results are not worth keeping around
+        if complete:
+            self._cache_results(cache_key, ordered_products, price_constraints)
+        return ordered_products, len(ordered_products)
+
+    async def asearch_batch(
+        self,
+        db: Session,
+        queries: List[str],
+        limit: int = 10,
+        score_threshold: Optional[float] = None,
+    ) -> List[List[dict]]:
+        """
+        Run many searches with one embedding call, one vector search per
+        distinct price filter (usually one) and one Postgres query.
+        Returns one ordered result list per query.
+        """
+        exists = await asyncio.to_thread(
+            self.vector_store.collection_exists, self.collection_name
+        )
+        if not exists:
+            logger.warning(
+                f"Collection {self.collection_name} does not exist. No embeddings available."
+            )
+            return [[] for _ in queries]
+
+        parsed = await asyncio.gather(
+            *(self._aparse_price_constraints(query) for query in queries)
+        )
+        embeddings = await self.embedding_service.agenerate_query_embeddings(
+            [cleaned_query for cleaned_query, _ in parsed]
+        )
+
+        # Milvus applies one filter per multi-vector search, so queries are
+        # grouped by their price expression.
+        groups: dict = {}
+        for index, (_, price_constraints) in enumerate(parsed):
+            groups.setdefault(self._build_price_expr(price_constraints), []).append(
+                index
+            )
+
+        group_results = await asyncio.gather(
+            *(
+                self.vector_store.asearch_batch(
+                    collection_name=self.collection_name,
+                    query_vectors=[embeddings[index] for index in indexes],
+                    limit=limit,
+                    score_threshold=score_threshold,
+                    expr=expr,
+                )
+                for expr, indexes in groups.items()
+            )
+        )
+
+        search_results: List[List[dict]] = [[] for _ in queries]
+        for indexes, results in zip(groups.values(), group_results):
+            for index, hits in zip(indexes, results):
+                search_results[index] = hits
+
+        product_uuids = list(
+            {hit["id"] for hits in search_results for hit in hits}
+        )
+        product_map = await run_in_threadpool(self._load_products, db, product_uuids)
+        return [self._order_products(product_map, hits) for hits in search_results]
+
+    async def _asemantic_search(
+        self,
+        db: Session,
+        query: str,
+        limit: int,
+        score_threshold: Optional[float],
+    ) -> Tuple[List[dict], PriceConstraints, bool]:
+        exists = await asyncio.to_thread(
+            self.vector_store.collection_exists, self.collection_name
+        )
+        if not exists:
+            logger.warning(
+                f"Collection {self.collection_name} does not exist. No embeddings available."
+            )
+            return [], PriceConstraints(), False
+
+        cleaned_query, price_constraints, embedding_task = (
+            await self._aparse_and_embed(query)
+        )
+        try:
+            query_embedding = await embedding_task
+        finally:
+            await _cancel(embedding_task)
+
+        search_results = await self.vector_store.asearch(
+            collection_name=self.collection_name,
+            query_vector=query_embedding,
+            limit=limit,
+            score_threshold=score_threshold,
+            expr=self._build_price_expr(price_constraints),
+        )
+
+        ordered_products = await run_in_threadpool(self._hydrate, db, search_results)
+        return ordered_products, price_constraints, True
+
+    async def _ahybrid_search(
+        self,
+        db: Session,
+        query: str,
+        limit: int,
+        score_threshold: Optional[float],
+    ) -> Tuple[List[dict], PriceConstraints, bool]:
+        cleaned_query, price_constraints, embedding_task = (
+            await self._aparse_and_embed(query)
+        )
+        lexical_task = asyncio.create_task(
+            run_in_threadpool(
+                product_repository.search_lexical,
+                db,
+                query=cleaned_query,
+                limit=settings.HYBRID_LEXICAL_CANDIDATES,
+                min_price=price_constraints.min_price,
+                max_price=price_constraints.max_price,
+            )
+        )
+
+        # The lexical results double as a fallback when the embedding
+        # provider or the vector store is slow or unavailable.
+        vector_results: List[dict] = []
+        vector_ok = False
+        try:
+            query_embedding = await asyncio.wait_for(
+                embedding_task, settings.HYBRID_EMBEDDING_TIMEOUT_SECONDS
+            )
+            vector_results = await self.vector_store.asearch(
+                collection_name=self.collection_name,
+                query_vector=query_embedding,
+                limit=settings.HYBRID_VECTOR_CANDIDATES,
+                score_threshold=score_threshold,
+                expr=self._build_price_expr(price_constraints),
+            )
+            vector_ok = True
+        except Exception as e:
+            logger.warning(
+                f"Vector stage of hybrid search failed, using lexical results only: {e!r}"
+            )
+        finally:
+            await _cancel(embedding_task)
+
+        lexical_results = await lexical_task
+
+        fused = reciprocal_rank_fusion(
+            [
+                [result["id"] for result in vector_results],
+                [product_uuid for product_uuid, _ in lexical_results],
+            ],
+            k=settings.HYBRID_RRF_K,
+        )[:limit]
+
+        search_results = [
+            {"id": product_uuid, "score": score} for product_uuid, score in fused
+        ]
+        ordered_products = await run_in_threadpool(self._hydrate, db, search_results)
+        return ordered_products, price_constraints, vector_ok
+
+    def _cache_key(
+        self,
+        query: str,
+        limit: int,
+        score_threshold: Optional[float],
+        mode: str,
+    ) -> Optional[tuple]:
+        if self.response_cache is None:
+            return None
+        return self.response_cache.make_key(query, limit, score_threshold, mode)
 
-        product_uuids = [result["id"] for result in search_results]
-        products = (
-            db.query(Product)
-            .options(joinedload(Product.categories), joinedload(Product.images))
-            .filter(Product.uuid.in_(product_uuids))
-            .all()
+    def _cached_results(
+        self, db: Session, cache_key: Optional[tuple]
+    ) -> Optional[List[dict]]:
+        """
+        Re-hydrate a cached hit list from Postgres so stock and price are
+        fresh. Returns None (and drops the entry) if any product changed.
+        """
+        if cache_key is None:
+            return None
+        entry = self.response_cache.get(cache_key)
+        if entry is None:
+            return None
+
+        ordered_products = self._hydrate(
+            db,
+            [
+                {"id": product_uuid, "score": score}
+                for product_uuid, score, _ in entry.hits
+            ],
         )
+        if not entry.is_current(ordered_products):
+            self.response_cache.invalidate(cache_key)
+            return None
+        self.response_cache.record_hit()
+        return ordered_products
 
-        product_map = {product.uuid: product for product in products}
+    def _cache_results(
+        self,
+        cache_key: Optional[tuple],
+        ordered_products: List[dict],
+        price_constraints: PriceConstraints,
+    ) -> None:
+        # Empty result sets are not cached: newly indexed products could never
+        # invalidate them.
+        if cache_key is None or not ordered_products:
+            return
+        self.response_cache.set(cache_key, ordered_products, price_constraints)
+
+    async def _aparse_and_embed(
+        self, query: str
+    ) -> Tuple[str, PriceConstraints, asyncio.Task]:
+        """
+        Parse price constraints while the raw query is embedded speculatively.
+        Returns the cleaned query, its constraints and the task producing the
+        embedding of the cleaned query.
+        """
+        embedding_task = asyncio.create_task(
+            self.embedding_service.agenerate_query_embedding(query)
+        )
+        try:
+            cleaned_query, price_constraints = await self._aparse_price_constraints(
+                query
+            )
+        except BaseException:
+            await _cancel(embedding_task)
+            raise
+
+        if normalize_query(cleaned_query) != normalize_query(query):
+            await _cancel(embedding_task)
+            embedding_task = asyncio.create_task(
+                self.embedding_service.agenerate_query_embedding(cleaned_query)
+            )
+        return cleaned_query, price_constraints, embedding_task
+
+    def _hydrate(self, db: Session, search_results: List[dict]) -> List[dict]:
+        if not search_results:
+            return []
+
+        product_map = self._load_products(
+            db, [result["id"] for result in search_results]
+        )
+        return self._order_products(product_map, search_results)
 
-        score_map = {result["id"]: result["score"] for result in search_results}
+    def _load_products(self, db: Session, product_uuids: List[UUID]) -> dict:
+        if not product_uuids:
+            return {}
+        products = with_relations(
+            db.query(Product).filter(Product.uuid.in_(product_uuids))
+        ).all()
+        return {product.uuid: product for product in products}
 
+    @staticmethod
+    def _order_products(product_map: dict, search_results: List[dict]) -> List[dict]:
         ordered_products: List[dict] = []
         for result in search_results:
             product_uuid = result["id"]
@@ -70,10 +360,10 @@ class SemanticSearchService:
                 ordered_products.append(
                     {
                         "product": product_map[product_uuid],
-                        "score": score_map[product_uuid],
+                        "score": result["score"],
                     }
                 )
-        return ordered_products, len(ordered_products)
+        return ordered_products
 
     def _generate_query_embedding(self, query: str) -> List[float]:
         return self.embedding_service.generate_query_embedding(query)
@@ -86,6 +376,16 @@ class SemanticSearchService:
             logger.error(f"Error parsing price constraints: {e}", exc_info=True)
             return query, PriceConstraints()
 
+    async def _aparse_price_constraints(
+        self, query: str
+    ) -> Tuple[str, PriceConstraints]:
+        try:
+            cleaned_query, constraints = await self.price_parser.aparse(query)
+            return cleaned_query, constraints
+        except Exception as e:
+            logger.error(f"Error parsing price constraints: {e}", exc_info=True)
+            return query, PriceConstraints()
+
     def _build_price_expr(self, constraints: PriceConstraints) -> Optional[str]:
         clauses = []
         if constraints.min_price is not None:
@@ -105,10 +405,113 @@ class SemanticSearchService:
                 f"Initialized collection {self.collection_name} with dimension {dimension}"
             )
 
+    def warm_up(self) -> None:
+        """
+        Load the collection and run a throwaway search so the first user
+        query does not pay the load cost.
+        """
+        if not self.vector_store.collection_exists(self.collection_name):
+            logger.warning(
+                f"Collection {self.collection_name} does not exist, skipping warm-up"
+            )
+            return
+        self.vector_store.warm_up(self.collection_name)
+        logger.info(f"Collection {self.collection_name} warmed up")
+
+    def is_ready(self) -> bool:
+        return self.vector_store.is_ready(self.collection_name)
+
+    def stats(self) -> dict:
+        query_cache = getattr(self.embedding_service, "query_cache", None)
+        return {
+            "query_embedding_cache": query_cache.stats() if query_cache else None,
+            "price_parser": self.price_parser.stats(),
+            "search_response_cache": (
+                self.response_cache.stats() if self.response_cache else None
+            ),
+            "rate_limits": rate_limit_stats(),
+        }
+
+    def close(self) -> None:
+        for client in (self.embedding_service, self.vector_store, self.price_parser):
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(f"Error closing {type(client).__name__}: {e}")
+
+    async def aclose(self) -> None:
+        for client in (self.embedding_service, self.vector_store, self.price_parser):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing {type(client).__name__}: {e}")
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[UUID]], k: int = 60
+) -> List[Tuple[UUID, float]]:
+    """
+    Merge several best-first rank lists: each id scores sum(1 / (k + rank)).
+    """
+    scores: dict = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+async def _cancel(task: asyncio.Task) -> None:
+    if task.done():
+        return
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError, Exception):
+        await task
+
+
+# Process-wide instance: the provider clients keep their HTTP/gRPC connection
+# pools open between requests instead of reconnecting on every search.
+_service_lock = threading.Lock()
+_service: Optional[SemanticSearchService] = None
+
+
+def init_semantic_search_service() -> SemanticSearchService:
+    global _service
+    if _service is not None:
+        return _service
+    with _service_lock:
+        if _service is None:
+            _service = SemanticSearchService(
+                embedding_service=create_embedding_service(
+                    query_cache=build_query_embedding_cache()
+                ),
+                vector_store=get_vector_store(),
+                price_parser=PriceQueryParser(),
+                response_cache=build_search_response_cache(),
+            )
+            logger.info("Semantic search clients initialized")
+    return _service
+
+
+def _detach_semantic_search_service() -> Optional[SemanticSearchService]:
+    global _service
+    with _service_lock:
+        service, _service = _service, None
+    return service
+
+
+def close_semantic_search_service() -> None:
+    service = _detach_semantic_search_service()
+    if service is not None:
+        service.close()
+        logger.info("Semantic search clients closed")
+
+
+async def aclose_semantic_search_service() -> None:
+    service = _detach_semantic_search_service()
+    if service is not None:
+        await service.aclose()
+        logger.info("Semantic search clients closed")
+
 
 def get_semantic_search_service() -> SemanticSearchService:
-    return SemanticSearchService(
-        embedding_service=GeminiEmbeddingService(),
-        vector_store=MilvusVectorStore(),
-        price_parser=PriceQueryParser(),
-    )
+    return init_semantic_search_service()
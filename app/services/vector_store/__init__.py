@@ -1,4 +1,16 @@
+from app.core.config import settings
 from app.services.vector_store.base import VectorStore
 from app.services.vector_store.milvus import MilvusVectorStore
+from app.services.vector_store.numpy_store import NumpyVectorStore
 
-__all__ = ["VectorStore", "MilvusVectorStore"]
+
+def get_vector_store() -> VectorStore:
+    backend = settings.VECTOR_STORE_BACKEND
+    if backend == "milvus":
+        return MilvusVectorStore()
+    if backend == "numpy":
+        return NumpyVectorStore()
+    raise ValueError(f"Unknown VECTOR_STORE_BACKEND: {backend}")
+
+
+__all__ = ["VectorStore", "MilvusVectorStore", "NumpyVectorStore", "get_vector_store"]
@@ -1,5 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
 from uuid import UUID
 
 
@@ -28,6 +29,7 @@ class VectorStore(ABC):
         vectors: List[List[float]],
         ids: List[UUID],
         metadatas: Optional[List[Dict]] = None,
+        durable: bool = False,
     ) -> None:
         """
         Insert vectors into the collection.
@@ -37,6 +39,38 @@ class VectorStore(ABC):
             vectors: List of embedding vectors
             ids: List of product UUIDs corresponding to vectors
             metadatas: Optional list of metadata dictionaries
+            durable: Persist synchronously instead of leaving it to flush()
+        """
+        pass
+
+    @abstractmethod
+    def upsert_vectors(
+        self,
+        collection_name: str,
+        vectors: List[List[float]],
+        ids: List[UUID],
+        metadatas: Optional[List[Dict]] = None,
+        durable: bool = False,
+    ) -> None:
+        """
+        Insert vectors, replacing any existing vectors with the same IDs.
+
+        Args:
+            collection_name: Name of the collection
+            vectors: List of embedding vectors
+            ids: List of product UUIDs corresponding to vectors
+            metadatas: Optional list of metadata dictionaries
+            durable: Persist synchronously instead of leaving it to flush()
+        """
+        pass
+
+    def flush(self, collection_name: str) -> None:
+        """
+        Persist pending writes. Called periodically rather than after every
+        write so small writes do not seal tiny segments.
+
+        Args:
+            collection_name: Name of the collection
         """
         pass
 
@@ -66,14 +100,79 @@ class VectorStore(ABC):
         """
         pass
 
+    async def asearch(
+        self,
+        collection_name: str,
+        query_vector: List[float],
+        limit: int = 10,
+        score_threshold: Optional[float] = None,
+        expr: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Async variant of search. Stores with a native async client should
+        override this; the default runs the sync search in a worker thread.
+        """
+        return await asyncio.to_thread(
+            self.search,
+            collection_name,
+            query_vector,
+            limit,
+            score_threshold,
+            expr,
+        )
+
+    def search_batch(
+        self,
+        collection_name: str,
+        query_vectors: List[List[float]],
+        limit: int = 10,
+        score_threshold: Optional[float] = None,
+        expr: Optional[str] = None,
+    ) -> List[List[Dict]]:
+        """
+        Search for several query vectors sharing the same filter.
+        Stores with multi-vector search should override this to make a
+        single round-trip.
+
+        Returns:
+            One result list (see search) per query vector, in input order
+        """
+        return [
+            self.search(collection_name, vector, limit, score_threshold, expr)
+            for vector in query_vectors
+        ]
+
+    async def asearch_batch(
+        self,
+        collection_name: str,
+        query_vectors: List[List[float]],
+        limit: int = 10,
+        score_threshold: Optional[float] = None,
+        expr: Optional[str] = None,
+    ) -> List[List[Dict]]:
+        """
+        Async variant of search_batch.
+        """
+        return await asyncio.to_thread(
+            self.search_batch,
+            collection_name,
+            query_vectors,
+            limit,
+            score_threshold,
+            expr,
+        )
+
     @abstractmethod
-    def delete_vectors(self, collection_name: str, ids: List[UUID]) -> None:
+    def delete_vectors(
+        self, collection_name: str, ids: List[UUID], durable: bool = False
+    ) -> None:
         """
         Delete vectors by their IDs.
 
         Args:
             collection_name: Name of the collection
             ids: List of product UUIDs to delete
+            durable: Persist synchronously instead of leaving it to flush()
         """
         pass
 
@@ -96,6 +195,29 @@ class VectorStore(ABC):
         """
         pass
 
+    @abstractmethod
+    def update_metadata(
+        self,
+        collection_name: str,
+        ids: List[UUID],
+        metadatas: List[Dict],
+        durable: bool = False,
+    ) -> List[UUID]:
+        """
+        Update scalar fields (e.g. price) of existing vectors without
+        re-embedding.
+
+        Args:
+            collection_name: Name of the collection
+            ids: List of product UUIDs to update
+            metadatas: New metadata for each ID
+            durable: Persist synchronously instead of leaving it to flush()
+
+        Returns:
+            IDs that are not in the collection and were not updated
+        """
+        pass
+
     @abstractmethod
     def collection_exists(self, collection_name: str) -> bool:
         """
@@ -108,3 +230,69 @@ class VectorStore(ABC):
             True if collection exists, False otherwise
         """
         pass
+
+    @abstractmethod
+    def iterate_ids(
+        self, collection_name: str, batch_size: int = 1000
+    ) -> Iterator[List[UUID]]:
+        """
+        Stream the IDs of every stored vector in batches. An ID stored more
+        than once is yielded once per copy.
+
+        Args:
+            collection_name: Name of the collection
+            batch_size: Maximum number of IDs per yielded batch
+
+        Returns:
+            An iterator of ID batches
+        """
+        pass
+
+    @abstractmethod
+    def count_ids(self, collection_name: str, ids: List[UUID]) -> Dict[UUID, int]:
+        """
+        Count the stored copies of each of the given IDs.
+
+        Args:
+            collection_name: Name of the collection
+            ids: List of product UUIDs to look up
+
+        Returns:
+            Number of stored vectors per ID; IDs with none are omitted
+        """
+        pass
+
+    def warm_up(self, collection_name: str) -> None:
+        """
+        Prepare a collection for serving (e.g. load it into memory and run a
+        throwaway query) so the first user search does not pay that cost.
+
+        Args:
+            collection_name: Name of the collection
+        """
+        pass
+
+    def is_ready(self, collection_name: str) -> bool:
+        """
+        Check whether a collection can serve searches right now.
+
+        Args:
+            collection_name: Name of the collection
+
+        Returns:
+            True if searches can be served without further loading
+        """
+        return self.collection_exists(collection_name)
+
+    def close(self) -> None:
+        """
+        Release the connection held by the vector store.
+        Implementations that keep long-lived connections should override this.
+        """
+        pass
+
+    async def aclose(self) -> None:
+        """
+        Release sync and async connections held by the vector store.
+        """
+        self.close()
@@ -0,0 +1,61 @@
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from app.services.vector_store.base import VectorStore
+
+
+def _percentile_ms(latencies: List[float], percentile: float) -> float:
+    return float(np.percentile(latencies, percentile) * 1000) if latencies else 0.0
+
+
+def _timed_search(
+    vector_store: VectorStore, collection_name: str, queries: List[List[float]], k: int
+) -> tuple:
+    vector_store.warm_up(collection_name)
+    results, latencies = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(vector_store.search(collection_name, query, limit=k))
+        latencies.append(time.perf_counter() - started)
+    return results, latencies
+
+
+def compare_collections(
+    vector_store: VectorStore,
+    baseline_name: str,
+    candidate_name: str,
+    queries: List[List[float]],
+    k: int = 10,
+) -> Dict:
+    """
+    Run the same queries against two collections holding the same vectors
+    and report per-collection latency plus recall@k of the candidate, using
+    the baseline's top-k as ground truth.
+    """
+    baseline, baseline_latencies = _timed_search(vector_store, baseline_name, queries, k)
+    candidate, candidate_latencies = _timed_search(
+        vector_store, candidate_name, queries, k
+    )
+
+    recalls = []
+    for expected, actual in zip(baseline, candidate):
+        expected_ids = {hit["id"] for hit in expected}
+        if expected_ids:
+            actual_ids = {hit["id"] for hit in actual}
+            recalls.append(len(expected_ids & actual_ids) / len(expected_ids))
+
+    return {
+        "queries": len(queries),
+        "k": k,
+        "recall_at_k": float(np.mean(recalls)) if recalls else 0.0,
+        "baseline": {
+            "p50_ms": _percentile_ms(baseline_latencies, 50),
+            "p95_ms": _percentile_ms(baseline_latencies, 95),
+        },
+        "candidate": {
+            "p50_ms": _percentile_ms(candidate_latencies, 50),
+            "p95_ms": _percentile_ms(candidate_latencies, 95),
+        },
+    }
@@ -1,7 +1,13 @@
-from typing import List, Dict, Optional
+import asyncio
+import logging
+import threading
+from collections import Counter
+from typing import Iterator, List, Dict, Optional, Set
 from uuid import UUID
 
+import numpy as np
 from pymilvus import (
+    AsyncMilvusClient,
     connections,
     Collection,
     FieldSchema,
@@ -9,13 +15,56 @@ from pymilvus import (
     DataType,
     utility,
 )
+from pymilvus.client.types import LoadState
 
 from app.services.vector_store.base import VectorStore
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 
 EXPECTED_DIM = 768
 
+SEARCH_PARAMS = {
+    "metric_type": "COSINE",
+    "params": {"nprobe": 32},
+}
+
+
+# Vector field type, index type and build params per storage option.
+# float16 halves vector memory; IVF_SQ8 quantizes each dimension to one byte;
+# IVF_PQ stores m sub-vector codes of nbits each.
+VECTOR_STORAGE = {
+    "float32": (DataType.FLOAT_VECTOR, "IVF_FLAT", {"nlist": 2048}),
+    "float16": (DataType.FLOAT16_VECTOR, "IVF_FLAT", {"nlist": 2048}),
+    "sq8": (DataType.FLOAT_VECTOR, "IVF_SQ8", {"nlist": 2048}),
+    "pq": (DataType.FLOAT_VECTOR, "IVF_PQ", {"nlist": 2048, "m": 96, "nbits": 8}),
+}
+
+
+def bytes_per_vector(storage: str, dimension: int = EXPECTED_DIM) -> float:
+    """Approximate in-memory size of one indexed vector for a storage option."""
+    if storage == "float32":
+        return dimension * 4
+    if storage == "float16":
+        return dimension * 2
+    if storage == "sq8":
+        return dimension
+    if storage == "pq":
+        params = VECTOR_STORAGE["pq"][2]
+        return params["m"] * params["nbits"] / 8
+    raise ValueError(f"Unknown vector storage: {storage}")
+
+
+def row_vector(value) -> List[float]:
+    """Vector field value of a query result as a list of floats."""
+    # FLOAT16_VECTOR values come back as raw bytes, sometimes wrapped in a list
+    if isinstance(value, list) and len(value) == 1 and isinstance(value[0], bytes):
+        value = value[0]
+    if isinstance(value, bytes):
+        return np.frombuffer(value, dtype=np.float16).astype(np.float32).tolist()
+    return [float(x) for x in value]
+
 
 def validate_vector(vec: List[float]) -> None:
     if len(vec) != EXPECTED_DIM:
@@ -28,17 +77,40 @@ def validate_vector(vec: List[float]) -> None:
 class MilvusVectorStore(VectorStore):
     def __init__(self):
         self.collection_name = settings.MILVUS_COLLECTION_NAME
+        self._alias = settings.MILVUS_CONNECTION_ALIAS
+        # Writes are not flushed on the hot path; the consistency level decides
+        # how soon searches see them (Bounded/Session/Strong/Eventually).
+        self.consistency_level = settings.MILVUS_CONSISTENCY_LEVEL
 
         connections.connect(
-            alias="default",
+            alias=self._alias,
             uri=settings.MILVUS_URI,
             token=settings.MILVUS_TOKEN,
         )
+        self._async_client: Optional[AsyncMilvusClient] = None
+        self._collections: Dict[str, Collection] = {}
+        self._loaded: Set[str] = set()
+        self._float16: Dict[str, bool] = {}
+        self._handle_lock = threading.Lock()
 
-    def initialize_collection(self, collection_name: str, dimension: int) -> None:
-        if utility.has_collection(collection_name):
+    def initialize_collection(
+        self,
+        collection_name: str,
+        dimension: int,
+        storage: Optional[str] = None,
+    ) -> None:
+        """
+        Create the collection and its vector index. `storage` picks one of
+        VECTOR_STORAGE and defaults to MILVUS_VECTOR_STORAGE.
+        """
+        if self.collection_exists(collection_name):
             return
 
+        storage = storage or settings.MILVUS_VECTOR_STORAGE
+        if storage not in VECTOR_STORAGE:
+            raise ValueError(f"Unknown vector storage: {storage}")
+        vector_type, index_type, build_params = VECTOR_STORAGE[storage]
+
         if dimension != EXPECTED_DIM:
             raise ValueError(
                 f"Collection dimension {dimension} does not match EXPECTED_DIM {EXPECTED_DIM}"
@@ -57,19 +129,22 @@ class MilvusVectorStore(VectorStore):
             ),
             FieldSchema(
                 name="embedding",
-                dtype=DataType.FLOAT_VECTOR,
+                dtype=vector_type,
                 dim=dimension,
             ),
         ]
 
         schema = CollectionSchema(fields, description="Product embeddings with price")
 
-        collection = Collection(name=collection_name, schema=schema)
+        collection = Collection(name=collection_name, schema=schema, using=self._alias)
+        with self._handle_lock:
+            self._collections[collection_name] = collection
+            self._float16[collection_name] = storage == "float16"
 
         index_params = {
             "metric_type": "COSINE",
-            "index_type": "IVF_FLAT",
-            "params": {"nlist": 2048},
+            "index_type": index_type,
+            "params": build_params,
         }
         collection.create_index(field_name="embedding", index_params=index_params)
 
@@ -79,7 +154,40 @@ class MilvusVectorStore(VectorStore):
         vectors: List[List[float]],
         ids: List[UUID],
         metadatas: Optional[List[Dict]] = None,
+        durable: bool = False,
+    ) -> None:
+        data = self._build_rows(collection_name, vectors, ids, metadatas)
+
+        collection = self._get_collection(collection_name)
+        collection.insert(data)
+        if durable:
+            collection.flush()
+
+    def upsert_vectors(
+        self,
+        collection_name: str,
+        vectors: List[List[float]],
+        ids: List[UUID],
+        metadatas: Optional[List[Dict]] = None,
+        durable: bool = False,
     ) -> None:
+        data = self._build_rows(collection_name, vectors, ids, metadatas)
+
+        collection = self._get_collection(collection_name)
+        collection.upsert(data)
+        if durable:
+            collection.flush()
+
+    def flush(self, collection_name: str) -> None:
+        self._get_collection(collection_name).flush()
+
+    def _build_rows(
+        self,
+        collection_name: str,
+        vectors: List[List[float]],
+        ids: List[UUID],
+        metadatas: Optional[List[Dict]],
+    ) -> list:
         if len(vectors) != len(ids):
             raise ValueError("vectors and ids must have the same length")
 
@@ -95,14 +203,50 @@ class MilvusVectorStore(VectorStore):
         for vec in vectors:
             validate_vector(vec)
 
-        collection = Collection(collection_name)
-
         id_strings = [str(uid) for uid in ids]
 
-        data = [id_strings, prices, vectors]
-
-        collection.insert(data)
-        collection.flush()
+        return [id_strings, prices, self._vector_data(collection_name, vectors)]
+
+    def _vector_data(self, collection_name: str, vectors: List[List[float]]) -> list:
+        # FLOAT16_VECTOR fields take numpy float16 arrays, for writes and queries
+        if self._uses_float16(collection_name):
+            return list(np.asarray(vectors, dtype=np.float16))
+        return vectors
+
+    def _uses_float16(self, collection_name: str) -> bool:
+        uses_float16 = self._float16.get(collection_name)
+        if uses_float16 is None:
+            collection = self._get_collection(collection_name)
+            uses_float16 = any(
+                field.name == "embedding" and field.dtype == DataType.FLOAT16_VECTOR
+                for field in collection.schema.fields
+            )
+            self._float16[collection_name] = uses_float16
+        return uses_float16
+
+    def collection_storage(self, collection_name: str) -> Optional[str]:
+        """
+        VECTOR_STORAGE option an existing collection was built with, read
+        from its vector field type and index; None if it matches none.
+        """
+        collection = self._get_collection(collection_name)
+        vector_type = next(
+            (
+                field.dtype
+                for field in collection.schema.fields
+                if field.name == "embedding"
+            ),
+            None,
+        )
+        index_types = {
+            index.params.get("index_type")
+            for index in collection.indexes
+            if index.field_name == "embedding"
+        }
+        for storage, (dtype, index_type, _) in VECTOR_STORAGE.items():
+            if dtype == vector_type and index_type in index_types:
+                return storage
+        return None
 
     def search(
         self,
@@ -112,59 +256,127 @@ class MilvusVectorStore(VectorStore):
         score_threshold: Optional[float] = None,
         expr: Optional[str] = None,
     ) -> List[Dict]:
-        validate_vector(query_vector)
-
-        collection = Collection(collection_name)
+        return self.search_batch(
+            collection_name, [query_vector], limit, score_threshold, expr
+        )[0]
 
-        try:
-            collection.load()
-        except Exception:
-            pass
+    def search_batch(
+        self,
+        collection_name: str,
+        query_vectors: List[List[float]],
+        limit: int = 10,
+        score_threshold: Optional[float] = None,
+        expr: Optional[str] = None,
+    ) -> List[List[Dict]]:
+        for vec in query_vectors:
+            validate_vector(vec)
 
-        search_params = {
-            "metric_type": "COSINE",
-            "params": {"nprobe": 32},
-        }
+        collection = self._get_collection(collection_name)
+        if collection_name not in self._loaded:
+            self.ensure_loaded(collection_name)
 
         search_kwargs: Dict = {
-            "data": [query_vector],
+            "data": self._vector_data(collection_name, query_vectors),
             "anns_field": "embedding",
-            "param": search_params,
+            "param": SEARCH_PARAMS,
             "limit": limit,
             "output_fields": ["id", "price"],
+            "consistency_level": self.consistency_level,
         }
         if expr:
             search_kwargs["expr"] = expr
 
-        results = collection.search(**search_kwargs)
+        try:
+            results = collection.search(**search_kwargs)
+        except Exception:
+            # e.g. the collection was released; load it again next time
+            self._loaded.discard(collection_name)
+            raise
+
+        return [
+            [
+                {
+                    "id": UUID(hit.id),
+                    "score": hit.score,
+                }
+                for hit in hits
+                if score_threshold is None or hit.score >= score_threshold
+            ]
+            for hits in results
+        ]
 
-        formatted_results = []
-        for hit in results[0]:
-            if score_threshold is None or hit.score >= score_threshold:
-                formatted_results.append(
-                    {
-                        "id": UUID(hit.id),
-                        "score": hit.score,
-                    }
-                )
+    async def asearch(
+        self,
+        collection_name: str,
+        query_vector: List[float],
+        limit: int = 10,
+        score_threshold: Optional[float] = None,
+        expr: Optional[str] = None,
+    ) -> List[Dict]:
+        results = await self.asearch_batch(
+            collection_name, [query_vector], limit, score_threshold, expr
+        )
+        return results[0]
 
-        return formatted_results
+    async def asearch_batch(
+        self,
+        collection_name: str,
+        query_vectors: List[List[float]],
+        limit: int = 10,
+        score_threshold: Optional[float] = None,
+        expr: Optional[str] = None,
+    ) -> List[List[Dict]]:
+        for vec in query_vectors:
+            validate_vector(vec)
+
+        # Startup warm-up may have failed; load before the first search
+        if collection_name not in self._loaded:
+            await asyncio.to_thread(self.ensure_loaded, collection_name)
+
+        try:
+            results = await self._get_async_client().search(
+                collection_name=collection_name,
+                data=self._vector_data(collection_name, query_vectors),
+                anns_field="embedding",
+                search_params=SEARCH_PARAMS,
+                limit=limit,
+                filter=expr or "",
+                output_fields=["id", "price"],
+                consistency_level=self.consistency_level,
+            )
+        except Exception:
+            self._loaded.discard(collection_name)
+            raise
+
+        return [
+            [
+                {
+                    "id": UUID(hit["id"]),
+                    "score": hit["distance"],
+                }
+                for hit in hits
+                if score_threshold is None or hit["distance"] >= score_threshold
+            ]
+            for hits in results
+        ]
 
     def delete_vectors(
         self,
         collection_name: str,
         ids: List[UUID],
+        durable: bool = False,
     ) -> None:
         if not ids:
             return
 
-        collection = Collection(collection_name)
+        collection = self._get_collection(collection_name)
 
         id_strings = [str(uid) for uid in ids]
 
         expr = f"id in {id_strings}"
         collection.delete(expr=expr)
-        collection.flush()
+        if durable:
+            collection.flush()
 
     def update_vector(
         self,
@@ -173,16 +385,178 @@ class MilvusVectorStore(VectorStore):
         vector: List[float],
         metadata: Optional[Dict] = None,
     ) -> None:
-        validate_vector(vector)
-
-        self.delete_vectors(collection_name, [vector_id])
-
-        self.insert_vectors(
+        self.upsert_vectors(
             collection_name=collection_name,
             vectors=[vector],
             ids=[vector_id],
             metadatas=[metadata] if metadata else None,
         )
 
+    def update_metadata(
+        self,
+        collection_name: str,
+        ids: List[UUID],
+        metadatas: List[Dict],
+        durable: bool = False,
+    ) -> List[UUID]:
+        if len(metadatas) != len(ids):
+            raise ValueError("ids and metadatas must have the same length")
+        if not ids:
+            return []
+
+        # Upsert replaces whole rows, so read the stored vectors back and
+        # write them with the new scalars instead of calling the embedder.
+        # Strong consistency so rows upserted moments ago are not missed.
+        collection = self._get_collection(collection_name)
+        metadata_by_id = {str(uid): md for uid, md in zip(ids, metadatas)}
+        rows = collection.query(
+            expr=f"id in {list(metadata_by_id)}",
+            output_fields=["id", "embedding"],
+            consistency_level="Strong",
+        )
+        found = {row["id"] for row in rows}
+        missing = [UUID(uid) for uid in metadata_by_id if uid not in found]
+        if not rows:
+            return missing
+
+        self.upsert_vectors(
+            collection_name=collection_name,
+            vectors=[row_vector(row["embedding"]) for row in rows],
+            ids=[row["id"] for row in rows],
+            metadatas=[metadata_by_id[row["id"]] for row in rows],
+            durable=durable,
+        )
+        return missing
+
     def collection_exists(self, collection_name: str) -> bool:
-        return utility.has_collection(collection_name)
+        return utility.has_collection(collection_name, using=self._alias)
+
+    def drop_collection(self, collection_name: str) -> None:
+        with self._handle_lock:
+            self._collections.pop(collection_name, None)
+            self._float16.pop(collection_name, None)
+            self._loaded.discard(collection_name)
+        utility.drop_collection(collection_name, using=self._alias)
+
+    def iterate_ids(
+        self, collection_name: str, batch_size: int = 1000
+    ) -> Iterator[List[UUID]]:
+        for rows in self.iterate_rows(collection_name, batch_size, output_fields=["id"]):
+            yield [UUID(row["id"]) for row in rows]
+
+    def count_ids(self, collection_name: str, ids: List[UUID]) -> Dict[UUID, int]:
+        if not ids:
+            return {}
+        rows = self._get_collection(collection_name).query(
+            expr=f"id in {[str(uid) for uid in ids]}",
+            output_fields=["id"],
+            consistency_level="Strong",
+        )
+        return dict(Counter(UUID(row["id"]) for row in rows))
+
+    def iterate_rows(
+        self,
+        collection_name: str,
+        batch_size: int = 1000,
+        output_fields: Optional[List[str]] = None,
+    ) -> Iterator[List[Dict]]:
+        """Yield all rows (by default id, price and embedding) in batches."""
+        iterator = self._get_collection(collection_name).query_iterator(
+            batch_size=batch_size,
+            output_fields=output_fields or ["id", "price", "embedding"],
+        )
+        try:
+            while True:
+                rows = iterator.next()
+                if not rows:
+                    return
+                yield rows
+        finally:
+            iterator.close()
+
+    def copy_collection(
+        self,
+        source_name: str,
+        target_name: str,
+        storage: str,
+        batch_size: int = 1000,
+    ) -> int:
+        """
+        Create `target_name` with the given storage option and fill it with
+        every row of `source_name`. Returns the number of rows copied.
+        """
+        self.initialize_collection(target_name, EXPECTED_DIM, storage=storage)
+        copied = 0
+        for rows in self.iterate_rows(source_name, batch_size):
+            self.insert_vectors(
+                target_name,
+                vectors=[row_vector(row["embedding"]) for row in rows],
+                ids=[row["id"] for row in rows],
+                metadatas=[{"price": row["price"]} for row in rows],
+            )
+            copied += len(rows)
+        self.flush(target_name)
+        return copied
+
+    def memory_usage(self, collection_name: str) -> int:
+        """Bytes held by the loaded segments of a collection on query nodes."""
+        segments = utility.get_query_segment_info(collection_name, using=self._alias)
+        return sum(segment.mem_size for segment in segments)
+
+    def ensure_loaded(self, collection_name: str, timeout: Optional[float] = None) -> bool:
+        """
+        Load the collection into query nodes once and remember that it is
+        loaded. Returns True when Milvus reports the collection as loaded.
+        """
+        if collection_name in self._loaded:
+            return True
+
+        collection = self._get_collection(collection_name)
+        collection.load(timeout=timeout)
+        state = utility.load_state(collection_name, using=self._alias)
+        if state != LoadState.Loaded:
+            logger.warning(f"Collection {collection_name} load state is {state}")
+            return False
+
+        self._loaded.add(collection_name)
+        logger.info(f"Collection {collection_name} loaded")
+        return True
+
+    def warm_up(self, collection_name: str) -> None:
+        if not self.ensure_loaded(collection_name):
+            return
+        probe = [0.0] * EXPECTED_DIM
+        probe[0] = 1.0
+        self.search(collection_name, probe, limit=1)
+
+    def is_ready(self, collection_name: str) -> bool:
+        return collection_name in self._loaded
+
+    def _get_collection(self, collection_name: str) -> Collection:
+        collection = self._collections.get(collection_name)
+        if collection is None:
+            with self._handle_lock:
+                collection = self._collections.get(collection_name)
+                if collection is None:
+                    collection = Collection(collection_name, using=self._alias)
+                    self._collections[collection_name] = collection
+        return collection
+
+    def close(self) -> None:
+        connections.disconnect(self._alias)
+
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+        self.close()
+
+    def _get_async_client(self) -> AsyncMilvusClient:
+        # The async gRPC channel binds to the running event loop, so it is
+        # created lazily from inside the loop rather than in __init__.
+        if self._async_client is None:
+            self._async_client = AsyncMilvusClient(
+                uri=settings.MILVUS_URI,
+                token=settings.MILVUS_TOKEN,
+            )
+        return self._async_client
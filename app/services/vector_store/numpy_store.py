@@ -0,0 +1,478 @@
+import fcntl
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from uuid import UUID
+
+import numpy as np
+
+from app.services.vector_store.base import VectorStore
+from app.core.config import settings
+
+
+META_FILE = "meta.json"
+LOCK_FILE = ".lock"
+ID_DTYPE = "S36"
+INITIAL_CAPACITY = 1024
+
+_PRICE_CLAUSE = re.compile(r"^price\s*(>=|<=|>|<|==)\s*(-?[\d.]+(?:e-?\d+)?)$")
+_ID_CLAUSE = re.compile(r"^id\s+in\s+\[(.*)\]$")
+
+
+class _CollectionData:
+    """
+    One collection on disk: fixed-capacity memory-mapped arrays for vectors,
+    prices, ids and a liveness mask, plus a small JSON header.
+    Rows past `count` are unused; deleted rows are tombstoned in `alive`.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        meta_path = path / META_FILE
+        meta = json.loads(meta_path.read_text())
+        self.version = _file_version(meta_path)
+        self.dimension = meta["dimension"]
+        self.count = meta["count"]
+        self.capacity = meta["capacity"]
+        self.tombstones = meta["tombstones"]
+
+        shape = (self.capacity, self.dimension)
+        self.vectors = np.memmap(path / "vectors.f32", np.float32, "r+", shape=shape)
+        self.prices = np.memmap(path / "prices.f32", np.float32, "r+", shape=(self.capacity,))
+        self.alive = np.memmap(path / "alive.u8", np.uint8, "r+", shape=(self.capacity,))
+        self.ids = np.memmap(path / "ids.s36", ID_DTYPE, "r+", shape=(self.capacity,))
+
+        rows = np.flatnonzero(self.alive[: self.count])
+        self.row_by_id: Dict[str, int] = dict(
+            zip(np.char.decode(self.ids[rows]).tolist(), rows.tolist())
+        )
+
+    @classmethod
+    def create(
+        cls,
+        path: Path,
+        dimension: int,
+        capacity: int,
+        source: Optional["_CollectionData"] = None,
+        rows: Optional[np.ndarray] = None,
+    ) -> "_CollectionData":
+        """
+        Write a fresh set of files, optionally copying `rows` from `source`.
+        Files are written next to the live ones and swapped in with
+        os.replace, so readers holding the old mapping are unaffected.
+        """
+        path.mkdir(parents=True, exist_ok=True)
+        count = 0 if rows is None else len(rows)
+
+        arrays = [
+            ("vectors.f32", np.float32, (capacity, dimension), "vectors"),
+            ("prices.f32", np.float32, (capacity,), "prices"),
+            ("alive.u8", np.uint8, (capacity,), "alive"),
+            ("ids.s36", ID_DTYPE, (capacity,), "ids"),
+        ]
+        for filename, dtype, shape, attr in arrays:
+            tmp_path = path / f"{filename}.tmp"
+            data = np.memmap(tmp_path, dtype, "w+", shape=shape)
+            if count:
+                data[:count] = getattr(source, attr)[rows]
+            data.flush()
+            del data
+            os.replace(tmp_path, path / filename)
+
+        _write_meta(path, dimension, count, capacity, tombstones=0)
+        return cls(path)
+
+    def commit(self, durable: bool = False) -> None:
+        """
+        Publish the new row count to other processes. The mappings are
+        shared, so readers see the rows without an msync; `durable=True`
+        also forces them to disk.
+        """
+        if durable:
+            for data in (self.vectors, self.prices, self.alive, self.ids):
+                data.flush()
+        _write_meta(self.path, self.dimension, self.count, self.capacity, self.tombstones)
+        self.version = _file_version(self.path / META_FILE)
+
+
+def _file_version(path: Path) -> tuple:
+    # The header is always replaced atomically, so a new inode (or mtime)
+    # means another writer has changed the collection.
+    stat = path.stat()
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def _write_meta(
+    path: Path, dimension: int, count: int, capacity: int, tombstones: int
+) -> None:
+    tmp_path = path / f"{META_FILE}.tmp"
+    tmp_path.write_text(
+        json.dumps(
+            {
+                "dimension": dimension,
+                "count": count,
+                "capacity": capacity,
+                "tombstones": tombstones,
+            }
+        )
+    )
+    os.replace(tmp_path, path / META_FILE)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    In-process vector store for development, tests and small deployments.
+
+    Vectors are kept L2-normalized in a contiguous float32 matrix so cosine
+    similarity is a single matrix-vector product. Collections are persisted
+    as np.memmap files under NUMPY_VECTOR_STORE_PATH; writers serialize on a
+    file lock and readers in other processes pick up changes on their next
+    search.
+    """
+
+    def __init__(self, base_path: Optional[str] = None) -> None:
+        self.base_path = Path(base_path or settings.NUMPY_VECTOR_STORE_PATH)
+        self.compaction_ratio = settings.NUMPY_VECTOR_STORE_COMPACTION_RATIO
+        self._collections: Dict[str, _CollectionData] = {}
+        self._lock = threading.RLock()
+
+    def initialize_collection(self, collection_name: str, dimension: int) -> None:
+        with self._write_lock(collection_name, must_exist=False):
+            if self.collection_exists(collection_name):
+                return
+            self._collections[collection_name] = _CollectionData.create(
+                self._path(collection_name), dimension, INITIAL_CAPACITY
+            )
+
+    def insert_vectors(
+        self,
+        collection_name: str,
+        vectors: List[List[float]],
+        ids: List[UUID],
+        metadatas: Optional[List[Dict]] = None,
+        durable: bool = False,
+    ) -> None:
+        if len(vectors) != len(ids):
+            raise ValueError("vectors and ids must have the same length")
+
+        if metadatas is None or len(metadatas) != len(vectors):
+            raise ValueError("metadatas with 'price' is required for each vector")
+
+        prices: List[float] = []
+        for md in metadatas:
+            if md is None or "price" not in md:
+                raise ValueError("metadata must include 'price' for each vector")
+            prices.append(float(md["price"]))
+
+        if not vectors:
+            return
+
+        # Re-inserting an id replaces it, so ids stay unique; within one
+        # batch the last occurrence wins.
+        last_index = {str(uid): index for index, uid in enumerate(ids)}
+        keep = sorted(last_index.values())
+        id_strings = [str(ids[index]) for index in keep]
+        matrix = np.asarray(vectors, dtype=np.float32)[keep]
+        prices = [prices[index] for index in keep]
+
+        with self._write_lock(collection_name) as data:
+            if matrix.ndim != 2 or matrix.shape[1] != data.dimension:
+                raise ValueError(
+                    f"Invalid embedding dimension: {matrix.shape[-1]}. "
+                    f"Expected {data.dimension}."
+                )
+
+            self._tombstone(data, id_strings)
+
+            if data.count + len(id_strings) > data.capacity:
+                data = self._rewrite(
+                    collection_name,
+                    data,
+                    capacity=max(data.capacity * 2, data.count + len(id_strings)),
+                    compact=False,
+                )
+
+            start, end = data.count, data.count + len(id_strings)
+            data.vectors[start:end] = _normalize(matrix)
+            data.prices[start:end] = prices
+            data.ids[start:end] = id_strings
+            data.alive[start:end] = 1
+            data.count = end
+            for offset, id_string in enumerate(id_strings):
+                data.row_by_id[id_string] = start + offset
+
+            data.commit(durable)
+
+    def upsert_vectors(
+        self,
+        collection_name: str,
+        vectors: List[List[float]],
+        ids: List[UUID],
+        metadatas: Optional[List[Dict]] = None,
+        durable: bool = False,
+    ) -> None:
+        # Inserts already replace existing ids
+        self.insert_vectors(collection_name, vectors, ids, metadatas, durable)
+
+    def flush(self, collection_name: str) -> None:
+        with self._write_lock(collection_name) as data:
+            data.commit(durable=True)
+
+    def search(
+        self,
+        collection_name: str,
+        query_vector: List[float],
+        limit: int = 10,
+        score_threshold: Optional[float] = None,
+        expr: Optional[str] = None,
+    ) -> List[Dict]:
+        return self.search_batch(
+            collection_name, [query_vector], limit, score_threshold, expr
+        )[0]
+
+    def search_batch(
+        self,
+        collection_name: str,
+        query_vectors: List[List[float]],
+        limit: int = 10,
+        score_threshold: Optional[float] = None,
+        expr: Optional[str] = None,
+    ) -> List[List[Dict]]:
+        data = self._get(collection_name)
+        count = data.count
+        if count == 0:
+            return [[] for _ in query_vectors]
+
+        queries = _normalize(np.asarray(query_vectors, dtype=np.float32))
+        if queries.ndim != 2 or queries.shape[1] != data.dimension:
+            raise ValueError(
+                f"Invalid embedding dimension: {queries.shape[-1]}. "
+                f"Expected {data.dimension}."
+            )
+
+        # (count, n_queries): one matrix product for the whole batch
+        all_scores = data.vectors[:count] @ queries.T
+        mask = data.alive[:count].astype(bool)
+        if expr:
+            mask &= self._filter_mask(data, count, expr)
+
+        results = []
+        for column in range(queries.shape[0]):
+            scores = all_scores[:, column]
+            query_mask = mask
+            if score_threshold is not None:
+                query_mask = mask & (scores >= score_threshold)
+            results.append(self._top_k(data, scores, query_mask, limit))
+        return results
+
+    @staticmethod
+    def _top_k(
+        data: _CollectionData, scores: np.ndarray, mask: np.ndarray, limit: int
+    ) -> List[Dict]:
+        candidates = np.flatnonzero(mask)
+        if len(candidates) == 0:
+            return []
+
+        k = min(limit, len(candidates))
+        candidate_scores = scores[candidates]
+        top = np.argpartition(-candidate_scores, k - 1)[:k]
+        top = top[np.argsort(-candidate_scores[top], kind="stable")]
+        rows = candidates[top]
+
+        return [
+            {"id": UUID(data.ids[row].decode()), "score": float(scores[row])}
+            for row in rows
+        ]
+
+    def delete_vectors(
+        self, collection_name: str, ids: List[UUID], durable: bool = False
+    ) -> None:
+        if not ids:
+            return
+
+        with self._write_lock(collection_name) as data:
+            self._tombstone(data, [str(uid) for uid in ids])
+            if data.tombstones and data.tombstones >= self.compaction_ratio * data.count:
+                data = self._rewrite(
+                    collection_name, data, capacity=data.capacity, compact=True
+                )
+            data.commit(durable)
+
+    def update_vector(
+        self,
+        collection_name: str,
+        vector_id: UUID,
+        vector: List[float],
+        metadata: Optional[Dict] = None,
+    ) -> None:
+        self.upsert_vectors(
+            collection_name=collection_name,
+            vectors=[vector],
+            ids=[vector_id],
+            metadatas=[metadata] if metadata else None,
+        )
+
+    def update_metadata(
+        self,
+        collection_name: str,
+        ids: List[UUID],
+        metadatas: List[Dict],
+        durable: bool = False,
+    ) -> List[UUID]:
+        if len(metadatas) != len(ids):
+            raise ValueError("ids and metadatas must have the same length")
+        if not ids:
+            return []
+
+        missing = []
+        with self._write_lock(collection_name) as data:
+            for uid, md in zip(ids, metadatas):
+                row = data.row_by_id.get(str(uid))
+                if row is None:
+                    missing.append(uid)
+                elif md and "price" in md:
+                    data.prices[row] = float(md["price"])
+            data.commit(durable)
+        return missing
+
+    def collection_exists(self, collection_name: str) -> bool:
+        return (self._path(collection_name) / META_FILE).exists()
+
+    def iterate_ids(
+        self, collection_name: str, batch_size: int = 1000
+    ) -> Iterator[List[UUID]]:
+        data = self._get(collection_name)
+        rows = np.flatnonzero(data.alive[: data.count])
+        for start in range(0, len(rows), batch_size):
+            yield [UUID(data.ids[row].decode()) for row in rows[start : start + batch_size]]
+
+    def count_ids(self, collection_name: str, ids: List[UUID]) -> Dict[UUID, int]:
+        # Inserts replace rows by ID, so each ID is stored at most once
+        data = self._get(collection_name)
+        return {uid: 1 for uid in ids if str(uid) in data.row_by_id}
+
+    def warm_up(self, collection_name: str) -> None:
+        # Map the files and fault the vector pages in before the first query
+        data = self._get(collection_name)
+        if data.count:
+            self.search(collection_name, data.vectors[0].tolist(), limit=1)
+
+    def is_ready(self, collection_name: str) -> bool:
+        return collection_name in self._collections
+
+    def compact(self, collection_name: str) -> None:
+        """Drop tombstoned rows and shrink the files to fit."""
+        with self._write_lock(collection_name) as data:
+            self._rewrite(collection_name, data, capacity=data.capacity, compact=True)
+
+    def _path(self, collection_name: str) -> Path:
+        return self.base_path / collection_name
+
+    def _get(self, collection_name: str) -> _CollectionData:
+        path = self._path(collection_name)
+        try:
+            version = _file_version(path / META_FILE)
+        except FileNotFoundError:
+            raise ValueError(f"Collection {collection_name} does not exist")
+
+        with self._lock:
+            data = self._collections.get(collection_name)
+            if data is None or data.version != version:
+                data = _CollectionData(path)
+                self._collections[collection_name] = data
+            return data
+
+    @contextmanager
+    def _write_lock(
+        self, collection_name: str, must_exist: bool = True
+    ) -> Iterator[Optional[_CollectionData]]:
+        """
+        Serialize writers across threads and processes. Yields the collection
+        freshly reloaded from disk if another process changed it.
+        """
+        if must_exist and not self.collection_exists(collection_name):
+            raise ValueError(f"Collection {collection_name} does not exist")
+
+        path = self._path(collection_name)
+        path.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(path / LOCK_FILE, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield self._get(collection_name) if must_exist else None
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _tombstone(self, data: _CollectionData, id_strings: List[str]) -> None:
+        for id_string in id_strings:
+            row = data.row_by_id.pop(id_string, None)
+            if row is not None:
+                data.alive[row] = 0
+                data.tombstones += 1
+
+    def _rewrite(
+        self,
+        collection_name: str,
+        data: _CollectionData,
+        capacity: int,
+        compact: bool,
+    ) -> _CollectionData:
+        if compact:
+            rows = np.flatnonzero(data.alive[: data.count])
+            capacity = max(INITIAL_CAPACITY, len(rows) * 2)
+        else:
+            rows = np.arange(data.count)
+        new_data = _CollectionData.create(
+            self._path(collection_name), data.dimension, capacity, data, rows
+        )
+        if not compact:
+            # Plain growth keeps tombstones; carry the counter over.
+            new_data.tombstones = data.tombstones
+            new_data.commit(durable=True)
+        self._collections[collection_name] = new_data
+        return new_data
+
+    def _filter_mask(self, data: _CollectionData, count: int, expr: str) -> np.ndarray:
+        """
+        Evaluate the subset of Milvus boolean expressions this app emits:
+        `price <op> <number>` and `id in [...]` clauses joined by `and`.
+        """
+        mask = np.ones(count, dtype=bool)
+        prices = data.prices[:count]
+        for clause in re.split(r"\s+and\s+", expr.strip()):
+            clause = clause.strip()
+            price_match = _PRICE_CLAUSE.match(clause)
+            if price_match:
+                op, value = price_match.group(1), float(price_match.group(2))
+                if op == ">=":
+                    mask &= prices >= value
+                elif op == "<=":
+                    mask &= prices <= value
+                elif op == ">":
+                    mask &= prices > value
+                elif op == "<":
+                    mask &= prices < value
+                else:
+                    mask &= prices == value
+                continue
+
+            id_match = _ID_CLAUSE.match(clause)
+            if id_match:
+                wanted = re.findall(r"[0-9a-fA-F-]{36}", id_match.group(1))
+                rows = [data.row_by_id[i] for i in wanted if i in data.row_by_id]
+                id_mask = np.zeros(count, dtype=bool)
+                id_mask[rows] = True
+                mask &= id_mask
+                continue
+
+            raise ValueError(f"Unsupported filter expression: {clause}")
+        return mask
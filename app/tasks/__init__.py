@@ -1,3 +1,15 @@
-from app.tasks.embedding_tasks import generate_product_embedding
+from app.tasks.embedding_tasks import (
+    generate_product_embedding,
+    generate_product_embeddings_batch,
+    queue_product_embedding,
+    queue_product_price_update,
+    sync_product_prices,
+)
 
-__all__ = ["generate_product_embedding"]
+__all__ = [
+    "generate_product_embedding",
+    "generate_product_embeddings_batch",
+    "queue_product_embedding",
+    "queue_product_price_update",
+    "sync_product_prices",
+]
@@ -1,10 +1,17 @@
+from typing import Iterable, List, Optional
 from uuid import UUID
+import redis
 from celery import Task
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from app.celery_worker import celery
 from app.db.session import SessionLocal
-from app.services.embedding import GeminiEmbeddingService
-from app.services.vector_store import MilvusVectorStore
+from app.services.embedding import (
+    EmbeddingService,
+    build_document_embedding_service,
+    create_embedding_service,
+)
+from app.services.rate_limit import retry_countdown
+from app.services.vector_store import VectorStore, get_vector_store
 from app.core.config import settings
 from app.models.product import Product
 from app.repositories.product import product_repository
@@ -13,6 +20,268 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+PENDING_EMBEDDINGS_KEY = "embeddings:pending"
+FLUSH_SCHEDULED_KEY = "embeddings:flush-scheduled"
+PENDING_PRICES_KEY = "prices:pending"
+PRICE_SYNC_SCHEDULED_KEY = "prices:sync-scheduled"
+# Set while a drain triggered by a full pending set is queued or running
+FLUSH_FULL_KEY = "embeddings:flush-full"
+PRICE_SYNC_FULL_KEY = "prices:sync-full"
+
+# Clients are created once per worker process and reused across tasks
+_embedding_service: Optional[EmbeddingService] = None
+_vector_store: Optional[VectorStore] = None
+_redis: Optional[redis.Redis] = None
+
+
+def get_embedding_service() -> EmbeddingService:
+    global _embedding_service
+    if _embedding_service is None:
+        _embedding_service = build_document_embedding_service(
+            create_embedding_service()
+        )
+    return _embedding_service
+
+
+def get_task_vector_store() -> VectorStore:
+    global _vector_store
+    if _vector_store is None:
+        _vector_store = get_vector_store()
+    return _vector_store
+
+
+def get_redis() -> Optional[redis.Redis]:
+    global _redis
+    if _redis is None and settings.REDIS_URL:
+        _redis = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis
+
+
+def queue_product_embedding(product_uuid: UUID, immediate: bool = False) -> None:
+    """
+    Schedule (re-)embedding of a product.
+
+    By default the uuid is added to a Redis set that a single batch task
+    drains after EMBEDDING_BATCH_WINDOW_SECONDS (or as soon as
+    EMBEDDING_BATCH_MAX_ITEMS are pending), so bursts of edits coalesce into
+    one embedding call and one vector write. `immediate=True`, or a missing
+    Redis, uses the single-product task instead.
+    """
+    redis_client = get_redis()
+    if immediate or redis_client is None:
+        generate_product_embedding.delay(str(product_uuid))
+        return
+
+    _queue_for_batch(
+        redis_client,
+        product_uuid,
+        pending_key=PENDING_EMBEDDINGS_KEY,
+        scheduled_key=FLUSH_SCHEDULED_KEY,
+        full_key=FLUSH_FULL_KEY,
+        max_items=settings.EMBEDDING_BATCH_MAX_ITEMS,
+        task=generate_product_embeddings_batch,
+    )
+
+
+def queue_product_price_update(product_uuid: UUID, immediate: bool = False) -> None:
+    """
+    Schedule a price-only update of a product's vector metadata. Price changes
+    are coalesced the same way as embeddings but never call the embedder.
+    """
+    redis_client = get_redis()
+    if immediate or redis_client is None:
+        sync_product_prices.delay([str(product_uuid)])
+        return
+
+    _queue_for_batch(
+        redis_client,
+        product_uuid,
+        pending_key=PENDING_PRICES_KEY,
+        scheduled_key=PRICE_SYNC_SCHEDULED_KEY,
+        full_key=PRICE_SYNC_FULL_KEY,
+        max_items=settings.PRICE_SYNC_BATCH_MAX_ITEMS,
+        task=sync_product_prices,
+    )
+
+
+def _queue_for_batch(
+    redis_client: redis.Redis,
+    product_uuid: UUID,
+    *,
+    pending_key: str,
+    scheduled_key: str,
+    full_key: str,
+    max_items: int,
+    task: Task,
+) -> None:
+    redis_client.sadd(pending_key, str(product_uuid))
+    window = settings.EMBEDDING_BATCH_WINDOW_SECONDS
+    expiry = max(1, int(window * 4))
+    if redis_client.set(scheduled_key, 1, nx=True, ex=expiry):
+        task.apply_async(countdown=window)
+    elif redis_client.scard(pending_key) >= max_items and redis_client.set(
+        full_key, 1, nx=True, ex=expiry
+    ):
+        # The set stays full until a worker drains it; trigger that drain
+        # once, not once per enqueue. The task chains itself while items
+        # remain and clears the flag when the set is empty.
+        task.apply_async()
+
+
+def embed_products(db: Session, product_uuids: Iterable[str]) -> dict:
+    """
+    Embed many products with one product query, batched embedding calls and
+    one vector upsert. Returns per-outcome counts.
+    """
+    uuids = list({UUID(str(product_uuid)) for product_uuid in product_uuids})
+    products: List[Product] = (
+        db.query(Product)
+        .options(selectinload(Product.categories))
+        .filter(Product.uuid.in_(uuids))
+        .all()
+    )
+
+    results = get_embedding_service().generate_embeddings(
+        [prepare_product_text(product) for product in products]
+    )
+
+    embedded = [
+        (product, result) for product, result in zip(products, results) if result.ok
+    ]
+    if embedded:
+        get_task_vector_store().upsert_vectors(
+            collection_name=settings.MILVUS_COLLECTION_NAME,
+            vectors=[result.embedding for _, result in embedded],
+            ids=[product.uuid for product, _ in embedded],
+            metadatas=[{"price": float(product.price)} for product, _ in embedded],
+        )
+
+    failed = 0
+    for product, result in zip(products, results):
+        if result.ok:
+            product.version += 1
+            product.embedding_status = Product.EMBEDDING_STATUS_GENERATED
+        else:
+            failed += 1
+            product.embedding_status = Product.EMBEDDING_STATUS_FAILED
+            logger.error(f"Failed to embed product {product.uuid}: {result.error}")
+    db.commit()
+
+    return {
+        "embedded": len(embedded),
+        "failed": failed,
+        "missing": len(uuids) - len(products),
+    }
+
+
+def sync_prices(db: Session, product_uuids: Iterable[str]) -> dict:
+    """
+    Copy current prices from Postgres onto the stored vectors in one
+    metadata update. Products without a stored vector are queued for
+    embedding, which writes the current price as well. Returns per-outcome
+    counts.
+    """
+    uuids = list({UUID(str(product_uuid)) for product_uuid in product_uuids})
+    rows = db.query(Product.uuid, Product.price).filter(Product.uuid.in_(uuids)).all()
+
+    unindexed: List[UUID] = []
+    if rows:
+        unindexed = get_task_vector_store().update_metadata(
+            collection_name=settings.MILVUS_COLLECTION_NAME,
+            ids=[row.uuid for row in rows],
+            metadatas=[{"price": float(row.price)} for row in rows],
+        )
+    if unindexed:
+        logger.warning(
+            f"{len(unindexed)} products have no vector for their price update; "
+            f"queueing them for embedding"
+        )
+        for product_uuid in unindexed:
+            queue_product_embedding(product_uuid)
+
+    return {
+        "updated": len(rows) - len(unindexed),
+        "requeued": len(unindexed),
+        "missing": len(uuids) - len(rows),
+    }
+
+
+@celery.task(bind=True, name="sync_product_prices")
+def sync_product_prices(self: Task, product_uuids: Optional[List[str]] = None) -> dict:
+    redis_client = None
+    if product_uuids is None:
+        redis_client = get_redis()
+        if redis_client is None:
+            return {"status": "skipped", "message": "REDIS_URL is not configured"}
+
+        redis_client.delete(PRICE_SYNC_SCHEDULED_KEY)
+        product_uuids = redis_client.spop(
+            PENDING_PRICES_KEY, settings.PRICE_SYNC_BATCH_MAX_ITEMS
+        )
+        if not product_uuids:
+            redis_client.delete(PRICE_SYNC_FULL_KEY)
+            return {"status": "success", "updated": 0, "missing": 0}
+
+    db: Session = SessionLocal()
+    try:
+        counts = sync_prices(db, product_uuids)
+        logger.info(f"Synced product prices: {counts}")
+    except Exception as e:
+        logger.error(f"Error syncing product prices: {str(e)}", exc_info=True)
+        if redis_client is not None:
+            redis_client.sadd(PENDING_PRICES_KEY, *product_uuids)
+        raise self.retry(
+            exc=e, countdown=retry_countdown(self.request.retries), max_retries=3
+        )
+    finally:
+        db.close()
+
+    if redis_client is not None:
+        if redis_client.scard(PENDING_PRICES_KEY):
+            sync_product_prices.apply_async()
+        else:
+            redis_client.delete(PRICE_SYNC_FULL_KEY)
+
+    return {"status": "success", **counts}
+
+
+@celery.task(bind=True, name="generate_product_embeddings_batch")
+def generate_product_embeddings_batch(self: Task) -> dict:
+    redis_client = get_redis()
+    if redis_client is None:
+        return {"status": "skipped", "message": "REDIS_URL is not configured"}
+
+    # Clear the flag first so uuids queued from now on schedule a new flush
+    redis_client.delete(FLUSH_SCHEDULED_KEY)
+    product_uuids = redis_client.spop(
+        PENDING_EMBEDDINGS_KEY, settings.EMBEDDING_BATCH_MAX_ITEMS
+    )
+    if not product_uuids:
+        redis_client.delete(FLUSH_FULL_KEY)
+        return {"status": "success", "embedded": 0, "failed": 0, "missing": 0}
+
+    db: Session = SessionLocal()
+    try:
+        counts = embed_products(db, product_uuids)
+        logger.info(f"Embedded product batch: {counts}")
+    except Exception as e:
+        logger.error(f"Error embedding product batch: {str(e)}", exc_info=True)
+        db.rollback()
+        redis_client.sadd(PENDING_EMBEDDINGS_KEY, *product_uuids)
+        raise self.retry(
+            exc=e, countdown=retry_countdown(self.request.retries), max_retries=3
+        )
+    finally:
+        db.close()
+
+    # Keep draining while a large import is still queueing products
+    if redis_client.scard(PENDING_EMBEDDINGS_KEY):
+        generate_product_embeddings_batch.apply_async()
+    else:
+        redis_client.delete(FLUSH_FULL_KEY)
+
+    return {"status": "success", **counts}
+
 
 @celery.task(bind=True, name="generate_product_embedding")
 def generate_product_embedding(self: Task, product_uuid: str) -> dict:
@@ -25,12 +294,11 @@ def generate_product_embedding(self: Task, product_uuid: str) -> dict:
 
         product_text = prepare_product_text(product)
 
-        embedding_service = GeminiEmbeddingService()
-        embedding = embedding_service.generate_embedding(product_text)
+        embedding = get_embedding_service().generate_embedding(product_text)
 
-        vector_store = MilvusVectorStore()
+        vector_store = get_task_vector_store()
 
-        vector_store.insert_vectors(
+        vector_store.upsert_vectors(
             collection_name=settings.MILVUS_COLLECTION_NAME,
             vectors=[embedding],
             ids=[product.uuid],
@@ -55,6 +323,8 @@ def generate_product_embedding(self: Task, product_uuid: str) -> dict:
             exc_info=True,
         )
         db.rollback()
-        raise self.retry(exc=e, countdown=60, max_retries=3)
+        raise self.retry(
+            exc=e, countdown=retry_countdown(self.request.retries), max_retries=3
+        )
     finally:
         db.close()
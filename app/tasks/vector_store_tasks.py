@@ -0,0 +1,40 @@
+from sqlalchemy.orm import Session
+from app.celery_worker import celery
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.reconciliation import reconcile_vector_store
+from app.tasks.embedding_tasks import get_task_vector_store, queue_product_embedding
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@celery.task(name="flush_vector_store")
+def flush_vector_store() -> dict:
+    vector_store = get_task_vector_store()
+    if not vector_store.collection_exists(settings.MILVUS_COLLECTION_NAME):
+        return {"status": "skipped", "message": "Collection does not exist"}
+
+    vector_store.flush(settings.MILVUS_COLLECTION_NAME)
+    logger.info(f"Flushed vector collection {settings.MILVUS_COLLECTION_NAME}")
+    return {"status": "success"}
+
+
+@celery.task(name="reconcile_vector_store")
+def reconcile_vector_store_task(dry_run: bool = False) -> dict:
+    vector_store = get_task_vector_store()
+    if not vector_store.collection_exists(settings.MILVUS_COLLECTION_NAME):
+        return {"status": "skipped", "message": "Collection does not exist"}
+
+    db: Session = SessionLocal()
+    try:
+        report = reconcile_vector_store(
+            db,
+            vector_store,
+            settings.MILVUS_COLLECTION_NAME,
+            queue_product_embedding,
+            dry_run=dry_run,
+        )
+    finally:
+        db.close()
+    return {"status": "success", **report.as_dict()}
@@ -0,0 +1,27 @@
+import base64
+import binascii
+import json
+from typing import Any, List
+
+
+def encode_cursor(sort: str, values: List[Any]) -> str:
+    """Opaque pagination cursor holding the sort name and the last row's key."""
+    payload = json.dumps({"s": sort, "k": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> List[Any]:
+    """
+    Return the key values stored in `cursor`. Raises ValueError when the
+    cursor is malformed or was issued for a different sort order.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = payload["k"]
+        cursor_sort = payload["s"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort or not isinstance(values, list):
+        raise ValueError("Cursor does not match the requested sort order")
+    return values
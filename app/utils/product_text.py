@@ -6,5 +6,7 @@ def prepare_product_text(product: ProductModel) -> dict:
     if product.categories:
         category_names = [cat.name for cat in product.categories]
 
-    text = f"Description: {product.description}, \n Categories: {category_names}, \n Price: {product.price}"
+    # Price is stored as a scalar field on the vector, not embedded, so that
+    # repricing only touches metadata.
+    text = f"Description: {product.description}, \n Categories: {category_names}"
     return {"text": text, "title": product.name}
@@ -0,0 +1,8 @@
+import re
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a search query used for cache keys."""
+    return _WHITESPACE.sub(" ", query).strip().lower()
@@ -15,7 +15,7 @@ os.environ.setdefault("FIRST_SUPERUSER_PASSWORD", "testpassword")
 # Stub out heavy third-party modules that are unavailable in the test env
 _mock_modules = [
     "google.genai", "google.genai.types",
-    "pymilvus",
+    "pymilvus", "pymilvus.client", "pymilvus.client.types",
     "openai",
     "redis",
 ]
@@ -64,6 +64,7 @@ from app.models.product import Product  # noqa: F401
 from app.models.category import Category  # noqa: F401
 from app.models.product_category import ProductCategory  # noqa: F401
 from app.models.product_image import ProductImage  # noqa: F401
+from app.models.embedding_cache import EmbeddingCacheEntry  # noqa: F401
 
 engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
 
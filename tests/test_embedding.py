@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.embedding.gemini import GeminiEmbeddingService
+from app.services.embedding.local import LocalEmbeddingService
+from app.services.rate_limit import RateLimiter
+
+
+class FakeModels:
+    def __init__(self, fail_on=None, error="document rejected"):
+        self.calls = []
+        self.fail_on = fail_on
+        self.error = error
+
+    def embed_content(self, model, contents, config):
+        self.calls.append(list(contents))
+        if self.fail_on and self.fail_on in contents:
+            raise RuntimeError(self.error)
+        return SimpleNamespace(
+            embeddings=[SimpleNamespace(values=[float(len(c))]) for c in contents]
+        )
+
+
+def _service(
+    fail_on=None, max_items=100, max_tokens=20000, error="document rejected"
+):
+    service = GeminiEmbeddingService()
+    service.client = SimpleNamespace(models=FakeModels(fail_on, error))
+    service.max_batch_items = max_items
+    service.max_batch_tokens = max_tokens
+    return service
+
+
+def _texts(*bodies):
+    return [{"text": body, "title": ""} for body in bodies]
+
+
+def test_generate_embeddings_chunks_by_item_limit_and_keeps_order():
+    service = _service(max_items=2)
+    results = service.generate_embeddings(_texts("a", "bb", "ccc", "dddd", "eeeee"))
+
+    assert [len(call) for call in service.client.models.calls] == [2, 2, 1]
+    assert [r.embedding for r in results] == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+
+
+def test_generate_embeddings_chunks_by_token_budget():
+    service = _service(max_tokens=30)
+    service.generate_embeddings(_texts("x" * 80, "y" * 80, "z" * 80))
+
+    assert [len(call) for call in service.client.models.calls] == [1, 1, 1]
+
+
+def test_generate_embeddings_reports_failures_per_item():
+    service = _service(fail_on="bad", max_items=2)
+    results = service.generate_embeddings(_texts("ok", "bad", "fine", ""))
+
+    assert [r.ok for r in results] == [True, False, True, False]
+    assert "document rejected" in results[1].error
+    assert results[3].error == "Empty text"
+
+
+def test_rejected_item_is_isolated_by_bisecting_the_batch():
+    service = _service(fail_on="bad")
+    results = service.generate_embeddings(_texts("a", "bb", "bad", "cccc", "ddddd"))
+
+    assert [r.ok for r in results] == [True, True, False, True, True]
+    assert results[4].embedding == [5.0]
+    assert service.client.models.calls[0] == ["a", "bb", "bad", "cccc", "ddddd"]
+    assert ["bad"] in service.client.models.calls
+
+
+def test_throttled_batch_fails_without_bisecting():
+    service = _service(fail_on="bad", error="429 RESOURCE_EXHAUSTED")
+    # Keep the throttle backoff out of the shared Gemini limiter
+    service.rate_limiter = RateLimiter("test")
+    results = service.generate_embeddings(_texts("ok", "bad", "fine"))
+
+    assert not any(r.ok for r in results)
+    assert len(service.client.models.calls) == 1
+
+
+def test_titles_are_folded_into_content():
+    service = _service()
+    service.generate_embeddings([{"text": "Soft cotton", "title": "Tee"}])
+
+    assert service.client.models.calls == [["title: Tee | text: Soft cotton"]]
+
+
+def test_local_embeddings_are_deterministic_and_lexically_similar():
+    service = LocalEmbeddingService(dimension=256, seed=7)
+    lamp, lamps, sofa = service.generate_query_embeddings(
+        ["red desk lamp", "red desk lamps", "leather sofa"]
+    )
+
+    assert len(lamp) == 256
+    other = LocalEmbeddingService(dimension=256, seed=7)
+    assert other.generate_query_embedding("red desk lamp") == pytest.approx(lamp, abs=1e-6)
+    assert np.dot(lamp, lamps) > 0.7
+    assert np.dot(lamp, lamps) > np.dot(lamp, sofa) + 0.3
+
+
+def test_local_document_batch_marks_empty_items():
+    service = LocalEmbeddingService(dimension=16)
+    results = service.generate_embeddings(
+        [{"text": "oak table", "title": "Table"}, {"text": " ", "title": ""}]
+    )
+
+    assert results[0].ok and np.linalg.norm(results[0].embedding) == pytest.approx(1.0)
+    assert not results[1].ok
@@ -0,0 +1,58 @@
+import pytest
+
+from app.models.product import Product
+from app.services.embedding_backfill import EmbeddingBackfill
+from tests.conftest import TestingSessionLocal
+
+
+def _products(db, statuses):
+    products = [
+        Product(name=f"P{index}", price=1.0, stock_quantity=1, embedding_status=status)
+        for index, status in enumerate(statuses)
+    ]
+    db.add_all(products)
+    db.commit()
+    return products
+
+
+def test_backfill_resumes_from_checkpoint(db, tmp_path):
+    products = _products(
+        db,
+        [
+            Product.EMBEDDING_STATUS_PENDING,
+            Product.EMBEDDING_STATUS_GENERATED,
+            Product.EMBEDDING_STATUS_FAILED,
+            Product.EMBEDDING_STATUS_PENDING,
+            Product.EMBEDDING_STATUS_PENDING,
+        ],
+    )
+    checkpoint = tmp_path / "backfill.json"
+    batches = []
+    fail_next = [False, True]
+
+    def embed_batch(session, product_uuids):
+        if fail_next and fail_next.pop(0):
+            raise RuntimeError("provider down")
+        batches.append(list(product_uuids))
+        return {"embedded": len(product_uuids), "failed": 0, "missing": 0}
+
+    def make_backfill():
+        return EmbeddingBackfill(
+            lambda: TestingSessionLocal(bind=db.connection()),
+            embed_batch,
+            batch_size=2,
+            workers=1,
+            checkpoint_path=str(checkpoint),
+        )
+
+    with pytest.raises(RuntimeError):
+        make_backfill().run()
+    assert batches == [[products[0].uuid, products[2].uuid]]
+    assert make_backfill().load_checkpoint() == products[2].id
+
+    progress = make_backfill().run()
+
+    assert batches[1:] == [[products[3].uuid, products[4].uuid]]
+    assert progress.total == 2
+    assert progress.processed == progress.embedded == 2
+    assert not checkpoint.exists()
@@ -0,0 +1,156 @@
+import threading
+from unittest.mock import MagicMock
+
+from app.services.embedding.base import EmbeddingResult, EmbeddingService
+from app.services.embedding.cache import (
+    QueryEmbeddingCache,
+    pack_vector,
+    unpack_vector,
+)
+from app.services.embedding import document_cache
+from app.services.embedding.document_cache import CachedEmbeddingService
+from app.utils import lru_cache
+from tests.conftest import TestingSessionLocal
+
+
+def test_pack_vector_round_trip_as_float32():
+    vector = [0.5, -1.25, 3.0]
+    data = pack_vector(vector)
+    assert len(data) == 4 * len(vector)
+    assert unpack_vector(data) == vector
+
+
+def test_key_ignores_case_and_whitespace():
+    cache = QueryEmbeddingCache(ttl_seconds=60, max_bytes=1024)
+    key = cache.make_key("Red  Shoes ", "model", 768, "retrieval_query")
+    assert key == cache.make_key("red shoes", "model", 768, "retrieval_query")
+    assert key != cache.make_key("red shoes", "model", 256, "retrieval_query")
+
+
+def test_hit_and_miss_counters():
+    cache = QueryEmbeddingCache(ttl_seconds=60, max_bytes=1024)
+    assert cache.get("k") is None
+    cache.set("k", [1.0, 2.0])
+    assert cache.get("k") == [1.0, 2.0]
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size_bytes"] == 8
+
+
+def test_evicts_least_recently_used_over_byte_budget():
+    cache = QueryEmbeddingCache(ttl_seconds=60, max_bytes=16)
+    cache.set("a", [1.0, 1.0])
+    cache.set("b", [2.0, 2.0])
+    cache.get("a")
+    cache.set("c", [3.0, 3.0])
+
+    assert cache.get("a") == [1.0, 1.0]
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(lru_cache.time, "monotonic", lambda: now[0])
+    cache = QueryEmbeddingCache(ttl_seconds=60, max_bytes=1024)
+    cache.set("k", [1.0])
+
+    now[0] += 61
+    assert cache.get("k") is None
+
+
+class CountingEmbeddingService(EmbeddingService):
+    model = "fake-model"
+
+    def __init__(self):
+        self.calls = []
+
+    def generate_embedding(self, text, task_type="retrieval_document"):
+        return self.generate_embeddings([text], task_type)[0].embedding
+
+    def generate_embeddings(self, texts, task_type="retrieval_document"):
+        self.calls.append([text["text"] for text in texts])
+        return [
+            EmbeddingResult(error="Empty text")
+            if not text["text"]
+            else EmbeddingResult([float(len(text["text"])), 1.0])
+            for text in texts
+        ]
+
+    def get_embedding_dimension(self):
+        return 2
+
+
+def test_document_cache_embeds_identical_content_once(db):
+    inner = CountingEmbeddingService()
+    service = CachedEmbeddingService(
+        inner, lambda: TestingSessionLocal(bind=db.connection())
+    )
+    texts = [
+        {"text": "red lamp", "title": "Lamp"},
+        {"text": "red lamp", "title": "Lamp"},
+        {"text": "blue chair", "title": "Chair"},
+        {"text": "", "title": "Empty"},
+    ]
+
+    first = service.generate_embeddings(texts)
+    assert inner.calls == [["red lamp", "blue chair", ""]]
+    assert first[0].embedding == first[1].embedding == [8.0, 1.0]
+    assert not first[3].ok
+
+    second = service.generate_embeddings(texts[:3])
+    assert inner.calls[1:] == []
+    assert [r.embedding for r in second] == [[8.0, 1.0], [8.0, 1.0], [10.0, 1.0]]
+
+    # Failures are not cached; a different title is a different document
+    service.generate_embeddings([texts[3], {"text": "red lamp", "title": "Other"}])
+    assert inner.calls[1] == ["", "red lamp"]
+
+
+def test_document_cache_key_includes_task_type():
+    service = CachedEmbeddingService(CountingEmbeddingService(), lambda: None)
+    text = {"text": "red lamp", "title": "Lamp"}
+    key = service.make_key(text, "retrieval_document")
+    assert len(key) == 64
+    assert key != service.make_key(text, "retrieval_query")
+
+
+def test_document_cache_key_follows_provider_input():
+    service = CachedEmbeddingService(CountingEmbeddingService(), lambda: None)
+    task = "retrieval_document"
+    key = service.make_key({"text": "red lamp"}, task)
+    # An empty title is dropped from the provider input, so the vector is the same
+    assert key == service.make_key({"text": "red lamp", "title": ""}, task)
+    assert key != service.make_key({"text": "red lamp", "title": "Lamp"}, task)
+
+
+def test_document_cache_counts_concurrent_lookups(monkeypatch):
+    class MemoryRepository:
+        def __init__(self):
+            self.rows = {}
+
+        def get_many(self, db, keys):
+            return {key: self.rows[key] for key in keys if key in self.rows}
+
+        def put_many(self, db, entries):
+            self.rows.update({entry["key"]: entry["embedding"] for entry in entries})
+
+    monkeypatch.setattr(
+        document_cache, "embedding_cache_repository", MemoryRepository()
+    )
+    service = CachedEmbeddingService(CountingEmbeddingService(), MagicMock)
+    service.generate_embeddings([{"text": "red lamp"}])
+
+    def embed():
+        for _ in range(50):
+            service.generate_embeddings([{"text": "red lamp"}])
+
+    threads = [threading.Thread(target=embed) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert service.stats() == {"hits": 200, "misses": 1, "hit_ratio": 200 / 201}
@@ -0,0 +1,177 @@
+import uuid
+from unittest.mock import patch
+
+import pytest
+
+from app.models.product import Product
+from app.services.embedding.base import EmbeddingResult
+from app.tasks import embedding_tasks
+
+
+class FakeRedis:
+    def __init__(self):
+        self.sets = {}
+        self.values = {}
+
+    def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+
+    def scard(self, key):
+        return len(self.sets.get(key, ()))
+
+    def spop(self, key, count):
+        members = self.sets.get(key, set())
+        popped = [members.pop() for _ in range(min(count, len(members)))]
+        return popped
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+class FakeEmbeddingService:
+    def __init__(self, fail_titles=()):
+        self.batches = []
+        self.fail_titles = fail_titles
+
+    def generate_embeddings(self, texts, task_type="retrieval_document"):
+        self.batches.append(len(texts))
+        return [
+            EmbeddingResult(error="boom")
+            if text["title"] in self.fail_titles
+            else EmbeddingResult([0.1, 0.2])
+            for text in texts
+        ]
+
+
+class FakeVectorStore:
+    def __init__(self, unindexed=()):
+        self.unindexed = set(unindexed)
+        self.upserted = []
+        self.durable = []
+        self.metadata_updates = []
+
+    def upsert_vectors(self, collection_name, vectors, ids, metadatas=None, durable=False):
+        self.upserted.append(list(ids))
+        self.durable.append(durable)
+
+    def update_metadata(self, collection_name, ids, metadatas, durable=False):
+        self.metadata_updates.append(dict(zip(ids, metadatas)))
+        return [uid for uid in ids if uid in self.unindexed]
+
+
+@pytest.fixture()
+def fake_redis(monkeypatch):
+    redis_client = FakeRedis()
+    monkeypatch.setattr(embedding_tasks, "get_redis", lambda: redis_client)
+    return redis_client
+
+
+def test_queued_embeddings_coalesce_into_one_flush(fake_redis):
+    with patch.object(
+        embedding_tasks.generate_product_embeddings_batch, "apply_async"
+    ) as flush, patch.object(
+        embedding_tasks.generate_product_embedding, "delay"
+    ) as single:
+        product_uuid = uuid.uuid4()
+        for _ in range(3):
+            embedding_tasks.queue_product_embedding(product_uuid)
+        embedding_tasks.queue_product_embedding(uuid.uuid4())
+
+    assert flush.call_count == 1
+    single.assert_not_called()
+    assert fake_redis.scard(embedding_tasks.PENDING_EMBEDDINGS_KEY) == 2
+
+
+def test_full_pending_set_triggers_one_drain(fake_redis, monkeypatch):
+    monkeypatch.setattr(embedding_tasks.settings, "EMBEDDING_BATCH_MAX_ITEMS", 3)
+    with patch.object(
+        embedding_tasks.generate_product_embeddings_batch, "apply_async"
+    ) as flush:
+        for _ in range(10):
+            embedding_tasks.queue_product_embedding(uuid.uuid4())
+
+    # One windowed flush plus one early drain once the set filled up
+    assert flush.call_count == 2
+    assert flush.call_args_list[0].kwargs == {
+        "countdown": embedding_tasks.settings.EMBEDDING_BATCH_WINDOW_SECONDS
+    }
+    assert flush.call_args_list[1].kwargs == {}
+
+
+def test_immediate_embedding_uses_single_product_task(fake_redis):
+    with patch.object(embedding_tasks.generate_product_embedding, "delay") as single:
+        product_uuid = uuid.uuid4()
+        embedding_tasks.queue_product_embedding(product_uuid, immediate=True)
+
+    single.assert_called_once_with(str(product_uuid))
+
+
+def test_embed_products_writes_one_batch(db, monkeypatch):
+    ok = Product(name="Lamp", price=10.0, stock_quantity=1)
+    bad = Product(name="Broken", price=5.0, stock_quantity=1)
+    db.add_all([ok, bad])
+    db.commit()
+
+    embedding_service = FakeEmbeddingService(fail_titles=("Broken",))
+    vector_store = FakeVectorStore()
+    monkeypatch.setattr(embedding_tasks, "get_embedding_service", lambda: embedding_service)
+    monkeypatch.setattr(embedding_tasks, "get_task_vector_store", lambda: vector_store)
+
+    counts = embedding_tasks.embed_products(
+        db, [str(ok.uuid), str(ok.uuid), str(bad.uuid), str(uuid.uuid4())]
+    )
+
+    assert counts == {"embedded": 1, "failed": 1, "missing": 1}
+    assert embedding_service.batches == [2]
+    assert vector_store.upserted == [[ok.uuid]]
+    assert vector_store.durable == [False]
+    assert ok.embedding_status == Product.EMBEDDING_STATUS_GENERATED
+    assert bad.embedding_status == Product.EMBEDDING_STATUS_FAILED
+
+
+def test_price_change_updates_metadata_without_reembedding(db, fake_redis, monkeypatch):
+    from app.schemas.product import ProductUpdate
+    from app.services.product import ProductService
+
+    product = Product(name="Lamp", price=10.0, stock_quantity=1)
+    db.add(product)
+    db.commit()
+
+    with patch.object(
+        embedding_tasks.sync_product_prices, "apply_async"
+    ) as price_sync, patch.object(
+        embedding_tasks.generate_product_embeddings_batch, "apply_async"
+    ) as embed:
+        ProductService().update(db, uuid=product.uuid, obj_in=ProductUpdate(price=8.0))
+
+    embed.assert_not_called()
+    assert price_sync.call_count == 1
+    assert fake_redis.scard(embedding_tasks.PENDING_PRICES_KEY) == 1
+
+    vector_store = FakeVectorStore()
+    monkeypatch.setattr(embedding_tasks, "get_task_vector_store", lambda: vector_store)
+    counts = embedding_tasks.sync_prices(db, [str(product.uuid), str(uuid.uuid4())])
+
+    assert counts == {"updated": 1, "requeued": 0, "missing": 1}
+    assert vector_store.metadata_updates == [{product.uuid: {"price": 8.0}}]
+    assert vector_store.upserted == []
+
+
+def test_price_sync_requeues_products_without_a_vector(db, fake_redis, monkeypatch):
+    product = Product(name="Lamp", price=10.0, stock_quantity=1)
+    db.add(product)
+    db.commit()
+    vector_store = FakeVectorStore(unindexed=[product.uuid])
+    monkeypatch.setattr(embedding_tasks, "get_task_vector_store", lambda: vector_store)
+
+    with patch.object(embedding_tasks.generate_product_embeddings_batch, "apply_async"):
+        counts = embedding_tasks.sync_prices(db, [str(product.uuid)])
+
+    assert counts == {"updated": 0, "requeued": 1, "missing": 0}
+    assert fake_redis.sets[embedding_tasks.PENDING_EMBEDDINGS_KEY] == {str(product.uuid)}
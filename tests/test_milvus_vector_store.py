@@ -0,0 +1,125 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from app.services.vector_store import milvus
+from app.services.vector_store.milvus import (
+    EXPECTED_DIM,
+    MilvusVectorStore,
+    bytes_per_vector,
+    row_vector,
+)
+
+
+@pytest.fixture()
+def collection_class(monkeypatch):
+    collection_class = MagicMock()
+    monkeypatch.setattr(milvus, "Collection", collection_class)
+    monkeypatch.setattr(milvus.utility, "has_collection", MagicMock(return_value=False))
+    return collection_class
+
+
+@pytest.fixture()
+def store(collection_class):
+    return MilvusVectorStore()
+
+
+def test_row_vector_decodes_float16_bytes():
+    raw = np.array([0.5, -1.25, 2.0], dtype=np.float16).tobytes()
+
+    assert row_vector(raw) == [0.5, -1.25, 2.0]
+    assert row_vector([raw]) == [0.5, -1.25, 2.0]
+    assert row_vector([0.5, 1]) == [0.5, 1.0]
+
+
+def test_bytes_per_vector_for_each_storage():
+    assert bytes_per_vector("float32") == EXPECTED_DIM * 4
+    assert bytes_per_vector("float16") == EXPECTED_DIM * 2
+    assert bytes_per_vector("sq8") == EXPECTED_DIM
+    assert bytes_per_vector("pq") == 96
+    assert bytes_per_vector("float32", dimension=10) == 40
+    with pytest.raises(ValueError):
+        bytes_per_vector("int4")
+
+
+@pytest.mark.parametrize(
+    "storage, vector_type, index_type, build_params",
+    [
+        ("float32", "FLOAT_VECTOR", "IVF_FLAT", {"nlist": 2048}),
+        ("float16", "FLOAT16_VECTOR", "IVF_FLAT", {"nlist": 2048}),
+        ("sq8", "FLOAT_VECTOR", "IVF_SQ8", {"nlist": 2048}),
+        ("pq", "FLOAT_VECTOR", "IVF_PQ", {"nlist": 2048, "m": 96, "nbits": 8}),
+    ],
+)
+def test_initialize_collection_uses_storage_index(
+    store, collection_class, monkeypatch, storage, vector_type, index_type, build_params
+):
+    field_schema = MagicMock(side_effect=lambda **kwargs: kwargs)
+    monkeypatch.setattr(milvus, "FieldSchema", field_schema)
+
+    store.initialize_collection("products_test", EXPECTED_DIM, storage=storage)
+
+    fields = {call.kwargs["name"]: call.kwargs for call in field_schema.call_args_list}
+    assert fields["embedding"]["dtype"] is getattr(milvus.DataType, vector_type)
+    assert fields["embedding"]["dim"] == EXPECTED_DIM
+    collection_class.return_value.create_index.assert_called_once_with(
+        field_name="embedding",
+        index_params={
+            "metric_type": "COSINE",
+            "index_type": index_type,
+            "params": build_params,
+        },
+    )
+    assert store._uses_float16("products_test") == (storage == "float16")
+
+
+def test_unknown_storage_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.initialize_collection("products_test", EXPECTED_DIM, storage="int4")
+
+
+def test_vector_data_is_float16_for_float16_collection(store, collection_class):
+    collection_class.return_value.schema.fields = [
+        SimpleNamespace(name="id", dtype=milvus.DataType.VARCHAR),
+        SimpleNamespace(name="embedding", dtype=milvus.DataType.FLOAT16_VECTOR),
+    ]
+    vectors = [[0.5] * EXPECTED_DIM, [0.25] * EXPECTED_DIM]
+
+    data = store._vector_data("half", vectors)
+
+    assert [array.dtype for array in data] == [np.float16, np.float16]
+    assert data[1].tolist() == vectors[1]
+
+
+def test_vector_data_is_unchanged_for_float32_collection(store, collection_class):
+    collection_class.return_value.schema.fields = [
+        SimpleNamespace(name="embedding", dtype=milvus.DataType.FLOAT_VECTOR),
+    ]
+    vectors = [[0.5] * EXPECTED_DIM]
+
+    assert store._vector_data("full", vectors) is vectors
+
+
+@pytest.mark.parametrize(
+    "vector_type, index_type, expected",
+    [
+        ("FLOAT_VECTOR", "IVF_FLAT", "float32"),
+        ("FLOAT16_VECTOR", "IVF_FLAT", "float16"),
+        ("FLOAT_VECTOR", "IVF_SQ8", "sq8"),
+        ("FLOAT_VECTOR", "HNSW", None),
+    ],
+)
+def test_collection_storage_reads_schema_and_index(
+    store, collection_class, vector_type, index_type, expected
+):
+    collection = collection_class.return_value
+    collection.schema.fields = [
+        SimpleNamespace(name="embedding", dtype=getattr(milvus.DataType, vector_type)),
+    ]
+    collection.indexes = [
+        SimpleNamespace(field_name="embedding", params={"index_type": index_type}),
+    ]
+
+    assert store.collection_storage("products") == expected
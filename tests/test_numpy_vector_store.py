@@ -0,0 +1,152 @@
+import uuid
+
+import numpy as np
+import pytest
+
+from app.services.vector_store.numpy_store import INITIAL_CAPACITY, NumpyVectorStore
+
+COLLECTION = "products"
+
+
+@pytest.fixture()
+def store(tmp_path):
+    store = NumpyVectorStore(base_path=str(tmp_path))
+    store.initialize_collection(COLLECTION, 3)
+    return store
+
+
+def _insert(store, vectors, prices):
+    ids = [uuid.uuid4() for _ in vectors]
+    store.insert_vectors(
+        COLLECTION, vectors, ids, [{"price": price} for price in prices]
+    )
+    return ids
+
+
+def test_search_orders_by_cosine_similarity(store):
+    ids = _insert(store, [[1, 0, 0], [0, 1, 0], [1, 1, 0]], [10, 20, 30])
+
+    results = store.search(COLLECTION, [2, 0.1, 0], limit=2)
+
+    assert [r["id"] for r in results] == [ids[0], ids[2]]
+    assert results[0]["score"] == pytest.approx(0.99875, abs=1e-4)
+
+
+def test_search_applies_price_expression_and_threshold(store):
+    ids = _insert(store, [[1, 0, 0], [1, 0.1, 0], [0, 1, 0]], [10, 50, 5])
+
+    results = store.search(COLLECTION, [1, 0, 0], expr="price >= 20.0 and price <= 60")
+    assert [r["id"] for r in results] == [ids[1]]
+
+    results = store.search(COLLECTION, [1, 0, 0], score_threshold=0.5)
+    assert {r["id"] for r in results} == {ids[0], ids[1]}
+
+
+def test_unsupported_expression_is_rejected(store):
+    _insert(store, [[1, 0, 0]], [1])
+    with pytest.raises(ValueError):
+        store.search(COLLECTION, [1, 0, 0], expr="name == 'x'")
+
+
+def test_reinsert_replaces_and_delete_hides(store):
+    ids = _insert(store, [[1, 0, 0], [0, 1, 0]], [1, 2])
+    store.update_vector(COLLECTION, ids[0], [0, 0, 1], {"price": 3})
+    store.delete_vectors(COLLECTION, [ids[1]])
+
+    results = store.search(COLLECTION, [0, 0, 1], limit=10)
+    assert [r["id"] for r in results] == [ids[0]]
+    assert results[0]["score"] == pytest.approx(1.0)
+
+
+def test_grows_past_initial_capacity_and_compacts(store):
+    count = INITIAL_CAPACITY + 10
+    vectors = np.random.default_rng(0).normal(size=(count, 3)).tolist()
+    ids = _insert(store, vectors, [1.0] * count)
+
+    store.delete_vectors(COLLECTION, ids[: count // 2])
+
+    data = store._get(COLLECTION)
+    assert data.tombstones == 0
+    assert data.count == count - count // 2
+    assert len(store.search(COLLECTION, vectors[-1], limit=count)) == data.count
+
+
+def test_collection_persists_across_instances(store, tmp_path):
+    ids = _insert(store, [[0, 1, 0]], [7])
+
+    reopened = NumpyVectorStore(base_path=str(tmp_path))
+    assert reopened.collection_exists(COLLECTION)
+    assert reopened.search(COLLECTION, [0, 1, 0])[0]["id"] == ids[0]
+
+    more = _insert(store, [[0, 0, 1]], [8])
+    assert reopened.search(COLLECTION, [0, 0, 1])[0]["id"] == more[0]
+
+
+def test_warm_up_marks_collection_ready(store, tmp_path):
+    _insert(store, [[1, 0, 0]], [1])
+    reopened = NumpyVectorStore(base_path=str(tmp_path))
+
+    assert not reopened.is_ready(COLLECTION)
+    reopened.warm_up(COLLECTION)
+    assert reopened.is_ready(COLLECTION)
+
+
+def test_unflushed_upserts_are_visible_to_other_instances(store, tmp_path):
+    ids = _insert(store, [[1, 0, 0]], [1])
+    reopened = NumpyVectorStore(base_path=str(tmp_path))
+    assert reopened.search(COLLECTION, [1, 0, 0])[0]["id"] == ids[0]
+
+    store.upsert_vectors(COLLECTION, [[0, 1, 0]], [ids[0]], [{"price": 2}])
+
+    results = reopened.search(COLLECTION, [0, 1, 0])
+    assert [r["id"] for r in results] == [ids[0]]
+    assert results[0]["score"] == pytest.approx(1.0)
+
+
+def test_flush_makes_upserts_durable(store, tmp_path, monkeypatch):
+    ids = _insert(store, [[1, 0, 0]], [1])
+    flushes = []
+    monkeypatch.setattr(np.memmap, "flush", lambda self: flushes.append(self))
+
+    store.upsert_vectors(COLLECTION, [[0, 1, 0]], [ids[0]], [{"price": 2}])
+    assert not flushes
+    store.flush(COLLECTION)
+    assert flushes
+
+    reopened = NumpyVectorStore(base_path=str(tmp_path))
+    assert reopened.search(COLLECTION, [0, 1, 0])[0]["id"] == ids[0]
+
+
+def test_update_metadata_changes_price_in_place(store):
+    ids = _insert(store, [[1, 0, 0], [0, 1, 0]], [10, 20])
+
+    unknown = uuid.uuid4()
+    missing = store.update_metadata(
+        COLLECTION, [ids[0], unknown], [{"price": 30}, {"price": 1}]
+    )
+
+    assert missing == [unknown]
+
+    results = store.search(COLLECTION, [1, 0, 0], expr="price >= 25")
+    assert [r["id"] for r in results] == [ids[0]]
+    assert store._get(COLLECTION).count == 2
+
+
+def test_compare_collections_reports_recall(tmp_path):
+    from app.services.vector_store.benchmark import compare_collections
+
+    store = NumpyVectorStore(base_path=str(tmp_path))
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(50, 3)).tolist()
+    ids = [uuid.uuid4() for _ in vectors]
+    for name in ("baseline", "candidate"):
+        store.initialize_collection(name, 3)
+        store.insert_vectors(name, vectors, ids, [{"price": 1}] * len(vectors))
+    store.delete_vectors("candidate", ids[:25])
+
+    report = compare_collections(store, "baseline", "baseline", vectors[:5], k=5)
+    assert report["recall_at_k"] == 1.0
+    assert report["queries"] == 5
+
+    report = compare_collections(store, "baseline", "candidate", vectors[:5], k=5)
+    assert report["recall_at_k"] < 1.0
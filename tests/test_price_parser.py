@@ -0,0 +1,80 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.services.price_parser import (
+    PriceConstraints,
+    PriceQueryParser,
+    might_contain_price,
+)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "red running shoes",
+        "two piece swimsuit",
+        "cheap leather wallet",
+        "under armour hoodie",
+        "iphone 15",
+        "rtx 4090",
+        "ps5",
+        "usb c charger 65w",
+        "iphone 15 pro max",
+        "galaxy s24 ultra 512gb",
+    ],
+)
+def test_queries_without_price_are_not_candidates(query):
+    assert not might_contain_price(query)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "shoes under 500",
+        "laptop $999",
+        "headphones below fifty dollars",
+        "phone under five hundred",
+        "watch between 2k and 3k",
+        "rtx 4090 under 2000",
+        "iphone 15 for 800 dollars",
+        "ps5 budget 450",
+        "shoes between 100-200",
+        "phone under 20-30k",
+        "shoes under rs500",
+        "shoes 500rs",
+        "kurta rs.500",
+        "shoes <500",
+        "shoes <= 500",
+        "laptop >=50000",
+        "watch under 5000/-",
+        "headphones max 300",
+    ],
+)
+def test_queries_with_price_are_candidates(query):
+    assert might_contain_price(query)
+
+
+def test_parse_skips_llm_without_price_intent():
+    parser = PriceQueryParser()
+    with patch.object(parser, "_parse_with_deepseek") as llm:
+        cleaned, constraints = parser.parse("red running shoes")
+
+    llm.assert_not_called()
+    assert cleaned == "red running shoes"
+    assert constraints.min_price is None
+    assert constraints.max_price is None
+    assert parser.stats()["skipped"] == 1
+
+
+def test_parse_memoizes_llm_results_by_normalized_query():
+    parser = PriceQueryParser()
+    result = ("shoes", PriceConstraints(max_price=500.0))
+    with patch.object(parser, "_parse_with_deepseek", return_value=result) as llm:
+        parser.parse("Shoes under 500")
+        cleaned, constraints = parser.parse("shoes  under 500")
+
+    assert llm.call_count == 1
+    assert cleaned == "shoes"
+    assert constraints.max_price == 500.0
+    assert parser.stats()["cache_hits"] == 1
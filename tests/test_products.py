@@ -1,4 +1,7 @@
 from unittest.mock import patch
+from uuid import UUID
+
+from app.utils.cursor import encode_cursor
 
 
 EMBEDDING_TASK = "app.tasks.embedding_tasks.generate_product_embedding.delay"
@@ -107,3 +110,238 @@ def test_update_product_as_regular_user(mock_embed, client, auth_headers_superus
         headers=auth_headers_regular,
     )
     assert resp.status_code == 403
+
+
+def _count_queries(db):
+    from sqlalchemy import event
+
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", _record)
+    return statements, lambda: event.remove(db.get_bind(), "before_cursor_execute", _record)
+
+
+def test_list_products_query_count_does_not_grow_with_page_size(client, db, test_category):
+    from app.models.product import Product
+    from app.models.product_image import ProductImage
+
+    for index in range(12):
+        product = Product(name=f"Item {index}", price=1.0 + index, stock_quantity=1)
+        product.categories = [test_category]
+        product.images = [ProductImage(image_url=f"https://img/{index}.png")]
+        db.add(product)
+    db.commit()
+    db.expire_all()
+
+    counts = []
+    for limit in (2, 12):
+        statements, stop = _count_queries(db)
+        resp = client.get(f"/api/v1/products?limit={limit}")
+        stop()
+        assert resp.status_code == 200
+        assert len(resp.json()["products"]) == limit
+        assert resp.json()["products"][0]["categories"]
+        counts.append(len(statements))
+        db.expire_all()
+
+    assert counts[0] == counts[1]
+
+
+def _seed_products(db, category, prices):
+    from app.models.product import Product
+
+    for index, price in enumerate(prices):
+        product = Product(name=f"Item {index}", price=price, stock_quantity=1)
+        product.categories = [category]
+        db.add(product)
+    db.commit()
+
+
+def test_cursor_pagination_walks_every_product_once(client, db, test_category):
+    _seed_products(db, test_category, [5.0, 3.0, 5.0, 1.0, 5.0, 2.0, 4.0])
+
+    for url in ("/api/v1/products", "/api/v1/products/category/Electronics"):
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 3, "sort_by": "price_desc"}
+            if cursor:
+                params["cursor"] = cursor
+            body = client.get(url, params=params).json()
+            seen += [(p["price"], p["uuid"]) for p in body["products"]]
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+
+        assert len(seen) == len({uuid for _, uuid in seen}) == 7
+        assert [price for price, _ in seen] == [5.0, 5.0, 5.0, 4.0, 3.0, 2.0, 1.0]
+
+
+def test_invalid_or_mismatched_cursor_is_rejected(client, db, test_category):
+    _seed_products(db, test_category, [1.0, 2.0])
+    cursor = client.get(
+        "/api/v1/products", params={"limit": 1, "sort_by": "price_asc"}
+    ).json()["next_cursor"]
+
+    assert client.get("/api/v1/products", params={"cursor": "garbage"}).status_code == 400
+    for sort_by, values in (
+        ("newest", [123, 1]),
+        ("newest", ["not a date", 1]),
+        (None, [{"a": 1}]),
+        ("price_asc", ["1.0", 1]),
+        ("price_asc", [1.0, 1.5]),
+    ):
+        crafted = encode_cursor(sort_by or "default", values)
+        params = {"cursor": crafted, **({"sort_by": sort_by} if sort_by else {})}
+        assert client.get("/api/v1/products", params=params).status_code == 400
+    resp = client.get("/api/v1/products", params={"cursor": cursor, "sort_by": "newest"})
+    assert resp.status_code == 400
+
+
+def test_include_total_false_skips_the_count(client, db, test_category):
+    _seed_products(db, test_category, [1.0, 2.0, 3.0])
+
+    body = client.get("/api/v1/products", params={"include_total": "false"}).json()
+
+    assert body["total_products"] is None
+    assert body["total_pages"] is None
+    assert len(body["products"]) == 3
+
+
+@patch(EMBEDDING_TASK)
+def test_cached_count_is_invalidated_by_writes(
+    mock_embed, client, db, auth_headers_superuser, test_category, monkeypatch
+):
+    from app.core.config import settings
+    from app.repositories.product_count import product_counter
+
+    monkeypatch.setattr(settings, "PRODUCT_COUNT_STRATEGY", "cached")
+    product_counter.invalidate()
+    _seed_products(db, test_category, [1.0, 2.0])
+
+    assert client.get("/api/v1/products").json()["total_products"] == 2
+    # Rows written behind the service are not seen until the cache expires
+    _seed_products(db, test_category, [3.0])
+    assert client.get("/api/v1/products").json()["total_products"] == 2
+
+    client.post(
+        "/api/v1/products",
+        json=_product_payload(test_category.uuid),
+        headers=auth_headers_superuser,
+    )
+    assert client.get("/api/v1/products").json()["total_products"] == 4
+    product_counter.invalidate()
+
+
+def test_trigram_search_falls_back_to_substring_match_off_postgres(client, db, test_category):
+    from app.models.product import Product
+
+    for name in ("Wireless Mouse", "Wired Keyboard", "Desk Lamp"):
+        product = Product(name=name, price=10.0, stock_quantity=1)
+        product.categories = [test_category]
+        db.add(product)
+    db.commit()
+
+    body = client.get(
+        "/api/v1/products",
+        params={"name": "wire", "search_mode": "trigram", "sort_by": "relevance"},
+    ).json()
+
+    assert sorted(p["name"] for p in body["products"]) == ["Wired Keyboard", "Wireless Mouse"]
+    assert body["total_products"] == 2
+
+
+def test_trigram_search_compiles_to_indexable_postgres_operators():
+    from sqlalchemy.dialects import postgresql
+    from app.repositories.product import trigram_match, trigram_relevance
+
+    dialect = postgresql.dialect()
+    # psycopg2's pyformat paramstyle doubles literal percent signs
+    match = str(trigram_match("blender").compile(dialect=dialect)).replace("%%", "%")
+    relevance = str(trigram_relevance("blender").compile(dialect=dialect))
+
+    assert "<% products.name" in match
+    assert "<% products.description" in match
+    assert relevance.startswith("greatest(word_similarity(")
+
+
+@patch(EMBEDDING_TASK)
+def test_product_writes_keep_category_ids_in_sync(
+    mock_embed, client, db, auth_headers_superuser, test_category
+):
+    from app.models.category import Category
+    from app.models.product import Product
+
+    books = Category(name="Books")
+    db.add(books)
+    db.commit()
+
+    product_uuid = client.post(
+        "/api/v1/products",
+        json=_product_payload(test_category.uuid),
+        headers=auth_headers_superuser,
+    ).json()["uuid"]
+    product = db.query(Product).filter(Product.uuid == UUID(product_uuid)).one()
+    assert product.category_ids == [test_category.id]
+
+    client.put(
+        f"/api/v1/products/{product_uuid}",
+        json={"category_uuids": [str(books.uuid), str(test_category.uuid)]},
+        headers=auth_headers_superuser,
+    )
+    db.refresh(product)
+    assert product.category_ids == sorted([test_category.id, books.id])
+
+
+def test_multi_category_filters_match_all_or_any(client, db, test_category):
+    from app.models.category import Category
+    from app.models.product import Product
+
+    books = Category(name="Books")
+    db.add(books)
+    for name, categories in (
+        ("Both", [test_category, books]),
+        ("Gadget", [test_category]),
+        ("Novel", [books]),
+    ):
+        product = Product(name=name, price=1.0, stock_quantity=1)
+        product.categories = categories
+        db.add(product)
+    db.commit()
+
+    def names(**params):
+        body = client.get("/api/v1/products", params=params).json()
+        return sorted(p["name"] for p in body["products"])
+
+    both = ["Electronics", "Books"]
+    assert names(categories=both) == ["Both"]
+    assert names(categories=both, category_match="any") == ["Both", "Gadget", "Novel"]
+    assert names(category="Books", categories=["Electronics"]) == ["Both"]
+    assert names(categories=["Electronics", "Missing"]) == []
+
+
+def test_backfill_category_ids_rebuilds_from_memberships(
+    db, test_category, monkeypatch
+):
+    from app.models.product import Product
+    from app.repositories.product_count import product_counter
+    from app.services.category_backfill import backfill_category_ids
+
+    _seed_products(db, test_category, [1.0, 2.0, 3.0])
+    orphan = Product(name="Uncategorized", price=1.0, stock_quantity=1)
+    db.add(orphan)
+    db.commit()
+    invalidations = []
+    monkeypatch.setattr(product_counter, "invalidate", lambda: invalidations.append(1))
+
+    assert backfill_category_ids(db, batch_size=2) == 3
+    assert invalidations == [1]
+    assert {
+        tuple(p.category_ids) for p in db.query(Product).filter(Product.id != orphan.id)
+    } == {(test_category.id,)}
+    assert orphan.category_ids == []
+    # Already in sync; nothing to write
+    assert backfill_category_ids(db, batch_size=2) == 0
+    assert invalidations == [1]
@@ -0,0 +1,183 @@
+"""
+EXPLAIN every product listing shape against a seeded Postgres database and
+fail on sequential scans of the large tables. Point TEST_POSTGRES_URL at an
+empty, disposable database to run it; the schema is built with the real
+migrations and dropped again afterwards.
+"""
+import os
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+pytestmark = pytest.mark.skipif(
+    not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set"
+)
+
+SEEDED_PRODUCTS = 50_000
+SEEDED_CATEGORIES = 40
+# Tables big enough that a sequential scan means a missing index. The
+# categories lookup by its unique name is tiny and may legitimately scan.
+LARGE_TABLES = {"products", "product_categories", "product_images"}
+
+LISTINGS = [
+    {},
+    {"sort_by": "price_asc"},
+    {"sort_by": "price_desc"},
+    {"sort_by": "newest"},
+    {"in_stock": True},
+    {"in_stock": True, "sort_by": "price_asc"},
+    {"in_stock": True, "sort_by": "price_desc"},
+    {"in_stock": True, "sort_by": "newest"},
+    {"in_stock": False},
+    {"min_price": 100, "max_price": 120, "sort_by": "price_asc"},
+    {"name": "kettle"},
+    {"name": "ketle", "search_mode": "trigram", "sort_by": "relevance"},
+    {"category": "Category 7"},
+    {"category": "Category 7", "sort_by": "price_asc"},
+    {"categories": ["Category 7", "Category 8"], "category_match": "any"},
+    {"categories": ["Category 7", "Category 24"], "sort_by": "newest"},
+]
+CATEGORY_SORTS = [None, "price_asc", "price_desc", "newest"]
+
+
+def _migrate(engine, revision):
+    from alembic import command
+    from alembic.config import Config
+
+    root = Path(__file__).resolve().parent.parent
+    config = Config(str(root / "alembic.ini"))
+    config.set_main_option("script_location", str(root / "alembic"))
+    with engine.connect() as connection:
+        config.attributes["connection"] = connection
+        if revision == "base":
+            command.downgrade(config, revision)
+        else:
+            command.upgrade(config, revision)
+        connection.commit()
+
+
+def _seed(db):
+    from app.services.category_backfill import backfill_category_ids
+    from app.services.name_search_benchmark import seed_synthetic_products
+
+    db.execute(
+        text(
+            "INSERT INTO categories (uuid, name) "
+            "SELECT gen_random_uuid(), 'Category ' || c "
+            "FROM generate_series(1, :count) AS c"
+        ),
+        {"count": SEEDED_CATEGORIES},
+    )
+    seed_synthetic_products(db, SEEDED_PRODUCTS)
+    # Two categories per product and one image
+    db.execute(
+        text(
+            "INSERT INTO product_categories (uuid, product_id, category_id) "
+            "SELECT gen_random_uuid(), p.id, c.id FROM products p "
+            "JOIN categories c ON c.name IN ("
+            "  'Category ' || (1 + p.id % :count),"
+            "  'Category ' || (1 + (p.id * 7 + 3) % :count))"
+        ),
+        {"count": SEEDED_CATEGORIES},
+    )
+    db.execute(
+        text(
+            "INSERT INTO product_images (uuid, product_id, image_url) "
+            "SELECT gen_random_uuid(), id, 'https://img/' || id || '.png' "
+            "FROM products"
+        )
+    )
+    db.commit()
+    backfill_category_ids(db, batch_size=10_000)
+    db.execute(text("ANALYZE"))
+    db.commit()
+
+
+@pytest.fixture(scope="module")
+def pg_db():
+    engine = create_engine(TEST_POSTGRES_URL)
+    _migrate(engine, "head")
+    session = sessionmaker(bind=engine)()
+    try:
+        _seed(session)
+        yield session
+    finally:
+        session.close()
+        _migrate(engine, "base")
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+        engine.dispose()
+
+
+def _captured(db, run):
+    """Statements (with parameters) executed by `run`."""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    bind = db.connection()
+    event.listen(bind, "before_cursor_execute", _record)
+    try:
+        run()
+    finally:
+        event.remove(bind, "before_cursor_execute", _record)
+    return statements
+
+
+def _seq_scans(plan):
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in LARGE_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found += _seq_scans(child)
+    return found
+
+
+def _assert_indexed(db, run, label):
+    statements = _captured(db, run)
+    assert statements, label
+    cursor = db.connection().connection.cursor()
+    try:
+        for statement, parameters in statements:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = cursor.fetchone()[0][0]["Plan"]
+            scans = _seq_scans(plan)
+            assert not scans, f"{label}: sequential scan on {scans} in\n{statement}"
+    finally:
+        cursor.close()
+
+
+@pytest.mark.parametrize("filters", LISTINGS, ids=repr)
+def test_product_listing_uses_indexes(pg_db, filters):
+    from app.repositories.product import product_repository
+
+    # Totals go through ProductCounter, whose strategies exist precisely
+    # because an unfiltered COUNT(*) has to read the whole table.
+    def first_and_second_page():
+        _, _, cursor = product_repository.get_products(
+            pg_db, include_total=False, **filters
+        )
+        if cursor is not None:
+            product_repository.get_products(
+                pg_db, include_total=False, cursor=cursor, **filters
+            )
+
+    _assert_indexed(pg_db, first_and_second_page, repr(filters))
+
+
+@pytest.mark.parametrize("sort_by", CATEGORY_SORTS)
+def test_category_listing_uses_indexes(pg_db, sort_by):
+    from app.repositories.product import product_repository
+
+    def first_page():
+        product_repository.get_products_by_category(
+            pg_db, category_name="Category 7", sort_by=sort_by, include_total=False
+        )
+
+    _assert_indexed(pg_db, first_page, f"category sorted by {sort_by}")
@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services import rate_limit
+from app.services.rate_limit import RateLimiter, TokenBucket, is_throttle_error
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def test_throttle_errors_are_429_and_5xx():
+    assert is_throttle_error(StatusError(429))
+    assert is_throttle_error(StatusError(503))
+    assert not is_throttle_error(StatusError(400))
+    assert is_throttle_error(RuntimeError("429 RESOURCE_EXHAUSTED"))
+    assert not is_throttle_error(ValueError("bad input"))
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(per_minute=60, capacity=2)
+    assert bucket.wait_time(2, now=bucket._updated) == 0
+    bucket.take(2)
+    assert bucket.wait_time(1, now=bucket._updated) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now=bucket._updated + 1) == 0
+
+
+def test_concurrency_backs_off_on_throttle_and_ramps_up():
+    limiter = RateLimiter("test", max_concurrency=8)
+    assert limiter.concurrency_limit == 4
+
+    with pytest.raises(StatusError):
+        with limiter.limit():
+            raise StatusError(429)
+    stats = limiter.stats()
+    assert stats["concurrency_limit"] == 2
+    assert stats["throttled"] == 1
+    assert stats["backoff_seconds"] > 0
+
+    # Skip the backoff instead of sleeping through it
+    limiter._backoff_until = 0
+    for _ in range(2):
+        with limiter.limit():
+            pass
+    assert limiter.concurrency_limit == 3
+    assert limiter.in_flight == 0
+
+
+def test_async_limit_waits_for_a_free_slot():
+    limiter = RateLimiter("test", max_concurrency=1)
+    active = []
+    peak = []
+
+    async def call():
+        async with limiter.alimit():
+            active.append(1)
+            peak.append(len(active))
+            await asyncio.sleep(0.01)
+            active.pop()
+
+    async def main():
+        await asyncio.gather(call(), call(), call())
+
+    asyncio.run(main())
+    assert max(peak) == 1
+    assert limiter.stats()["waits"] >= 1
+
+
+def test_limiters_are_shared_per_provider():
+    first = rate_limit.get_rate_limiter("shared-test", max_concurrency=2)
+    assert rate_limit.get_rate_limiter("shared-test") is first
+    assert "shared-test" in rate_limit.rate_limit_stats()
+
+
+def test_one_throttling_event_halves_the_limit_once():
+    limiter = RateLimiter("test", max_concurrency=16)
+    assert limiter.concurrency_limit == 8
+
+    # Eight requests in flight all come back 429
+    for _ in range(8):
+        limiter._reserve(0)
+    started = time.monotonic()
+    for _ in range(8):
+        limiter._exit(StatusError(429), started)
+
+    assert limiter.concurrency_limit == 4
+    assert limiter.throttled == 8
+    assert limiter._consecutive_throttles == 1
+    assert limiter.in_flight == 0
+
+
+class LockCheckingRedis:
+    """Fails the test if a shared check runs under the limiter's lock."""
+
+    def __init__(self, limiter):
+        self.limiter = limiter
+        self.threads = set()
+
+    def pttl(self, key):
+        assert not self.limiter._lock.locked()
+        self.threads.add(threading.get_ident())
+        return -2
+
+    def pipeline(self):
+        return self
+
+    def incrby(self, key, amount):
+        pass
+
+    def expire(self, key, seconds):
+        pass
+
+    def execute(self):
+        return [1, True]
+
+
+def test_shared_check_runs_outside_the_lock_and_off_the_event_loop():
+    limiter = RateLimiter("test", requests_per_minute=600, max_concurrency=2)
+    limiter._redis = LockCheckingRedis(limiter)
+
+    with limiter.limit():
+        pass
+    assert limiter._redis.threads == {threading.get_ident()}
+
+    async def call():
+        async with limiter.alimit():
+            return threading.get_ident()
+
+    limiter._redis.threads.clear()
+    loop_thread = asyncio.run(call())
+    assert limiter._redis.threads and loop_thread not in limiter._redis.threads
+    assert limiter.redis_errors == 0
+
+
+class FailingRedis:
+    def pttl(self, key):
+        raise ConnectionError("redis down")
+
+
+def test_redis_errors_are_counted_from_concurrent_threads():
+    limiter = RateLimiter("test", requests_per_minute=100_000, max_concurrency=16)
+    limiter._redis = FailingRedis()
+
+    def enter():
+        for _ in range(50):
+            with limiter.limit():
+                pass
+
+    threads = [threading.Thread(target=enter) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert limiter.stats()["redis_errors"] == 400
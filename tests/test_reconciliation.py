@@ -0,0 +1,75 @@
+from collections import Counter
+
+import uuid
+
+from app.models.product import Product
+from app.services.reconciliation import reconcile_vector_store
+
+
+class ListingVectorStore:
+    def __init__(self, ids):
+        self.ids = ids
+        self.deleted = []
+        self.flushed = False
+
+    def iterate_ids(self, collection_name, batch_size=1000):
+        for start in range(0, len(self.ids), batch_size):
+            yield self.ids[start : start + batch_size]
+
+    def count_ids(self, collection_name, ids):
+        counts = Counter(self.ids)
+        return {uid: counts[uid] for uid in ids if counts[uid]}
+
+    def delete_vectors(self, collection_name, ids, durable=False):
+        self.deleted.extend(ids)
+
+    def flush(self, collection_name):
+        self.flushed = True
+
+
+def _product(db, name, status):
+    product = Product(name=name, price=1.0, stock_quantity=1, embedding_status=status)
+    db.add(product)
+    db.commit()
+    return product
+
+
+def test_reconcile_removes_orphans_and_requeues_drift(db):
+    ok = _product(db, "Ok", Product.EMBEDDING_STATUS_GENERATED)
+    duplicated = _product(db, "Dup", Product.EMBEDDING_STATUS_GENERATED)
+    missing = _product(db, "Missing", Product.EMBEDDING_STATUS_GENERATED)
+    stale = _product(db, "Stale", Product.EMBEDDING_STATUS_FAILED)
+    _product(db, "Pending", Product.EMBEDDING_STATUS_PENDING)
+    orphan = uuid.uuid4()
+
+    store = ListingVectorStore(
+        [ok.uuid, duplicated.uuid, orphan, duplicated.uuid, stale.uuid]
+    )
+    requeued = []
+
+    report = reconcile_vector_store(
+        db, store, "products", requeued.append, batch_size=2
+    )
+
+    assert report.as_dict() == {
+        "vectors": 5,
+        "duplicates": 1,
+        "orphans": 1,
+        "stale": 1,
+        "missing": 1,
+        "deleted": 1,
+        "requeued": 3,
+    }
+    assert store.deleted == [orphan]
+    assert store.flushed
+    assert set(requeued) == {duplicated.uuid, missing.uuid, stale.uuid}
+
+
+def test_reconcile_dry_run_changes_nothing(db):
+    store = ListingVectorStore([uuid.uuid4()])
+    requeued = []
+
+    report = reconcile_vector_store(db, store, "products", requeued.append, dry_run=True)
+
+    assert report.orphans == 1
+    assert store.deleted == [] and requeued == []
@@ -0,0 +1,320 @@
+import asyncio
+import uuid
+from unittest.mock import patch
+
+from app.models.product import Product
+from app.services.embedding.base import EmbeddingService
+from app.services.price_parser import PriceConstraints
+from app.services.search_cache import SearchResponseCache
+from app.services.semantic_search import (
+    SemanticSearchService,
+    close_semantic_search_service,
+    get_semantic_search_service,
+    reciprocal_rank_fusion,
+)
+from app.services.vector_store.base import VectorStore
+
+
+class FakeEmbeddingService(EmbeddingService):
+    def __init__(self):
+        self.queries = []
+
+    def generate_embedding(self, text, task_type="retrieval_document"):
+        self.queries.append(text["text"])
+        return [1.0, 0.0]
+
+    def get_embedding_dimension(self):
+        return 2
+
+
+class FailingEmbeddingService(FakeEmbeddingService):
+    def generate_embedding(self, text, task_type="retrieval_document"):
+        raise RuntimeError("provider down")
+
+
+class FakeVectorStore(VectorStore):
+    def __init__(self, hits=None):
+        self.hits = hits or []
+        self.exprs = []
+
+    def initialize_collection(self, collection_name, dimension):
+        pass
+
+    def insert_vectors(self, collection_name, vectors, ids, metadatas=None, durable=False):
+        pass
+
+    def upsert_vectors(self, collection_name, vectors, ids, metadatas=None, durable=False):
+        pass
+
+    def search(self, collection_name, query_vector, limit=10, score_threshold=None, expr=None):
+        self.exprs.append(expr)
+        return self.hits[:limit]
+
+    def delete_vectors(self, collection_name, ids, durable=False):
+        pass
+
+    def update_vector(self, collection_name, vector_id, vector, metadata=None):
+        pass
+
+    def update_metadata(self, collection_name, ids, metadatas, durable=False):
+        return []
+
+    def collection_exists(self, collection_name):
+        return True
+
+    def iterate_ids(self, collection_name, batch_size=1000):
+        yield [hit["id"] for hit in self.hits]
+
+    def count_ids(self, collection_name, ids):
+        stored = {hit["id"] for hit in self.hits}
+        return {uid: 1 for uid in ids if uid in stored}
+
+
+class FakePriceParser:
+    def __init__(self, result=None):
+        self.result = result
+
+    async def aparse(self, query):
+        if self.result is None:
+            return query, PriceConstraints()
+        return self.result
+
+    def parse(self, query):
+        return asyncio.run(self.aparse(query))
+
+    def stats(self):
+        return {}
+
+
+def _product(db, name, price=10.0):
+    product = Product(name=name, price=price, stock_quantity=1)
+    db.add(product)
+    db.commit()
+    db.refresh(product)
+    return product
+
+
+def test_search_service_is_shared_between_requests():
+    first = get_semantic_search_service()
+    assert get_semantic_search_service() is first
+
+    close_semantic_search_service()
+    assert get_semantic_search_service() is not first
+
+
+def test_async_search_reuses_speculative_embedding(db):
+    product = _product(db, "Runner")
+    embedding = FakeEmbeddingService()
+    service = SemanticSearchService(
+        embedding_service=embedding,
+        vector_store=FakeVectorStore([{"id": product.uuid, "score": 0.9}]),
+        price_parser=FakePriceParser(),
+    )
+
+    results, total = asyncio.run(service.asearch(db, query="red running shoes"))
+
+    assert total == 1
+    assert results[0]["product"].uuid == product.uuid
+    assert embedding.queries == ["red running shoes"]
+
+
+def test_async_search_reembeds_when_price_is_stripped(db):
+    embedding = FakeEmbeddingService()
+    vector_store = FakeVectorStore()
+    service = SemanticSearchService(
+        embedding_service=embedding,
+        vector_store=vector_store,
+        price_parser=FakePriceParser(("shoes", PriceConstraints(max_price=500.0))),
+    )
+
+    asyncio.run(service.asearch(db, query="shoes under 500"))
+
+    assert embedding.queries[-1] == "shoes"
+    assert vector_store.exprs == ["price <= 500.0"]
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    fused = reciprocal_rank_fusion([[a, b], [b, c]], k=60)
+
+    assert [item_id for item_id, _ in fused] == [b, a, c]
+    assert fused[0][1] == 1 / 61 + 1 / 62
+
+
+def test_hybrid_search_fuses_vector_and_lexical_results(db):
+    semantic_only = _product(db, "Semantic match")
+    both = _product(db, "Both match")
+    lexical_only = _product(db, "Lexical match")
+    service = SemanticSearchService(
+        embedding_service=FakeEmbeddingService(),
+        vector_store=FakeVectorStore(
+            [{"id": both.uuid, "score": 0.9}, {"id": semantic_only.uuid, "score": 0.8}]
+        ),
+        price_parser=FakePriceParser(),
+    )
+    lexical = [(both.uuid, 0.5), (lexical_only.uuid, 0.4)]
+
+    with patch(
+        "app.services.semantic_search.product_repository.search_lexical",
+        return_value=lexical,
+    ):
+        results, total = asyncio.run(
+            service.asearch(db, query="match", limit=10, mode="hybrid")
+        )
+
+    assert total == 3
+    assert results[0]["product"].uuid == both.uuid
+
+
+def test_hybrid_search_falls_back_to_lexical_when_embedding_fails(db):
+    product = _product(db, "SKU-123 kettle")
+    service = SemanticSearchService(
+        embedding_service=FailingEmbeddingService(),
+        vector_store=FakeVectorStore(),
+        price_parser=FakePriceParser(),
+    )
+
+    with patch(
+        "app.services.semantic_search.product_repository.search_lexical",
+        return_value=[(product.uuid, 0.7)],
+    ):
+        results, total = asyncio.run(
+            service.asearch(db, query="SKU-123", mode="hybrid")
+        )
+
+    assert total == 1
+    assert results[0]["product"].uuid == product.uuid
+
+
+def _cached_service(hits):
+    embedding = FakeEmbeddingService()
+    service = SemanticSearchService(
+        embedding_service=embedding,
+        vector_store=FakeVectorStore(hits),
+        price_parser=FakePriceParser(),
+        response_cache=SearchResponseCache(max_items=10, ttl_seconds=60),
+    )
+    return service, embedding
+
+
+def test_cached_search_hydrates_fresh_stock(db):
+    product = _product(db, "Kettle")
+    service, embedding = _cached_service([{"id": product.uuid, "score": 0.9}])
+
+    asyncio.run(service.asearch(db, query="kettle"))
+    product.stock_quantity = 0
+    db.commit()
+    results, _ = asyncio.run(service.asearch(db, query="  Kettle"))
+
+    assert embedding.queries == ["kettle"]
+    assert results[0]["product"].stock_quantity == 0
+    assert service.response_cache.stats()["hits"] == 1
+
+
+def test_cached_search_is_invalidated_by_version_change(db):
+    product = _product(db, "Kettle")
+    service, embedding = _cached_service([{"id": product.uuid, "score": 0.9}])
+
+    service.search(db, query="kettle")
+    product.version += 1
+    db.commit()
+    service.search(db, query="kettle")
+
+    assert len(embedding.queries) == 2
+    assert service.response_cache.stats()["invalidations"] == 1
+
+
+def test_cached_search_is_invalidated_by_delete(db):
+    kept = _product(db, "Kettle")
+    deleted = _product(db, "Teapot")
+    service, embedding = _cached_service(
+        [{"id": kept.uuid, "score": 0.9}, {"id": deleted.uuid, "score": 0.8}]
+    )
+
+    service.search(db, query="kettle")
+    db.delete(deleted)
+    db.commit()
+    service.search(db, query="kettle")
+
+    assert len(embedding.queries) == 2
+
+
+class CountingVectorStore(FakeVectorStore):
+    def __init__(self, hits):
+        super().__init__(hits)
+        self.batches = []
+
+    def search_batch(self, collection_name, query_vectors, limit=10, score_threshold=None, expr=None):
+        self.batches.append((len(query_vectors), expr))
+        return [self.hits[:limit] for _ in query_vectors]
+
+
+def test_batch_search_groups_queries_by_price_filter(db):
+    product = _product(db, "Lamp", price=40.0)
+
+    class Parser(FakePriceParser):
+        async def aparse(self, query):
+            if "under" in query:
+                return "lamp", PriceConstraints(max_price=50.0)
+            return query, PriceConstraints()
+
+    vector_store = CountingVectorStore([{"id": product.uuid, "score": 0.7}])
+    service = SemanticSearchService(
+        embedding_service=FakeEmbeddingService(),
+        vector_store=vector_store,
+        price_parser=Parser(),
+    )
+
+    results = asyncio.run(
+        service.asearch_batch(db, ["lamp", "desk lamp", "lamp under 50"])
+    )
+
+    assert [len(r) for r in results] == [1, 1, 1]
+    assert sorted(vector_store.batches, key=str) == [(1, "price <= 50.0"), (2, None)]
+
+
+def test_batch_search_endpoint(client, db):
+    product = _product(db, "Lamp")
+    service = SemanticSearchService(
+        embedding_service=FakeEmbeddingService(),
+        vector_store=FakeVectorStore([{"id": product.uuid, "score": 0.7}]),
+        price_parser=FakePriceParser(),
+    )
+    client.app.dependency_overrides[get_semantic_search_service] = lambda: service
+
+    resp = client.post("/api/v1/search/batch", json={"queries": ["lamp", "light"]})
+
+    assert resp.status_code == 200
+    data = resp.json()["results"]
+    assert [r["query"] for r in data] == ["lamp", "light"]
+    assert data[0]["results"][0]["product"]["uuid"] == str(product.uuid)
+
+
+def test_batch_search_rejects_empty_batch(client):
+    resp = client.post("/api/v1/search/batch", json={"queries": []})
+    assert resp.status_code == 422
+
+
+def test_ready_reports_vector_store_state(client, monkeypatch):
+    from app import main
+
+    class LoadingVectorStore(FakeVectorStore):
+        def is_ready(self, collection_name):
+            return False
+
+    for vector_store, status in ((FakeVectorStore(), 200), (LoadingVectorStore(), 503)):
+        service = SemanticSearchService(
+            embedding_service=FakeEmbeddingService(),
+            vector_store=vector_store,
+            price_parser=FakePriceParser(),
+        )
+        monkeypatch.setattr(main, "get_semantic_search_service", lambda: service)
+        assert client.get("/ready").status_code == status
+
+    def unavailable():
+        raise ConnectionError("milvus unreachable")
+
+    monkeypatch.setattr(main, "get_semantic_search_service", unavailable)
+    resp = client.get("/ready")
+    assert resp.status_code == 503
+    assert resp.json() == {"status": "unavailable"}